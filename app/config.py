@@ -7,11 +7,79 @@ class Settings:
     # Amadeus
     AMADEUS_CLIENT_ID = os.getenv("AMADEUS_CLIENT_ID")
     AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
+    AMADEUS_ENV = os.getenv("AMADEUS_ENV", "test")
+    AMADEUS_BASE_URL = os.getenv("AMADEUS_BASE_URL")  # overrides AMADEUS_ENV host, e.g. a local stand-in
+    AMADEUS_MAX_CONNECTIONS = int(os.getenv("AMADEUS_MAX_CONNECTIONS", "100"))
+    AMADEUS_MAX_CONNECTIONS_PER_HOST = int(os.getenv("AMADEUS_MAX_CONNECTIONS_PER_HOST", "20"))
+    AMADEUS_KEEPALIVE_TIMEOUT = float(os.getenv("AMADEUS_KEEPALIVE_TIMEOUT", "30"))
+    AMADEUS_REQUEST_TIMEOUT = float(os.getenv("AMADEUS_REQUEST_TIMEOUT", "15"))
+    AMADEUS_TOKEN_REFRESH_MARGIN = float(os.getenv("AMADEUS_TOKEN_REFRESH_MARGIN", "300"))
+
+    # Amadeus resilience: adaptive timeouts, hedged GETs and per-endpoint circuit breakers
+    AMADEUS_MIN_TIMEOUT = float(os.getenv("AMADEUS_MIN_TIMEOUT", "2"))
+    AMADEUS_TIMEOUT_MULTIPLIER = float(os.getenv("AMADEUS_TIMEOUT_MULTIPLIER", "3"))
+    AMADEUS_HEDGE_REQUESTS = os.getenv("AMADEUS_HEDGE_REQUESTS", "true").lower() == "true"
+    AMADEUS_LATENCY_MIN_SAMPLES = int(os.getenv("AMADEUS_LATENCY_MIN_SAMPLES", "20"))
+    AMADEUS_BREAKER_FAILURE_THRESHOLD = int(os.getenv("AMADEUS_BREAKER_FAILURE_THRESHOLD", "5"))
+    AMADEUS_BREAKER_FAILURE_RATE = float(os.getenv("AMADEUS_BREAKER_FAILURE_RATE", "0.5"))
+    AMADEUS_BREAKER_WINDOW = int(os.getenv("AMADEUS_BREAKER_WINDOW", "20"))
+    AMADEUS_BREAKER_RECOVERY_TIMEOUT = float(os.getenv("AMADEUS_BREAKER_RECOVERY_TIMEOUT", "30"))
+
+    # Client-side Amadeus rate limiting, per API family (shopping, reference-data, booking)
+    AMADEUS_RATE_LIMIT = float(os.getenv("AMADEUS_RATE_LIMIT", "10"))  # requests per second
+    AMADEUS_RATE_BURST = int(os.getenv("AMADEUS_RATE_BURST", "10"))
+    AMADEUS_RATE_LIMITS = os.getenv("AMADEUS_RATE_LIMITS", "")  # per-family overrides, e.g. "shopping=5:10,booking=2"
+    AMADEUS_RATE_MAX_WAIT = float(os.getenv("AMADEUS_RATE_MAX_WAIT", "10"))
+    AMADEUS_MONTHLY_QUOTA = int(os.getenv("AMADEUS_MONTHLY_QUOTA", "0"))  # per family; 0 = unlimited
+    AMADEUS_QUOTA_INTERACTIVE_RESERVE = float(os.getenv("AMADEUS_QUOTA_INTERACTIVE_RESERVE", "0.1"))  # share only interactive calls may use
+
+    # Seeded in-process Amadeus simulator; also backs the USE_MOCK_* searches
+    AMADEUS_SIMULATOR = os.getenv("AMADEUS_SIMULATOR", "false").lower() == "true"  # serve every Amadeus call from it
+    AMADEUS_SIMULATOR_SEED = int(os.getenv("AMADEUS_SIMULATOR_SEED", "0"))
+    AMADEUS_SIMULATOR_LATENCY = os.getenv("AMADEUS_SIMULATOR_LATENCY", "")  # median ms[:sigma] per family, e.g. "shopping=400:0.6,default=80"
+    AMADEUS_SIMULATOR_ERROR_RATE = float(os.getenv("AMADEUS_SIMULATOR_ERROR_RATE", "0"))
+    AMADEUS_FLIGHT_SEARCH_MAX = int(os.getenv("AMADEUS_FLIGHT_SEARCH_MAX", "5"))  # offers asked for per flight search
+
+    # Record/replay of Amadeus, Stripe and Calendar service calls
+    CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")  # off, record or replay
+    CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassettes/upstream.cassette")
+    CASSETTE_LATENCY_SCALE = float(os.getenv("CASSETTE_LATENCY_SCALE", "0"))  # 1 = recorded latencies, 0 = instant
+    CASSETTE_ON_MISS = os.getenv("CASSETTE_ON_MISS", "error")  # error, or live to call upstream
+
+    # Flight/hotel search result cache
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+    SEARCH_CACHE_STALE_TTL = float(os.getenv("SEARCH_CACHE_STALE_TTL", "900"))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+    SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # How long past the stale window an entry is kept to answer for a failing upstream
+    SEARCH_CACHE_STALE_IF_ERROR = float(os.getenv("SEARCH_CACHE_STALE_IF_ERROR", "3600"))
+
+    # Flexible-date / multi-route flight search fan-out
+    FLEX_SEARCH_CONCURRENCY = int(os.getenv("FLEX_SEARCH_CONCURRENCY", "8"))
+    FLEX_SEARCH_DEADLINE = float(os.getenv("FLEX_SEARCH_DEADLINE", "12"))
+    FLEX_SEARCH_MAX_COMBINATIONS = int(os.getenv("FLEX_SEARCH_MAX_COMBINATIONS", "60"))
+
+    # Reference data (valid / hotel-supported city codes) persisted between restarts
+    REFERENCE_DATA_PATH = os.getenv("REFERENCE_DATA_PATH", "./reference_data.json")
+    REFERENCE_DATA_REFRESH_INTERVAL = float(os.getenv("REFERENCE_DATA_REFRESH_INTERVAL", str(24 * 3600)))
+    REFERENCE_DATA_RECHECK_AFTER = float(os.getenv("REFERENCE_DATA_RECHECK_AFTER", str(30 * 24 * 3600)))  # per city
+
+    # Voice agent search dispatch: "local" calls the booking services in-process,
+    # "remote" goes over HTTP to BOOKING_API_BASE_URL
+    VOICE_DISPATCH_MODE = os.getenv("VOICE_DISPATCH_MODE", "local").lower()
+    BOOKING_API_BASE_URL = os.getenv("BOOKING_API_BASE_URL", "https://maxx-travel-assistant.onrender.com")
 
     # Stripe
     STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY")
     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
+    STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")  # overrides the Stripe API host, e.g. a local stand-in
+    STRIPE_WEBHOOK_WORKERS = int(os.getenv("STRIPE_WEBHOOK_WORKERS", "2"))
+    STRIPE_WEBHOOK_BATCH_SIZE = int(os.getenv("STRIPE_WEBHOOK_BATCH_SIZE", "100"))
+    STRIPE_WEBHOOK_BATCH_WINDOW = float(os.getenv("STRIPE_WEBHOOK_BATCH_WINDOW", "0.05"))
+    STRIPE_WEBHOOK_POLL_INTERVAL = float(os.getenv("STRIPE_WEBHOOK_POLL_INTERVAL", "5"))
+    STRIPE_WEBHOOK_MAX_ATTEMPTS = int(os.getenv("STRIPE_WEBHOOK_MAX_ATTEMPTS", "5"))
+    STRIPE_WEBHOOK_CLAIM_TIMEOUT = float(os.getenv("STRIPE_WEBHOOK_CLAIM_TIMEOUT", "300"))
 
     # Twilio
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
@@ -26,8 +94,25 @@ class Settings:
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
     GOOGLE_REFRESH_TOKEN = os.getenv("GOOGLE_REFRESH_TOKEN")
+    GOOGLE_TOKEN_URI = os.getenv("GOOGLE_TOKEN_URI", "https://oauth2.googleapis.com/token")
+    GOOGLE_CALENDAR_ROOT_URL = os.getenv("GOOGLE_CALENDAR_ROOT_URL")  # e.g. a local stand-in; defaults to Google
+    GOOGLE_CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID", "primary")
+    CALENDAR_FLUSH_INTERVAL = float(os.getenv("CALENDAR_FLUSH_INTERVAL", "0.5"))
 
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./maxx.db")
+    DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+    DATABASE_MAX_OVERFLOW = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    DATABASE_POOL_TIMEOUT = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+    DATABASE_POOL_RECYCLE = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    BOOKING_BATCH_MAX_SIZE = int(os.getenv("BOOKING_BATCH_MAX_SIZE", "1000"))
+
+    # Observability
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # Prometheus /metrics endpoint
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"  # W3C traceparent in and out
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))  # share of new traces recorded; sampled callers always are
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")  # enables /admin and X-Profile: 1 profiling
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
 
 settings = Settings()
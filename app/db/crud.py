@@ -1,17 +1,96 @@
+import datetime
+import logging
+from typing import List, Optional, Tuple
+
 from app.models.booking import Booking
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+BOOKING_COLUMNS = [column.name for column in Booking.__table__.columns if column.name != "id"]
 
-def create_booking(db: Session, data: dict):
-    booking = Booking(**data)
+def normalize_destination(destination: Optional[str]) -> Optional[str]:
+    # Stored and searched in one form, so "dxb" finds "DXB" through the destination index
+    return destination.strip().upper() if destination else destination
+
+async def create_booking(db: AsyncSession, data: dict):
+    booking = Booking(**{**data, "destination": normalize_destination(data.get("destination"))})
     db.add(booking)
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
     return booking
 
-def update_booking_payment_status(db: Session, booking_id: int, payment_status: str = "paid"):
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+def _booking_row(data: dict) -> dict:
+    # executemany needs the same keys on every row, so fill column defaults here
+    row = {name: data.get(name) for name in BOOKING_COLUMNS}
+    row["destination"] = normalize_destination(row["destination"])
+    row["payment_status"] = row["payment_status"] or "paid"
+    row["booked_at"] = row["booked_at"] or datetime.datetime.utcnow()
+    return row
+
+async def create_bookings(db: AsyncSession, records: List[dict]) -> List[Tuple[Optional[int], Optional[str]]]:
+    """
+    Insert many bookings in one transaction, returning ``(booking_id, error)`` per record.
+
+    The whole batch goes in as a single executemany INSERT ... RETURNING. If the
+    database rejects it, each row is retried in its own savepoint so one bad row
+    only fails itself.
+    """
+    if not records:
+        return []
+    rows = [_booking_row(record) for record in records]
+    try:
+        result = await db.execute(insert(Booking).returning(Booking.id, sort_by_parameter_order=True), rows)
+        ids = result.scalars().all()
+        await db.commit()
+        return [(booking_id, None) for booking_id in ids]
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.warning(f"[Booking Batch] Bulk insert failed, retrying row by row: {e}")
+
+    outcomes = []
+    for row in rows:
+        try:
+            async with db.begin_nested():
+                result = await db.execute(insert(Booking).returning(Booking.id), [row])
+                outcomes.append((result.scalar_one(), None))
+        except SQLAlchemyError as e:
+            outcomes.append((None, str(getattr(e, "orig", None) or e)))
+    await db.commit()
+    return outcomes
+
+async def search_bookings(db: AsyncSession, email: Optional[str] = None, phone: Optional[str] = None,
+                          destination: Optional[str] = None, departure_from: Optional[datetime.date] = None,
+                          departure_to: Optional[datetime.date] = None, limit: int = 20,
+                          before_id: Optional[int] = None) -> Tuple[List[Booking], Optional[int]]:
+    """
+    Newest-first booking search with keyset pagination.
+
+    Returns one page and the cursor (the last id) for the next one. Paging by
+    ``id < cursor`` keeps every page an index range scan, however deep it goes.
+    """
+    query = select(Booking)
+    if email:
+        query = query.where(Booking.email == email)
+    if phone:
+        query = query.where(Booking.phone == phone)
+    if destination:
+        query = query.where(Booking.destination == normalize_destination(destination))
+    if departure_from:
+        query = query.where(Booking.departure_date >= departure_from)
+    if departure_to:
+        query = query.where(Booking.departure_date <= departure_to)
+    if before_id is not None:
+        query = query.where(Booking.id < before_id)
+    rows = (await db.execute(query.order_by(Booking.id.desc()).limit(limit + 1))).scalars().all()
+    page = rows[:limit]
+    next_cursor = page[-1].id if len(rows) > limit else None
+    return page, next_cursor
+
+async def update_booking_payment_status(db: AsyncSession, booking_id: int, payment_status: str = "paid"):
+    booking = await db.get(Booking, booking_id)
     if booking:
         booking.payment_status = payment_status
-        db.commit()
-        db.refresh(booking)
+        await db.commit()
     return booking
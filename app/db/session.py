@@ -1,7 +1,131 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-DATABASE_URL = "sqlite:///./maxx.db"  # Replace with PostgreSQL/MySQL in prod
+from app.config import settings
+from app.utils.metrics import Histogram
+
+DATABASE_URL = settings.DATABASE_URL
+
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Database statement latency by operation.", ("operation",))
+DB_SESSION_SECONDS = Histogram("db_session_duration_seconds", "Lifetime of request-scoped database sessions.")
+
+# Async drivers for the sync URLs people put in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        backend, driver = parsed.drivername.split("+", 1)
+        if driver in ("aiosqlite", "asyncpg", "aiomysql", "asyncmy"):
+            return url
+    else:
+        backend = parsed.drivername
+    return parsed.set(drivername=ASYNC_DRIVERS.get(backend, parsed.drivername)).render_as_string(hide_password=False)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _pool_options(url: str) -> dict:
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}  # in-memory SQLite uses a single shared connection
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": not _is_sqlite(url),
+    }
+
+
+def _tune_sqlite(engine):
+    # WAL lets readers run alongside the single writer; NORMAL is durable under WAL
+    # except for the last transactions on power loss, and busy_timeout makes
+    # writers wait for the lock instead of failing with "database is locked".
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def _time_queries(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def drop_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    connect_args = {"check_same_thread": False} if _is_sqlite(url) else {}
+    db_engine = create_engine(url, connect_args=connect_args, **_pool_options(url))
+    if _is_sqlite(url):
+        _tune_sqlite(db_engine)
+    _time_queries(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(url: str = DATABASE_URL):
+    url = async_database_url(url)
+    db_engine = create_async_engine(url, **_pool_options(url))
+    if _is_sqlite(url):
+        _tune_sqlite(db_engine.sync_engine)
+    _time_queries(db_engine.sync_engine)
+    return db_engine
+
+
+engine = create_db_engine()
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+
+async def get_async_db():
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        DB_SESSION_SECONDS.observe(time.perf_counter() - started)
+
+
+async def init_db(db_engine=None):
+    from app.models.booking import Base
+    import app.models.stripe_event  # noqa: F401  registers the outbox table
+
+    def create_all(sync_conn):
+        Base.metadata.create_all(sync_conn)
+        # create_all skips tables that already exist, so add any indexes they predate
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(sync_conn, checkfirst=True)
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
\ No newline at end of file
+    async with (db_engine or async_engine).begin() as conn:
+        await conn.run_sync(create_all)
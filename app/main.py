@@ -1,16 +1,68 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routes import voice, booking
+from app.routes import voice, booking, metrics, admin
+from app.config import settings
+from app.db.session import async_engine, init_db
+from app.services.amadeus_service import (
+    USE_MOCK_HOTEL_SEARCH,
+    amadeus_async,
+    amadeus_token_manager,
+    reference_data,
+)
+from app.services.travel_service import remote_travel_service
+from app.services.stripe_events import stripe_event_processor
+from app.services.calendar_service import calendar_queue
+from app.utils.metrics import MetricsMiddleware
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.tracing import TracingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background = []
+    # Reference data comes off disk before the first request; refreshes happen off the request path
+    await asyncio.to_thread(reference_data.load)
+    await init_db()
+    stripe_event_processor.start(settings.STRIPE_WEBHOOK_WORKERS)
+    if amadeus_token_manager.configured:
+        background.append(asyncio.create_task(amadeus_token_manager.keep_fresh()))
+        if not USE_MOCK_HOTEL_SEARCH:
+            background.append(asyncio.create_task(
+                reference_data.run_refresher(amadeus_async, settings.REFERENCE_DATA_REFRESH_INTERVAL)
+            ))
+    yield
+    for task in background:
+        task.cancel()
+    await stripe_event_processor.stop()
+    await asyncio.to_thread(calendar_queue.stop)
+    # Drain the pooled keep-alive connections to Amadeus
+    await amadeus_async.close()
+    await remote_travel_service.close()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="MAXX Travel Agent",
     version="1.0.0",
-    description="Voice-based flight and hotel booking assistant"
+    description="Voice-based flight and hotel booking assistant",
+    lifespan=lifespan,
 )
 
 # Mount routes
 app.include_router(voice.router, prefix="/voice", tags=["Voice Agent"])
 app.include_router(booking.router, prefix="/booking", tags=["Booking"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"], include_in_schema=False)
+
+# Middleware added last runs outermost: metrics, then tracing, then profiling
+if settings.ADMIN_TOKEN or settings.PROFILE_SAMPLE_RATE:
+    app.add_middleware(ProfilingMiddleware, admin_token=settings.ADMIN_TOKEN, sample_rate=settings.PROFILE_SAMPLE_RATE)
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware, sample_rate=settings.TRACE_SAMPLE_RATE)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)
 
 @app.get("/")
 def root():
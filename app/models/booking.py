@@ -1,9 +1,41 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Index
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.types import TypeDecorator
 import datetime
 
 Base = declarative_base()
 
+class TravelDate(TypeDecorator):
+    """
+    DATE column that tolerates legacy free-text values.
+
+    On SQLite it is stored as ISO text (so range filters still compare correctly)
+    and rows written before this column was typed read back as None rather than
+    failing the whole query; other databases get a native DATE.
+    """
+    impl = Date
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String(10))
+        return dialect.type_descriptor(Date())
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            value = datetime.date.fromisoformat(value)
+        if value is not None and dialect.name == "sqlite":
+            return value.isoformat()
+        return value
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, str):
+            try:
+                return datetime.date.fromisoformat(value)
+            except ValueError:
+                return None
+        return value
+
 class Booking(Base):
     __tablename__ = "bookings"
 
@@ -13,8 +45,16 @@ class Booking(Base):
     phone = Column(String, nullable=False)
     origin = Column(String)
     destination = Column(String)
-    departure_date = Column(String)
+    departure_date = Column(TravelDate)
     flight_number = Column(String)
     amount_paid = Column(Float)
     payment_status = Column(String, default="paid")
     booked_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    # Lookups are keyset-paginated newest first, so every index ends in id
+    __table_args__ = (
+        Index("ix_bookings_email_id", "email", "id"),
+        Index("ix_bookings_phone_id", "phone", "id"),
+        Index("ix_bookings_destination_departure_id", "destination", "departure_date", "id"),
+        Index("ix_bookings_departure_id", "departure_date", "id"),
+    )
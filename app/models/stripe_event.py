@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+import datetime
+
+from app.models.booking import Base
+
+class StripeEvent(Base):
+    """Webhook outbox: one row per Stripe event id, written before the webhook is acked."""
+    __tablename__ = "stripe_events"
+
+    event_id = Column(String, primary_key=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    claimed_by = Column(String)
+    claimed_at = Column(DateTime)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    received_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    processed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_stripe_events_status_received", "status", "received_at"),
+    )
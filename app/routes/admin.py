@@ -0,0 +1,50 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from app.config import settings
+from app.utils.profiling import PROFILES, is_admin
+from app.utils.tracing import TRACES
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not is_admin(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.get("/traces", dependencies=[Depends(require_admin)])
+def list_traces(limit: int = Query(50, ge=1, le=500)):
+    return {"traces": TRACES.recent(limit)}
+
+
+@router.get("/traces/{trace_id}", dependencies=[Depends(require_admin)])
+def get_trace(trace_id: str):
+    spans = TRACES.get(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {"trace_id": trace_id, "spans": spans}
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    return {"profiles": PROFILES.list()}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def download_profile(profile_id: str, format: str = Query("prof", pattern="^(prof|text)$"),
+                     sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls)$")):
+    profile = PROFILES.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "text":
+        return PlainTextResponse(profile.text(sort))
+    return Response(
+        profile.dump(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'},
+    )
@@ -1,61 +1,143 @@
 from fastapi import APIRouter, Query, Depends, Request, Body, HTTPException, status
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from app.services.stripe_service import create_checkout_session
+from pydantic import BaseModel, ValidationError
+from app.services.stripe_service import create_checkout_session, handle_stripe_webhook
+from app.services.stripe_events import record_stripe_event, stripe_event_processor
 from app.services.amadeus_service import (
-    search_flights,
-    search_hotels,
-    create_flight_order,
-    create_hotel_booking,
-    validate_flight_offer,
-    flight_inspiration_search,
-    flight_cheapest_date_search,
-    flight_upselling_search,
-    flight_seatmap_display_get,
-    flight_seatmap_display_post,
-    trip_purpose_prediction,
-    transfer_search,
-    transfer_booking,
+    create_flight_order_async,
+    create_hotel_booking_async,
+    validate_flight_offer_async,
+    flight_inspiration_search_async,
+    flight_cheapest_date_search_async,
+    flight_upselling_search_async,
+    flight_seatmap_display_get_async,
+    flight_seatmap_display_post_async,
+    trip_purpose_prediction_async,
+    transfer_search_async,
+    transfer_booking_async,
+    get_flight_order_async,
+    update_flight_order_async,
+    delete_flight_order_async,
+    get_hotel_order_async,
+    update_hotel_order_async,
+    delete_hotel_order_async,
+    flight_search_cache,
+    hotel_search_cache,
+    amadeus_async,
 )
-from app.services.calendar_service import create_event
-from app.db.crud import create_booking, update_booking_payment_status
-from app.db.session import SessionLocal
-from app.models.booking import Booking
-from app.schemas.booking import BookingCreate, FlightBookingRequest, HotelBookingRequest
-from sqlalchemy.orm import Session
-from datetime import datetime
+from app.services.calendar_service import booking_event, calendar_configured, calendar_queue
+from app.services.travel_service import travel_service, merge_flight_cells, compact_flight_offer, compact_hotel
+from app.services.offer_index import flight_offer_set, hotel_offer_set, flight_filter, hotel_filter
+from app.utils.helpers import normalize_city_code, normalize_hotel_city_code
+from app.utils.cassette import CASSETTE
+from app.utils.streaming import event_stream
+from app.utils.fast_json import FastJSONResponse
+from app.utils.projection import make_shaper
+from app.db.crud import create_booking, create_bookings, search_bookings
+from app.db.session import get_async_db
+from app.schemas.booking import BookingCreate, BookingPage, FlightBookingRequest, HotelBookingRequest
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.config import settings
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-CITY_CODE_MAP = {
-    "LON": "LHR", "NYC": "JFK", "PAR": "CDG",
-    "DEL": "DEL", "BOM": "BOM", "DXB": "DXB",
-    "IST": "IST", "MAN": "MAN", "SFO": "SFO", "SIN": "SIN"
-}
+class PaymentRequest(BaseModel):
+    amount: float
 
-def normalize_city_code(code: str) -> str:
-    return CITY_CODE_MAP.get(code.upper(), code.upper())
+def _split_codes(value: str) -> list:
+    return [normalize_city_code(code.strip()) for code in value.split(",") if code.strip()]
 
-def get_db():
-    db = SessionLocal()
+def _split_list(value: Optional[str]) -> list:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+def _page(offer_set, sort, predicate, limit, cursor):
     try:
-        yield db
-    finally:
-        db.close()
+        return offer_set.query(sort, predicate, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-class PaymentRequest(BaseModel):
-    amount: float
+def _parse_travel_date(value: str):
+    try:
+        travel_date = datetime.strptime(value.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {value}. Use YYYY-MM-DD.")
+    if travel_date < datetime.utcnow().date():
+        raise HTTPException(status_code=400, detail=f"Cannot search flights in the past: {value}")
+    return travel_date
+
+def _flex_dates(date_from: Optional[str], date_to: Optional[str], dates: Optional[str]) -> list:
+    if dates:
+        return sorted({_parse_travel_date(d).isoformat() for d in dates.split(",") if d.strip()})
+    if not date_from:
+        raise HTTPException(status_code=400, detail="Provide either dates or date_from (and optionally date_to).")
+    start = _parse_travel_date(date_from)
+    end = _parse_travel_date(date_to) if date_to else start
+    if end < start:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+def _shape_cell(cell: dict, shape) -> dict:
+    if "offers" not in cell:
+        return cell
+    return {**cell, "offers": shape(cell["offers"])}
+
+async def _flex_events(origin_codes, destination_codes, travel_dates, adults, children, shape=None):
+    cells = []
+    async for cell in travel_service.iter_flights_flex(
+        origin_codes, destination_codes, travel_dates, adults=adults, children=children,
+        concurrency=settings.FLEX_SEARCH_CONCURRENCY, deadline=settings.FLEX_SEARCH_DEADLINE
+    ):
+        if shape is not None:
+            cell = _shape_cell(cell, shape)
+        cells.append(cell)
+        yield "result", cell
+    summary = merge_flight_cells(cells)
+    summary.pop("results")
+    yield "summary", summary
+
+def _shape_trip_part(data: dict, shape) -> dict:
+    if not data.get("flight"):
+        return data
+    return {**data, "flight": shape([data["flight"]])[0]}
+
+async def _trip_events(events, shape):
+    async for event, data in events:
+        yield event, _shape_trip_part(data, shape) if event in ("flight", "summary") else data
+
+async def _cheapest_date_events(origin, destination, offers_for):
+    data = await flight_cheapest_date_search_async(origin, destination)
+    yield "dates", data
+    if not data or isinstance(data, dict):
+        return
+    today = datetime.utcnow().date().isoformat()
+    dates = sorted(
+        (d for d in data if d.get("departureDate", "") >= today),
+        key=lambda d: float(d.get("price", {}).get("total") or "inf")
+    )
+    top_dates = [d["departureDate"] for d in dates[:offers_for]]
+    async for event in _flex_events([normalize_city_code(origin)], [normalize_city_code(destination)], top_dates, 1, 0):
+        yield event
 
 @router.get("/flights")
-def get_flights(
+async def get_flights(
     origin: str = Query(..., alias="originLocationCode"),
     destination: str = Query(..., alias="destinationLocationCode"),
     date: str = Query(..., alias="departureDate"),
     adults: int = Query(1),
     children: int = Query(0),
-    session_id: str = Query(...)
+    session_id: str = Query(...),
+    sort: str = Query("price", pattern="^(price|duration|stops|departure)$"),
+    max_stops: Optional[int] = Query(None, ge=0),
+    carriers: Optional[str] = Query(None, description="Comma-separated carrier codes; every segment must be one of them"),
+    max_price: Optional[float] = Query(None, gt=0),
+    limit: Optional[int] = Query(None, ge=1, le=250),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(compact|full)$", description="compact returns a flat summary per offer"),
+    fields: Optional[str] = Query(None, max_length=500, description="Comma-separated dotted paths to keep, e.g. id,price.total"),
 ):
     try:
         normalized_origin = normalize_city_code(origin)
@@ -69,35 +151,138 @@ def get_flights(
         except Exception as date_error:
             logger.error(f"Invalid date format: {date} - {date_error}")
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
-        flights = search_flights(normalized_origin, normalized_destination, date, adults=adults, children=children)
+        flights = await travel_service.find_flights(normalized_origin, normalized_destination, date, adults=adults, children=children)
         if not flights:
             logger.warning(f"No flights found for {normalized_origin} to {normalized_destination} on {date}")
             raise HTTPException(status_code=404, detail=f"No flights found for {normalized_origin} to {normalized_destination} on {date}")
-        return {"flights": flights}
+        if isinstance(flights, dict):
+            return FastJSONResponse({"flights": flights})
+        predicate = flight_filter(max_stops, _split_list(carriers), max_price)
+        page, total, next_cursor = _page(flight_offer_set(flights), sort, predicate, limit, cursor)
+        shape = make_shaper(view, fields, compact_flight_offer)
+        return FastJSONResponse({"flights": shape(page), "total": total, "next_cursor": next_cursor})
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error searching flights: {e}")
         raise HTTPException(status_code=500, detail="Failed to search flights")
 
+@router.get("/flights/flex")
+async def get_flights_flex(
+    origins: str = Query(..., description="Comma-separated origin city/airport codes"),
+    destinations: str = Query(..., description="Comma-separated destination city/airport codes"),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    dates: Optional[str] = Query(None, description="Comma-separated YYYY-MM-DD dates, instead of a range"),
+    adults: int = Query(1),
+    children: int = Query(0),
+    session_id: Optional[str] = Query(None),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream partial results as ndjson or sse"),
+    view: str = Query("full", pattern="^(compact|full)$", description="compact returns a flat summary per offer"),
+    fields: Optional[str] = Query(None, max_length=500, description="Comma-separated dotted paths to keep, e.g. id,price.total"),
+):
+    origin_codes = _split_codes(origins)
+    destination_codes = _split_codes(destinations)
+    if not origin_codes or not destination_codes:
+        raise HTTPException(status_code=400, detail="At least one origin and one destination are required")
+    travel_dates = _flex_dates(date_from, date_to, dates)
+    combinations = len(origin_codes) * len(destination_codes) * len(travel_dates)
+    if combinations > settings.FLEX_SEARCH_MAX_COMBINATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many combinations ({combinations}); the limit is {settings.FLEX_SEARCH_MAX_COMBINATIONS}"
+        )
+    shape = make_shaper(view, fields, compact_flight_offer)
+    if stream:
+        return event_stream(_flex_events(origin_codes, destination_codes, travel_dates, adults, children, shape), stream)
+    try:
+        result = await travel_service.find_flights_flex(
+            origin_codes, destination_codes, travel_dates, adults=adults, children=children,
+            concurrency=settings.FLEX_SEARCH_CONCURRENCY, deadline=settings.FLEX_SEARCH_DEADLINE
+        )
+    except Exception as e:
+        logger.error(f"Error in flexible flight search: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search flights")
+    if not result["cheapest"] and not result["timed_out"]:
+        raise HTTPException(status_code=404, detail="No flights found for any of the requested routes and dates")
+    return FastJSONResponse(merge_flight_cells([_shape_cell(cell, shape) for cell in result["results"]]))
+
+@router.get("/trip")
+async def get_trip(
+    origin: str = Query(..., alias="originLocationCode"),
+    destination: str = Query(..., alias="destinationLocationCode"),
+    departure_date: str = Query(..., alias="departureDate"),
+    check_out_date: Optional[str] = Query(None, alias="checkOutDate"),
+    nights: Optional[int] = Query(None, ge=1),
+    adults: int = Query(1),
+    children: int = Query(0),
+    session_id: Optional[str] = Query(None),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream partial results as ndjson or sse"),
+    view: str = Query("full", pattern="^(compact|full)$", description="compact returns a flat summary per offer"),
+    fields: Optional[str] = Query(None, max_length=500, description="Comma-separated dotted paths to keep, e.g. id,price.total"),
+):
+    if not check_out_date and not nights:
+        raise HTTPException(status_code=400, detail="Provide either checkOutDate or nights")
+    departure = _parse_travel_date(departure_date)
+    if check_out_date and _parse_travel_date(check_out_date) <= departure:
+        raise HTTPException(status_code=400, detail="checkOutDate must be after departureDate")
+    shape = make_shaper(view, fields, compact_flight_offer)
+    if stream:
+        return event_stream(_trip_events(travel_service.iter_trip(
+            normalize_city_code(origin), normalize_city_code(destination), departure.isoformat(),
+            check_out_date=check_out_date, nights=nights, adults=adults, children=children
+        ), shape), stream)
+    try:
+        trip = await travel_service.find_trip(
+            normalize_city_code(origin), normalize_city_code(destination), departure.isoformat(),
+            check_out_date=check_out_date, nights=nights, adults=adults, children=children
+        )
+    except Exception as e:
+        logger.error(f"Error searching trip: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search trip")
+    if not trip["flight"] and not trip["hotel"]:
+        raise HTTPException(status_code=404, detail="No flights or hotels found for this trip")
+    return FastJSONResponse(_shape_trip_part(trip, shape))
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    return {
+        "flights": flight_search_cache.stats(),
+        "hotels": hotel_search_cache.stats(),
+        "upstream": amadeus_async.resilience.stats() if amadeus_async.resilience else {},
+        "rate_limits": amadeus_async.rate_limiter.stats() if amadeus_async.rate_limiter else {},
+        "cassette": CASSETTE.stats() if CASSETTE is not None else {},
+    }
+
 @router.get("/flight-inspiration")
-def get_flight_inspiration(origin: str = Query(...)):
+async def get_flight_inspiration(origin: str = Query(...)):
     try:
-        data = flight_inspiration_search(origin)
+        data = await flight_inspiration_search_async(origin)
         if not data:
             raise HTTPException(status_code=404, detail="No flight inspiration data found")
         return {"flight_inspiration": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in flight inspiration search: {e}")
         raise HTTPException(status_code=500, detail="Failed to get flight inspiration")
 
 @router.get("/flight-cheapest-date")
-def get_flight_cheapest_date(origin: str = Query(...), destination: str = Query(...)):
+async def get_flight_cheapest_date(
+    origin: str = Query(...),
+    destination: str = Query(...),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream partial results as ndjson or sse"),
+    offers_for: int = Query(3, ge=0, le=10, description="When streaming, also search offers for this many of the cheapest dates")
+):
+    if stream:
+        return event_stream(_cheapest_date_events(origin, destination, offers_for), stream)
     try:
-        data = flight_cheapest_date_search(origin, destination)
+        data = await flight_cheapest_date_search_async(origin, destination)
         if not data:
             raise HTTPException(status_code=404, detail="No cheapest date data found")
         return {"flight_cheapest_date": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in flight cheapest date search: {e}")
         raise HTTPException(status_code=500, detail="Failed to get flight cheapest date")
@@ -105,7 +290,7 @@ def get_flight_cheapest_date(origin: str = Query(...), destination: str = Query(
 @router.post("/validate-flight-offer")
 async def validate_flight_offer_route(flight_offer: dict = Body(...)):
     try:
-        validated_offer = validate_flight_offer(flight_offer)
+        validated_offer = await validate_flight_offer_async(flight_offer)
         return {"success": True, "validated_offer": validated_offer}
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Validation failed: {str(e)}")
@@ -124,21 +309,29 @@ def initiate_payment(payment_request: PaymentRequest):
         raise HTTPException(status_code=500, detail="Failed to initiate payment")
 
 @router.get("/hotels")
-def get_hotels(
+async def get_hotels(
     city_code: str,
     check_in_date: str,
     check_out_date: str,
     adults: int = 1,
     children: int = 0,
-    session_id: str = Query(None)
+    session_id: str = Query(None),
+    sort: str = Query("price", pattern="^(price|name)$"),
+    max_price: Optional[float] = Query(None, gt=0),
+    limit: Optional[int] = Query(None, ge=1, le=250),
+    cursor: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(compact|full)$", description="compact returns name, price and dates only"),
+    fields: Optional[str] = Query(None, max_length=500, description="Comma-separated fields to keep, e.g. name,price"),
 ):
     try:
-        normalized_city_code = normalize_city_code(city_code)
-        hotels = search_hotels(normalized_city_code, check_in_date, check_out_date, adults + children)
+        normalized_city_code = normalize_hotel_city_code(city_code)
+        hotels = await travel_service.find_hotels(normalized_city_code, check_in_date, check_out_date, adults=adults, children=children)
         if not hotels:
             logger.warning(f"No hotels found for city {normalized_city_code} from {check_in_date} to {check_out_date}")
             raise HTTPException(status_code=404, detail="No hotels found")
-        return {"hotels": hotels}
+        page, total, next_cursor = _page(hotel_offer_set(hotels), sort, hotel_filter(max_price), limit, cursor)
+        shape = make_shaper(view, fields, compact_hotel)
+        return FastJSONResponse({"hotels": shape(page), "total": total, "next_cursor": next_cursor})
     except HTTPException:
         raise
     except Exception as e:
@@ -146,16 +339,16 @@ def get_hotels(
         raise HTTPException(status_code=500, detail=f"Exception occurred: {str(e)}")
 
 @router.post("/flight-book")
-def book_flight(flight_booking: FlightBookingRequest = Body(...), session_id: str = Query(...)):
+async def book_flight(flight_booking: FlightBookingRequest = Body(...), session_id: str = Query(...)):
     try:
         # Validate the flight offer before booking
         try:
-            validate_flight_offer(flight_booking.order_data)
+            await validate_flight_offer_async(flight_booking.order_data)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Flight offer validation failed: {str(e)}")
         logger.info(f"Booking flight with order_data: {flight_booking.order_data}")
         logger.info(f"Travelers: {flight_booking.travelers}")
-        result = create_flight_order(flight_booking.order_data, flight_booking.travelers)
+        result = await create_flight_order_async(flight_booking.order_data, flight_booking.travelers)
         logger.info(f"Flight booking result: {result}")
         if not result:
             logger.error("Flight booking failed")
@@ -168,9 +361,9 @@ def book_flight(flight_booking: FlightBookingRequest = Body(...), session_id: st
         raise HTTPException(status_code=500, detail="Flight booking exception occurred")
 
 @router.post("/hotel-book")
-def book_hotel(hotel_booking: HotelBookingRequest = Body(...), session_id: str = Query(...)):
+async def book_hotel(hotel_booking: HotelBookingRequest = Body(...), session_id: str = Query(...)):
     try:
-        result = create_hotel_booking(hotel_booking.booking_data, hotel_booking.guests, None)
+        result = await create_hotel_booking_async(hotel_booking.booking_data, hotel_booking.guests, None)
         if not result:
             logger.error("Hotel booking failed")
             raise HTTPException(status_code=500, detail="Hotel booking failed")
@@ -182,100 +375,170 @@ def book_hotel(hotel_booking: HotelBookingRequest = Body(...), session_id: str =
         raise HTTPException(status_code=500, detail="Hotel booking exception occurred")
 
 @router.get("/flight-order/{order_id}")
-def get_flight_order(order_id: str):
+async def get_flight_order(order_id: str):
     try:
-        data = get_flight_order(order_id)
-        if "error" in data:
+        data = await get_flight_order_async(order_id)
+        if data and "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
         return {"flight_order": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting flight order: {e}")
         raise HTTPException(status_code=500, detail="Failed to get flight order")
 
 @router.put("/flight-order/{order_id}")
-def update_flight_order_route(order_id: str, body: dict = Body(...)):
+async def update_flight_order_route(order_id: str, body: dict = Body(...)):
     try:
-        data = update_flight_order(order_id, body)
-        if "error" in data:
+        data = await update_flight_order_async(order_id, body)
+        if data and "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
         return {"updated_flight_order": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating flight order: {e}")
         raise HTTPException(status_code=500, detail="Failed to update flight order")
 
 @router.delete("/flight-order/{order_id}")
-def delete_flight_order_route(order_id: str):
+async def delete_flight_order_route(order_id: str):
     try:
-        data = delete_flight_order(order_id)
-        if "error" in data:
+        data = await delete_flight_order_async(order_id)
+        if data and "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
         return {"deleted_flight_order": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting flight order: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete flight order")
 
 @router.get("/hotel-order/{order_id}")
-def get_hotel_order(order_id: str):
+async def get_hotel_order(order_id: str):
     try:
-        data = get_hotel_order(order_id)
-        if "error" in data:
+        data = await get_hotel_order_async(order_id)
+        if data and "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
         return {"hotel_order": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting hotel order: {e}")
         raise HTTPException(status_code=500, detail="Failed to get hotel order")
 
 @router.put("/hotel-order/{order_id}")
-def update_hotel_order_route(order_id: str, body: dict = Body(...)):
+async def update_hotel_order_route(order_id: str, body: dict = Body(...)):
     try:
-        data = update_hotel_order(order_id, body)
-        if "error" in data:
+        data = await update_hotel_order_async(order_id, body)
+        if data and "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
         return {"updated_hotel_order": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error updating hotel order: {e}")
         raise HTTPException(status_code=500, detail="Failed to update hotel order")
 
 @router.delete("/hotel-order/{order_id}")
-def delete_hotel_order_route(order_id: str):
+async def delete_hotel_order_route(order_id: str):
     try:
-        data = delete_hotel_order(order_id)
-        if "error" in data:
+        data = await delete_hotel_order_async(order_id)
+        if data and "error" in data:
             raise HTTPException(status_code=404, detail=data["error"])
         return {"deleted_hotel_order": data}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting hotel order: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete hotel order")
 
+def _schedule_calendar_event(booking: dict, booking_id: int):
+    # Calendar invites go out from a background batch queue, never on the request path
+    if not calendar_configured():
+        return
+    event = booking_event({**booking, "id": booking_id})
+    if event:
+        calendar_queue.enqueue(event)
+
 @router.post("/confirm")
-def confirm_booking(booking: BookingCreate = Body(...), db: Session = Depends(get_db)):
+async def confirm_booking(booking: BookingCreate = Body(...), db: AsyncSession = Depends(get_async_db)):
     try:
-        booking_data = Booking(**booking.model_dump())
-        saved = create_booking(db, booking.model_dump())
+        data = booking.model_dump()
+        saved = await create_booking(db, data)
+        _schedule_calendar_event(data, saved.id)
         return {"message": "Booking stored", "booking_id": saved.id}
     except Exception as e:
         logger.error(f"Error confirming booking: {e}")
         raise HTTPException(status_code=500, detail="Failed to confirm booking")
 
+@router.post("/confirm/batch")
+async def confirm_bookings_batch(bookings: List[Dict[str, Any]] = Body(...), db: AsyncSession = Depends(get_async_db)):
+    if len(bookings) > settings.BOOKING_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BOOKING_BATCH_MAX_SIZE} bookings per batch")
+    results = [None] * len(bookings)
+    valid_rows, valid_indexes = [], []
+    for index, record in enumerate(bookings):
+        try:
+            valid_rows.append(BookingCreate.model_validate(record).model_dump())
+            valid_indexes.append(index)
+        except ValidationError as e:
+            results[index] = {"index": index, "error": e.errors(include_url=False, include_context=False)}
+    try:
+        outcomes = await create_bookings(db, valid_rows)
+    except Exception as e:
+        logger.error(f"Error storing booking batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to store bookings")
+    for index, row, (booking_id, error) in zip(valid_indexes, valid_rows, outcomes):
+        results[index] = {"index": index, "booking_id": booking_id} if error is None else {"index": index, "error": error}
+        if error is None:
+            _schedule_calendar_event(row, booking_id)
+    stored = sum(1 for result in results if "booking_id" in result)
+    return {"stored": stored, "failed": len(results) - stored, "results": results}
+
+@router.get("/bookings", response_model=BookingPage)
+async def list_bookings(
+    email: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None),
+    destination: Optional[str] = Query(None),
+    departure_from: Optional[date] = Query(None),
+    departure_to: Optional[date] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if departure_from and departure_to and departure_to < departure_from:
+        raise HTTPException(status_code=400, detail="departure_to must not be before departure_from")
+    bookings, next_cursor = await search_bookings(
+        db,
+        email=email.strip() if email else None,
+        phone=phone.strip() if phone else None,
+        destination=destination,
+        departure_from=departure_from,
+        departure_to=departure_to,
+        limit=limit,
+        before_id=cursor,
+    )
+    return {"bookings": bookings, "next_cursor": next_cursor}
+
 @router.post("/stripe-webhook")
-async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
+async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_async_db)):
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
-    from app.services.stripe_service import handle_stripe_webhook
     try:
         event = handle_stripe_webhook(payload, sig_header)
-        if event['type'] == 'checkout.session.completed':
-            session = event['data']['object']
-            booking_id = session.get('metadata', {}).get('booking_id')
-            if booking_id:
-                updated_booking = update_booking_payment_status(db, int(booking_id), payment_status="paid")
-                if updated_booking:
-                    logger.info(f"Booking {booking_id} payment status updated to paid.")
-                else:
-                    logger.warning(f"Booking {booking_id} not found.")
-            else:
-                logger.warning("Booking ID not found in session metadata.")
-        return {"status": "success"}
+    except Exception as e:
+        logger.error(f"Stripe webhook rejected: {e}")
+        raise HTTPException(status_code=400, detail="Invalid Stripe webhook payload or signature")
+    if not event.get("id"):
+        raise HTTPException(status_code=400, detail="Stripe event has no id")
+    # Persist and ack; the booking update happens in the background workers
+    try:
+        created = await record_stripe_event(db, event)
     except Exception as e:
         logger.error(f"Stripe webhook error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail="Failed to record Stripe event")
+    if created:
+        stripe_event_processor.notify()
+    else:
+        logger.info(f"Stripe event {event['id']} already received; ignoring retry.")
+    return {"status": "success", "duplicate": not created}
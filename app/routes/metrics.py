@@ -0,0 +1,79 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.db.session import async_engine
+from app.services.amadeus_service import amadeus_async, amadeus_singleflight, flight_search_cache, hotel_search_cache
+from app.services.calendar_service import calendar_queue
+from app.services.stripe_events import stripe_event_processor
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter()
+
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _family(name, kind, documentation, rows, key):
+    return name, kind, documentation, [(labels, stats.get(key)) for labels, stats in rows]
+
+
+@REGISTRY.register_collector
+def collect_search_caches():
+    rows = [({"cache": cache.name}, cache.stats()) for cache in (flight_search_cache, hotel_search_cache)]
+    return [
+        _family("search_cache_hits_total", "counter", "Fresh cache hits.", rows, "hits"),
+        _family("search_cache_stale_hits_total", "counter", "Stale hits served while revalidating.", rows, "stale_hits"),
+        _family("search_cache_misses_total", "counter", "Cache misses.", rows, "misses"),
+        _family("search_cache_error_fallbacks_total", "counter", "Expired entries served for a failing upstream.", rows, "error_fallbacks"),
+        _family("search_cache_evictions_total", "counter", "Entries evicted by size limits.", rows, "evictions"),
+        _family("search_cache_hit_ratio", "gauge", "Share of lookups answered from cache.", rows, "hit_ratio"),
+        _family("search_cache_entries", "gauge", "Entries held.", rows, "entries"),
+        _family("search_cache_bytes", "gauge", "Approximate bytes held.", rows, "bytes"),
+    ]
+
+
+@REGISTRY.register_collector
+def collect_amadeus_client():
+    families = []
+    stats = amadeus_singleflight.stats()
+    families.append(("amadeus_singleflight_shared_total", "counter", "Calls that joined an identical in-flight call.",
+                     [({}, stats["shared"])]))
+    if amadeus_async.resilience is not None:
+        endpoints = [({"endpoint": key}, values) for key, values in amadeus_async.resilience.stats().items()]
+        families += [
+            ("amadeus_circuit_state", "gauge", "Breaker state: 0 closed, 1 half-open, 2 open.",
+             [(labels, BREAKER_STATES[values["state"]]) for labels, values in endpoints]),
+            _family("amadeus_circuit_rejected_total", "counter", "Calls failed fast by an open breaker.", endpoints, "rejected"),
+            _family("amadeus_timeout_seconds", "gauge", "Current adaptive request timeout.", endpoints, "timeout"),
+            _family("amadeus_hedged_requests_total", "counter", "Hedged second attempts sent.", endpoints, "hedges"),
+        ]
+    if amadeus_async.rate_limiter is not None:
+        limits = [({"family": name}, values) for name, values in amadeus_async.rate_limiter.stats().items()]
+        families += [
+            _family("amadeus_rate_limit_queued", "gauge", "Calls waiting for a rate limit token.", limits, "queued"),
+            _family("amadeus_rate_limit_delayed_total", "counter", "Calls that had to queue.", limits, "delayed"),
+            _family("amadeus_rate_limit_avg_wait_ms", "gauge", "Mean queueing delay of delayed calls.", limits, "avg_wait_ms"),
+            _family("amadeus_rate_limit_rejected_total", "counter", "Calls refused by the limiter.", limits, "rejected"),
+            _family("amadeus_throttled_total", "counter", "429 responses from Amadeus.", limits, "throttled"),
+        ]
+    return families
+
+
+@REGISTRY.register_collector
+def collect_background_work():
+    stripe = stripe_event_processor.stats()
+    calendar = calendar_queue.stats()
+    pool = async_engine.pool
+    return [
+        ("stripe_events_processed_total", "counter", "Stripe events applied to bookings.", [({}, stripe["processed"])]),
+        ("stripe_events_failed_total", "counter", "Stripe event batch failures.", [({}, stripe["failed"])]),
+        ("calendar_events_queued", "gauge", "Calendar invites waiting to be sent.", [({}, calendar["queued"])]),
+        ("calendar_events_sent_total", "counter", "Calendar invites created.", [({}, calendar["sent"])]),
+        ("calendar_events_failed_total", "counter", "Calendar invites that failed.", [({}, calendar["failed"])]),
+        ("db_pool_checked_out", "gauge", "Database connections in use.",
+         [({}, pool.checkedout() if hasattr(pool, "checkedout") else None)]),
+    ]
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
-import os
-import re
-import requests
 from datetime import datetime
 from dateutil import parser as date_parser
 from pydantic import BaseModel
 import logging
-from dateutil.relativedelta import relativedelta
+from app.utils.tracing import start_span, traced
+from app.services.travel_service import get_voice_travel_service, summarize_flight_offer
+from app.services.intent_parser import parse_intent, resolve_date
+from app.services.amadeus_service import city_to_iata_code_async
 
 router = APIRouter()
 
@@ -15,94 +15,23 @@ router = APIRouter()
 logger = logging.getLogger("uvicorn")
 logger.setLevel(logging.INFO)
 
-# Offline map for fallback
-CITY_TO_IATA = {
-    "mumbai": "BOM",
-    "delhi": "DEL",
-    "london": "LON",
-    "new york": "NYC",
-    "dubai": "DXB",
-    "paris": "PAR",
-}
-
-AMADEUS_API_KEY = os.getenv("AMADEUS_API_KEY")
-AMADEUS_API_SECRET = os.getenv("AMADEUS_API_SECRET")
-AMADEUS_TOKEN = None
-
-def get_amadeus_token():
-    global AMADEUS_TOKEN
-    if AMADEUS_TOKEN:
-        return AMADEUS_TOKEN
-    try:
-        resp = requests.post(
-            "https://test.api.amadeus.com/v1/security/oauth2/token",
-            data={
-                "grant_type": "client_credentials",
-                "client_id": AMADEUS_API_KEY,
-                "client_secret": AMADEUS_API_SECRET
-            },
-            timeout=5
-        )
-        if resp.status_code == 200:
-            AMADEUS_TOKEN = resp.json()["access_token"]
-            return AMADEUS_TOKEN
-    except Exception as e:
-        logger.error(f"Amadeus token fetch error: {e}")
-    return None
-
-def resolve_iata(city: str):
+@traced("voice.resolve_iata")
+async def resolve_iata(city: str):
     if not city:
         return None
     city = city.lower().strip()
 
-    if city in CITY_TO_IATA:
-        return CITY_TO_IATA[city]
-
-    token = get_amadeus_token()
-    if not token:
-        return None
-
+    # Offline index first; a miss goes to Amadeus through the shared, rate-limited client
     try:
-        resp = requests.get(
-            "https://test.api.amadeus.com/v1/reference-data/locations",
-            params={"keyword": city, "subType": "CITY"},
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=5
-        )
-        results = resp.json().get("data", [])
-        if results:
-            return results[0]["iataCode"]
+        return await city_to_iata_code_async(city)
     except Exception as e:
         logger.error(f"IATA resolution error for {city}: {e}")
     return None
 
+@traced("voice.extract_info")
 def extract_info(text: str):
-    origin, destination, city, date_str = None, None, None, None
-    text = text.lower()
-
-    flight_match = re.search(r"from\s+([\w\s]+)\s+to\s+([\w\s]+)", text)
-    hotel_match = re.search(r"hotel\s+in\s+([\w\s]+)", text)
-    date_match = re.search(r"on\s+([a-zA-Z0-9\s,]+)", text)
-
-    if flight_match:
-        origin = flight_match.group(1).strip()
-        destination = flight_match.group(2).strip()
-    elif hotel_match:
-        city = hotel_match.group(1).strip()
-
-    if date_match:
-        try:
-            parsed_date = date_parser.parse(date_match.group(1), fuzzy=True)
-            # Ensure correct year
-            now = datetime.now()
-            if parsed_date < now and (now - parsed_date).days < 180:
-                parsed_date += relativedelta(years=1)
-            date_str = parsed_date.strftime("%Y-%m-%d")
-        except Exception as e:
-            logger.warning(f"Date parsing failed: {e}")
-            date_str = None
-
-    return origin, destination, city, date_str
+    intent = parse_intent(text)
+    return intent.origin, intent.destination, intent.city, intent.date
 
 @router.post("/voice/voice-webhook")
 async def voice_webhook(request: Request):
@@ -125,14 +54,16 @@ async def voice_webhook(request: Request):
         children = metadata.get("children", 0)
 
         if date_str:
-            try:
-                parsed_date = date_parser.parse(date_str, fuzzy=True)
-                if parsed_date.year < datetime.now().year:
-                    parsed_date = parsed_date.replace(year=datetime.now().year)
-                date_str = parsed_date.strftime("%Y-%m-%d")
-            except Exception as e:
-                logger.warning(f"Metadata date parse failed: {e}")
-                date_str = None
+            with start_span("voice.parse_date"):
+                try:
+                    # Anything the fast resolver does not recognise still gets dateutil's fuzzy parse
+                    parsed_date = resolve_date(date_str) or date_parser.parse(date_str, fuzzy=True).date()
+                    if parsed_date.year < datetime.now().year:
+                        parsed_date = parsed_date.replace(year=datetime.now().year)
+                    date_str = parsed_date.strftime("%Y-%m-%d")
+                except Exception as e:
+                    logger.warning(f"Metadata date parse failed: {e}")
+                    date_str = None
 
         if not origin or not destination or not date_str:
             f_origin, f_dest, f_city, f_date = extract_info(voice_text)
@@ -143,20 +74,17 @@ async def voice_webhook(request: Request):
 
         # === Flight Search ===
         if origin and destination and date_str:
-            origin_code = resolve_iata(origin)
-            dest_code = resolve_iata(destination)
+            origin_code = await resolve_iata(origin)
+            dest_code = await resolve_iata(destination)
 
             if not origin_code or not dest_code:
                 return {"response_text": f"Couldn’t find airport codes for {origin} or {destination}. Try again."}
 
-            resp = requests.get(
-                "https://maxx-travel-assistant.onrender.com/booking/flights",
-                params={"originLocationCode": origin_code, "destinationLocationCode": dest_code, "departureDate": date_str, "adults": adults, "children": children, "session_id": session_id},
-                timeout=10
+            flights = await get_voice_travel_service().find_flights(
+                origin_code, dest_code, date_str, adults=adults, children=children, session_id=session_id
             )
-            result = resp.json()
-            if result.get("flights"):
-                flight = result["flights"][0]
+            if flights and isinstance(flights, list):
+                flight = summarize_flight_offer(flights[0])
                 return {
                     "response_text": f"The best flight from {origin.title()} to {destination.title()} on {date_str} is {flight['airline']} flight {flight['flight_number']} for ₹{flight['price']}."
                 }
@@ -164,26 +92,17 @@ async def voice_webhook(request: Request):
 
         # === Hotel Search ===
         elif city and date_str:
-            city_code = resolve_iata(city)
+            city_code = await resolve_iata(city)
             if not city_code:
                 return {"response_text": f"I couldn’t find an airport near {city.title()}. Try another city."}
 
-            resp = requests.get(
-                "https://maxx-travel-assistant.onrender.com/booking/hotels",
-                params={
-                    "cityCode": city_code,
-                    "checkInDate": date_str,
-                    "checkOutDate": date_str,
-                    "adults": adults,
-                    "session_id": session_id
-                },
-                timeout=10
+            hotels = await get_voice_travel_service().find_hotels(
+                city_code, date_str, date_str, adults=adults, session_id=session_id
             )
-            result = resp.json()
-            if result.get("hotels"):
-                hotel = result["hotels"][0]
+            if hotels and isinstance(hotels, list):
+                hotel = hotels[0]
                 return {
-                    "response_text": f"I found {hotel['name']} in {city.title()} for ₹{hotel['price']} per night."
+                    "response_text": f"I found {hotel.get('name') or hotel.get('hotelName')} in {city.title()} for ₹{hotel['price']} per night."
                 }
             return {"response_text": f"No hotels found in {city.title()} on {date_str}."}
 
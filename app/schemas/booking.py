@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import ConfigDict
 
 class BookingCreate(BaseModel):
@@ -9,7 +9,7 @@ class BookingCreate(BaseModel):
     phone: str
     origin: Optional[str] = None
     destination: Optional[str] = None
-    departure_date: Optional[str] = None
+    departure_date: Optional[date] = None
     flight_number: Optional[str] = None
     amount_paid: Optional[float] = None
     payment_status: Optional[str] = "paid"
@@ -17,6 +17,13 @@ class BookingCreate(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BookingRead(BookingCreate):
+    id: int
+
+class BookingPage(BaseModel):
+    bookings: List[BookingRead]
+    next_cursor: Optional[int] = None
+
 class FlightOfferValidationRequest(BaseModel):
     flight_offer: Dict[str, Any]
     session_id: str
@@ -0,0 +1,431 @@
+# app/services/amadeus_client.py
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from typing import Optional
+
+import aiohttp
+import requests
+from amadeus import ResponseError
+from amadeus.client.errors import (
+    AuthenticationError,
+    ClientError,
+    NetworkError,
+    NotFoundError,
+    ServerError,
+)
+
+from app.config import settings
+from app.services.rate_limiter import RateLimited, RateLimiter, parse_rate_limits
+from app.services.resilience import CircuitOpen, ResiliencePolicy
+from app.utils.metrics import Counter
+from app.utils.singleflight import SingleFlight
+from app.utils.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+AMADEUS_RESPONSES = Counter(
+    "amadeus_responses_total", "Amadeus HTTP responses by endpoint and status.", ("endpoint", "status")
+)
+
+AMADEUS_HOSTS = {
+    "test": "https://test.api.amadeus.com",
+    "production": "https://api.amadeus.com",
+}
+
+
+def amadeus_base_url() -> str:
+    return (settings.AMADEUS_BASE_URL or AMADEUS_HOSTS.get(settings.AMADEUS_ENV, AMADEUS_HOSTS["test"])).rstrip("/")
+
+
+class AmadeusResponse:
+    """Minimal mirror of ``amadeus.Response`` so existing error handling keeps working."""
+
+    def __init__(self, status_code: int, body: str, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.result = None
+        self.data = None
+        self.parsed = False
+        if body:
+            try:
+                self.result = json.loads(body)
+                self.parsed = True
+            except ValueError:
+                self.result = None
+        if self.parsed and isinstance(self.result, dict):
+            self.data = self.result.get("data")
+
+
+def _error_for(response: AmadeusResponse) -> ResponseError:
+    if response.status_code >= 500:
+        return ServerError(response)
+    if response.status_code == 401:
+        return AuthenticationError(response)
+    if response.status_code == 404:
+        return NotFoundError(response)
+    return ClientError(response)
+
+
+class CircuitOpenError(NetworkError):
+    """The endpoint's circuit breaker is open; raised without calling Amadeus."""
+
+
+class RateLimitedError(ClientError):
+    """No client-side rate limit token was available in time; Amadeus was not called."""
+
+
+def _retry_after(response: AmadeusResponse) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[A-Za-z0-9%=_-]{8,}$")
+
+
+def endpoint_key(method: str, path: str) -> str:
+    # Order ids etc. would give every call its own breaker; collapse them
+    segments = ["{id}" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def _clean_params(params: dict) -> dict:
+    # aiohttp refuses bools/None in query strings; match what the SDK sends upstream.
+    cleaned = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        cleaned[key] = value
+    return cleaned
+
+
+class AmadeusTokenManager:
+    """
+    One OAuth2 client-credentials token shared by every Amadeus caller.
+
+    Once a token enters the last ``refresh_margin`` seconds of its lifetime it is
+    refreshed in the background while callers keep using it; only an expired (or
+    missing) token is refreshed inline. Concurrent refreshes from threads and tasks
+    coalesce into a single request.
+    """
+
+    EXPIRY_SKEW = 10
+
+    def __init__(self, client_id: Optional[str], client_secret: Optional[str], base_url: str = AMADEUS_HOSTS["test"],
+                 refresh_margin: float = 300.0, timeout: float = 5.0, transport=None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = f"{base_url.rstrip('/')}/v1/security/oauth2/token"
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lifetime = 0.0
+        self._refreshes = SingleFlight("amadeus-token")
+        self._background_lock = threading.Lock()
+        self._background_refresh = False
+        self.refresh_count = 0
+        self.transport = transport
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.transport is not None or (self.client_id and self.client_secret))
+
+    def _refresh_at(self) -> float:
+        # Never wait past the halfway point of short-lived tokens
+        return self._expires_at - min(self.refresh_margin, self._lifetime / 2)
+
+    def _usable(self, now: float) -> bool:
+        return self._token is not None and now < self._expires_at - self.EXPIRY_SKEW
+
+    def _fetch(self) -> str:
+        if self.transport is not None:
+            response = AmadeusResponse(*self.transport.token())
+        else:
+            try:
+                resp = requests.post(
+                    self.token_url,
+                    data={
+                        "grant_type": "client_credentials",
+                        "client_id": self.client_id or "",
+                        "client_secret": self.client_secret or "",
+                    },
+                    timeout=self.timeout,
+                )
+            except requests.RequestException as e:
+                logger.error(f"[Amadeus Token Error] {e}")
+                raise NetworkError(AmadeusResponse(0, ""))
+            response = AmadeusResponse(resp.status_code, resp.text)
+        if response.status_code != 200 or not response.parsed or not response.result.get("access_token"):
+            logger.error(f"[Amadeus Token Error] status={response.status_code}")
+            raise AuthenticationError(response)
+        self._lifetime = float(response.result.get("expires_in", 0))
+        self._expires_at = time.time() + self._lifetime
+        self._token = response.result["access_token"]
+        self.refresh_count += 1
+        logger.info(f"Refreshed Amadeus access token (expires in {self._lifetime:.0f}s)")
+        return self._token
+
+    def refresh(self) -> str:
+        return self._refreshes.do("token", self._fetch)
+
+    def _refresh_in_background(self):
+        with self._background_lock:
+            if self._background_refresh:
+                return
+            self._background_refresh = True
+
+        def run():
+            try:
+                self.refresh()
+            except ResponseError:
+                pass  # the current token is still valid; the next caller retries
+            finally:
+                with self._background_lock:
+                    self._background_refresh = False
+
+        threading.Thread(target=run, name="amadeus-token-refresh", daemon=True).start()
+
+    def get_token(self) -> str:
+        now = time.time()
+        if self._usable(now):
+            if now >= self._refresh_at():
+                self._refresh_in_background()
+            return self._token
+        return self.refresh()
+
+    async def get_token_async(self) -> str:
+        now = time.time()
+        if self._usable(now):
+            if now >= self._refresh_at():
+                self._refresh_in_background()
+            return self._token
+        # Hop to a thread so sync and async callers share the same single-flight refresh
+        return await asyncio.to_thread(self.refresh)
+
+    def bearer(self) -> str:
+        return f"Bearer {self.get_token()}"
+
+    def invalidate(self):
+        self._token = None
+        self._expires_at = 0.0
+
+    async def keep_fresh(self, retry_delay: float = 30.0):
+        """Background task: refresh ahead of expiry even when there is no traffic."""
+        while True:
+            if self._token:
+                await asyncio.sleep(max(self._refresh_at() - time.time(), 1.0))
+            try:
+                await asyncio.to_thread(self.refresh)
+            except ResponseError:
+                await asyncio.sleep(retry_delay)
+
+
+class SharedAccessToken:
+    """Drop-in for the SDK's ``AccessToken`` so ``amadeus.Client`` uses the shared manager."""
+
+    def __init__(self, manager: AmadeusTokenManager):
+        self.manager = manager
+
+    def _bearer_token(self):
+        return self.manager.bearer()
+
+
+class AsyncAmadeusClient:
+    """
+    Non-blocking Amadeus client sharing one pooled keep-alive connection set.
+
+    Raises the same ``amadeus.ResponseError`` subclasses as the SDK so callers can
+    handle both clients identically. A ``transport`` (see ``AmadeusSimulator.send``)
+    replaces the HTTP round trip but keeps rate limiting, breakers and metrics.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str],
+        client_secret: Optional[str],
+        base_url: str = AMADEUS_HOSTS["test"],
+        max_connections: int = 100,
+        max_connections_per_host: int = 20,
+        keepalive_timeout: float = 30.0,
+        request_timeout: float = 15.0,
+        token_manager: Optional[AmadeusTokenManager] = None,
+        resilience: Optional[ResiliencePolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        transport=None,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.token_manager = token_manager or AmadeusTokenManager(client_id, client_secret, self.base_url)
+        self.resilience = resilience
+        self.rate_limiter = rate_limiter
+        self.transport = transport
+
+    @classmethod
+    def from_settings(cls, token_manager: Optional[AmadeusTokenManager] = None, transport=None) -> "AsyncAmadeusClient":
+        return cls(
+            client_id=settings.AMADEUS_CLIENT_ID,
+            client_secret=settings.AMADEUS_CLIENT_SECRET,
+            base_url=amadeus_base_url(),
+            token_manager=token_manager,
+            max_connections=settings.AMADEUS_MAX_CONNECTIONS,
+            max_connections_per_host=settings.AMADEUS_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=settings.AMADEUS_KEEPALIVE_TIMEOUT,
+            request_timeout=settings.AMADEUS_REQUEST_TIMEOUT,
+            resilience=ResiliencePolicy(
+                default_timeout=settings.AMADEUS_REQUEST_TIMEOUT,
+                min_timeout=settings.AMADEUS_MIN_TIMEOUT,
+                timeout_multiplier=settings.AMADEUS_TIMEOUT_MULTIPLIER,
+                hedge=settings.AMADEUS_HEDGE_REQUESTS,
+                min_samples=settings.AMADEUS_LATENCY_MIN_SAMPLES,
+                failure_threshold=settings.AMADEUS_BREAKER_FAILURE_THRESHOLD,
+                failure_rate=settings.AMADEUS_BREAKER_FAILURE_RATE,
+                window=settings.AMADEUS_BREAKER_WINDOW,
+                recovery_timeout=settings.AMADEUS_BREAKER_RECOVERY_TIMEOUT,
+            ),
+            rate_limiter=RateLimiter(
+                rate=settings.AMADEUS_RATE_LIMIT,
+                burst=settings.AMADEUS_RATE_BURST,
+                limits=parse_rate_limits(settings.AMADEUS_RATE_LIMITS),
+                max_wait=settings.AMADEUS_RATE_MAX_WAIT,
+                monthly_quota=settings.AMADEUS_MONTHLY_QUOTA,
+                interactive_reserve=settings.AMADEUS_QUOTA_INTERACTIVE_RESERVE,
+            ),
+            transport=transport,
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        # A session is bound to the loop that created it; rebuild if the loop changed
+        # (e.g. TestClient spins up a fresh loop per request).
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                headers={"Accept": "application/json, application/vnd.amadeus+json"},
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+    async def _send(self, method: str, path: str, params=None, json_body=None, headers=None,
+                    timeout: Optional[float] = None) -> AmadeusResponse:
+        with start_span("amadeus.http", method=method, path=path) as span:
+            try:
+                if self.transport is not None:
+                    status, body, response_headers = await self.transport.send(
+                        method, path, _clean_params(params or {}), json_body, timeout or self.request_timeout
+                    )
+                else:
+                    options = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+                    async with self._get_session().request(
+                        method,
+                        f"{self.base_url}{path}",
+                        params=_clean_params(params or {}),
+                        json=json_body,
+                        headers=headers,
+                        **options,
+                    ) as resp:
+                        status, body, response_headers = resp.status, await resp.text(), dict(resp.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"[Amadeus Async Network Error] {method} {path}: {e}")
+                AMADEUS_RESPONSES.labels(endpoint_key(method, path), type(e).__name__).inc()
+                raise NetworkError(AmadeusResponse(0, ""))
+            AMADEUS_RESPONSES.labels(endpoint_key(method, path), status).inc()
+            if span is not None:
+                span.set("http.status", status)
+            return AmadeusResponse(status, body, response_headers)
+
+    async def _bearer_token(self) -> str:
+        return f"Bearer {await self.token_manager.get_token_async()}"
+
+    async def _send_resilient(self, method: str, path: str, params, body, headers) -> AmadeusResponse:
+        limiter = self.rate_limiter
+        try:
+            if limiter is not None:
+                with start_span("amadeus.rate_limit", path=path):
+                    await limiter.acquire(path)
+            if self.resilience is None:
+                return await self._send(method, path, params=params, json_body=body, headers=headers)
+            attempts = 0
+
+            async def attempt(timeout):
+                nonlocal attempts
+                attempts += 1
+                # A hedge only goes out if it fits in the rate limit without queueing
+                if attempts > 1 and limiter is not None and not limiter.try_acquire(path):
+                    raise RateLimited(path, "no spare token for a hedged request")
+                return await self._send(method, path, params=params, json_body=body, headers=headers, timeout=timeout)
+
+            return await self.resilience.call(
+                endpoint_key(method, path),
+                attempt,
+                hedge=method == "GET",  # only idempotent reads are safe to send twice
+                is_failure=lambda response: response.status_code >= 500,
+                # 4xx replies (auth, throttling, bad input) say nothing about upstream health or speed
+                is_neutral=lambda response: 400 <= response.status_code < 500,
+            )
+        except CircuitOpen as e:
+            logger.warning(f"[Amadeus Circuit Open] {e}")
+            raise CircuitOpenError(AmadeusResponse(0, ""))
+        except RateLimited as e:
+            logger.warning(f"[Amadeus Rate Limited] {e}")
+            raise RateLimitedError(AmadeusResponse(429, ""))
+
+    async def request(self, method: str, path: str, params=None, body=None) -> AmadeusResponse:
+        for attempt in range(2):
+            headers = {"Authorization": await self._bearer_token()}
+            if body is not None:
+                headers["Content-Type"] = "application/vnd.amadeus+json"
+            response = await self._send_resilient(method, path, params, body, headers)
+            if attempt or response.status_code not in (401, 429):
+                break
+            if response.status_code == 401:
+                # Revoked or expired early upstream: drop it and retry once with a fresh token
+                self.token_manager.invalidate()
+            elif self.rate_limiter is not None:
+                # Over quota upstream: hold the family back, then queue for one more try
+                self.rate_limiter.throttled(path, _retry_after(response))
+            else:
+                break
+        if response.status_code >= 400:
+            raise _error_for(response)
+        return response
+
+    async def get(self, path: str, **params) -> AmadeusResponse:
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path: str, body=None, **params) -> AmadeusResponse:
+        return await self.request("POST", path, params=params, body=body)
+
+    async def put(self, path: str, body=None, **params) -> AmadeusResponse:
+        return await self.request("PUT", path, params=params, body=body)
+
+    async def delete(self, path: str, **params) -> AmadeusResponse:
+        return await self.request("DELETE", path, params=params)
@@ -4,6 +4,22 @@ from datetime import datetime, timedelta
 from typing import Optional
 from dotenv import load_dotenv
 from amadeus import Client, ResponseError
+from app.config import settings
+from app.services.amadeus_client import (
+    AmadeusTokenManager,
+    AsyncAmadeusClient,
+    SharedAccessToken,
+    amadeus_base_url,
+)
+from app.services.amadeus_simulator import AmadeusSimulator
+from app.services.rate_limiter import current_priority, request_priority
+from app.services.location_index import get_location_index
+from app.services.reference_data import ReferenceDataStore
+from app.services.search_cache import SearchCache
+from app.utils.helpers import normalize_city_code
+from app.utils.metrics import instrumented
+from app.utils.tracing import current_span, traced, use_span
+from app.utils.singleflight import SingleFlight
 
 load_dotenv()
 
@@ -17,18 +33,78 @@ AMADEUS_ENV = os.getenv("AMADEUS_ENV", "test")  # or "production"
 USE_MOCK_FLIGHT_SEARCH = os.getenv("USE_MOCK_FLIGHT_SEARCH", "false").lower() == "true"
 USE_MOCK_HOTEL_SEARCH = os.getenv("USE_MOCK_HOTEL_SEARCH", "false").lower() == "true"
 
+# Seeded stand-in for Amadeus: backs the USE_MOCK_* searches, and every call when AMADEUS_SIMULATOR is set
+amadeus_simulator = AmadeusSimulator.from_settings()
+_simulated_transport = amadeus_simulator if settings.AMADEUS_SIMULATOR else None
+
+if _simulated_transport:
+    # The simulator needs no credentials, but the SDK refuses to start without them
+    AMADEUS_CLIENT_ID = AMADEUS_CLIENT_ID or "simulator"
+    AMADEUS_CLIENT_SECRET = AMADEUS_CLIENT_SECRET or "simulator"
+
+# Sync SDK client for the functions below that have no *_async twin in use. Its calls
+# bypass the rate limiter, quota and circuit breaker in amadeus_async; every route and
+# the voice path use the async twins.
 amadeus = Client(
     client_id=AMADEUS_CLIENT_ID,
     client_secret=AMADEUS_CLIENT_SECRET,
     hostname="production" if AMADEUS_ENV == "production" else "test",
+    **({"http": amadeus_simulator.sdk_http} if _simulated_transport else {}),
 )
 
+# One OAuth token for the SDK client and the async client
+amadeus_token_manager = AmadeusTokenManager(
+    AMADEUS_CLIENT_ID,
+    AMADEUS_CLIENT_SECRET,
+    base_url=amadeus_base_url(),
+    refresh_margin=settings.AMADEUS_TOKEN_REFRESH_MARGIN,
+    transport=_simulated_transport,
+)
+amadeus.access_token = SharedAccessToken(amadeus_token_manager)
+
+# Non-blocking client used by the *_async twins below; shares one pooled keep-alive connection set
+amadeus_async = AsyncAmadeusClient.from_settings(token_manager=amadeus_token_manager, transport=_simulated_transport)
+
+# Repeated voice queries for the same route/date are served from here instead of Amadeus
+flight_search_cache = SearchCache(
+    "flights",
+    ttl=settings.SEARCH_CACHE_TTL,
+    stale_ttl=settings.SEARCH_CACHE_STALE_TTL,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    stale_if_error=settings.SEARCH_CACHE_STALE_IF_ERROR,
+)
+hotel_search_cache = SearchCache(
+    "hotels",
+    ttl=settings.SEARCH_CACHE_TTL,
+    stale_ttl=settings.SEARCH_CACHE_STALE_TTL,
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    max_bytes=settings.SEARCH_CACHE_MAX_BYTES,
+    stale_if_error=settings.SEARCH_CACHE_STALE_IF_ERROR,
+)
+
+# Concurrent identical upstream calls (same search, same city lookup) share one request
+amadeus_singleflight = SingleFlight("amadeus")
+
 # Optional: known good cities for hotel search (for mock/demo/dev)
 WORKING_HOTEL_CITIES = ['NYC', 'LON', 'DEL', 'BOM', 'DXB', 'PAR', 'IST', 'MAN', 'SFO', 'SIN']
 
+# Valid and hotel-supported city codes: loaded from disk at startup, refreshed in the background
+reference_data = ReferenceDataStore(settings.REFERENCE_DATA_PATH, hotel_cities=WORKING_HOTEL_CITIES,
+                                    recheck_after=settings.REFERENCE_DATA_RECHECK_AFTER)
+
 
 def city_to_iata_code(city_name: str) -> Optional[str]:
-    """Use Amadeus API to dynamically find IATA code for a given city."""
+    """Resolve a city name to its IATA code, asking Amadeus only when the offline index misses."""
+    code = get_location_index().resolve(city_name)
+    if code:
+        return code
+    key = ("city", (city_name or "").strip().lower())
+    return amadeus_singleflight.do(key, lambda: _city_to_iata_code_uncached(city_name))
+
+
+@instrumented("amadeus", "city_to_iata_code")
+def _city_to_iata_code_uncached(city_name: str) -> Optional[str]:
     try:
         response = amadeus.reference_data.locations.get(
             keyword=city_name, subType="CITY"
@@ -42,49 +118,41 @@ def city_to_iata_code(city_name: str) -> Optional[str]:
         return None
 
 
+def _simulated_flight_offers(origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0):
+    try:
+        return amadeus_simulator.flight_offers(origin, destination, departure_date, adults, children,
+                                               max_offers=settings.AMADEUS_FLIGHT_SEARCH_MAX)
+    except ValueError:
+        logging.error(f"[Mock Flight Search] Invalid departure_date format: {departure_date}")
+        return {"error": "Invalid date format. Use YYYY-MM-DD."}
+
+
+def flight_search_key(origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0):
+    return (normalize_city_code(origin), normalize_city_code(destination), departure_date, int(adults), int(children))
+
+
+def hotel_search_key(city_code, check_in_date, check_out_date, adults=1):
+    return ((city_code or "").upper(), check_in_date, check_out_date, int(adults))
+
+
 def search_flights(origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0):
     """
     Search for flights using Amadeus API or mock data based on env.
+    Results are served from ``flight_search_cache`` when available.
     """
+    key = flight_search_key(origin, destination, departure_date, adults, children)
+    return flight_search_cache.get_or_load(
+        key,
+        lambda: amadeus_singleflight.do(("flights",) + key, lambda: _search_flights_uncached(origin, destination, departure_date, adults, children)),
+    )
+
+
+@instrumented("amadeus", "search_flights")
+def _search_flights_uncached(origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0):
     if USE_MOCK_FLIGHT_SEARCH:
-        logging.info("Using mock flight search data (USE_MOCK_FLIGHT_SEARCH=true)")
-        try:
-            departure_datetime = datetime.strptime(departure_date, "%Y-%m-%d")
-        except ValueError:
-            logging.error(f"[Mock Flight Search] Invalid departure_date format: {departure_date}")
-            return {"error": "Invalid date format. Use YYYY-MM-DD."}
-        arrival_datetime = departure_datetime + timedelta(hours=2)
-        return [
-            {
-                "type": "flight-offer",
-                "id": "mock1",
-                "source": "MOCK",
-                "itineraries": [
-                    {
-                        "duration": "PT2H",
-                        "segments": [
-                            {
-                                "departure": {
-                                    "iataCode": origin,
-                                    "at": departure_datetime.isoformat()
-                                },
-                                "arrival": {
-                                    "iataCode": destination,
-                                    "at": arrival_datetime.isoformat()
-                                },
-                                "carrierCode": "MO",
-                                "number": "123",
-                                "duration": "PT2H"
-                            }
-                        ]
-                    }
-                ],
-                "price": {
-                    "total": "100.00",
-                    "currency": "USD"
-                }
-            }
-        ]
+        logging.info("Using simulated flight search data (USE_MOCK_FLIGHT_SEARCH=true)")
+        amadeus_simulator.wait("/v2/shopping/flight-offers")
+        return _simulated_flight_offers(origin, destination, departure_date, adults, children)
     # Real Amadeus API call
     logging.info("Using Amadeus flight search (USE_MOCK_FLIGHT_SEARCH=false)")
     try:
@@ -93,7 +161,7 @@ def search_flights(origin: str, destination: str, departure_date: str, adults: i
             destinationLocationCode=destination,
             departureDate=departure_date,
             adults=adults,
-            max=5
+            max=settings.AMADEUS_FLIGHT_SEARCH_MAX
         )
         return response.data
     except ResponseError as e:
@@ -101,13 +169,14 @@ def search_flights(origin: str, destination: str, departure_date: str, adults: i
         return {"error": str(e)}
 
 
+@instrumented("amadeus")
 def validate_flight_offer(flight_offer):
     """
     Validate the selected flight offer using Amadeus Flight Offers Price API.
     """
     try:
-        payload = {"data": {"type": "flight-offers-pricing", "flightOffers": [flight_offer]}}
-        response = amadeus.shopping.flight_offers.pricing.post(payload)
+        # The SDK wraps the offer in the flight-offers-pricing envelope itself
+        response = amadeus.shopping.flight_offers.pricing.post(flight_offer)
         return response.data
     except ResponseError as error:
         logging.error(f"[Amadeus Flight Offer Validation Error] {error}")
@@ -115,25 +184,71 @@ def validate_flight_offer(flight_offer):
 
 
 def get_valid_city_codes():
-    """Fetch valid city codes from Amadeus API."""
-    try:
-        city_codes = []
-        keywords = ["hotel", "city", "airport"]
-        for keyword in keywords:
-            response = amadeus.reference_data.locations.get(keyword=keyword, subType="CITY")
-            if not response.data:
-                continue
-            city_codes.extend([location['iataCode'] for location in response.data if 'iataCode' in location])
-        unique_city_codes = list(set(city_codes))
-        logging.info(f"Fetched {len(unique_city_codes)} unique city codes from Amadeus API")
-        logging.info(f"Sample city codes: {unique_city_codes[:10]}")
-        return unique_city_codes
-    except ResponseError as error:
-        logging.error(f"[Amadeus City Codes Fetch Error] {error}")
+    """City codes Amadeus has confirmed, from the reference data store (no upstream call)."""
+    return sorted(reference_data.valid_city_codes)
+
+
+def _hotel_offer_params(city_code, check_in_date, check_out_date, adults):
+    return {
+        "cityCode": city_code,
+        "checkInDate": check_in_date,
+        "checkOutDate": check_out_date,
+        "adults": adults,
+        "roomQuantity": 1,
+        "bestRateOnly": True,
+        "paymentPolicy": "NONE",
+        "includeClosed": False,
+        "view": "FULL"
+    }
+
+
+def _summarize_hotel_offers(data, check_in_date, check_out_date, adults):
+    if not data:
+        logging.warning(f"[Amadeus Hotel Search]No hotel data returned.")
         return []
 
+    hotels = []
+    for offer in data:
+        hotel = offer.get("hotel", {})
+        first_offer = offer.get("offers", [{}])[0]
+        price_info = first_offer.get("price", {})
+
+        hotels.append({
+            "name": hotel.get("name"),
+            "cityCode": hotel.get("cityCode"),
+            "checkInDate": check_in_date,
+            "checkOutDate": check_out_date,
+            "adults": adults,
+            "price": price_info.get("total", "N/A"),
+            "currency": price_info.get("currency", "USD")
+        })
+
+    return hotels
+
+
+def _log_hotel_search_error(error):
+    logging.error(f"[Amadeus Hotel Error]{error}")
+    if hasattr(error, 'response'):
+        try:
+            logging.error("Amadeus Error Response: %s", error.response.data)
+        except Exception:
+            logging.error("No detailed response data available")
+
+    if hasattr(error, 'response') and error.response.status_code == 400:
+        logging.error("[Hotel Search]Bad request — possibly unsupported city. Returning empty list.")
+
 
 def search_hotels(city_code=None, check_in_date=None, check_out_date=None, adults=1):
+    key = hotel_search_key(city_code, check_in_date, check_out_date, adults)
+    hotels = hotel_search_cache.get_or_load(
+        key,
+        lambda: amadeus_singleflight.do(("hotels",) + key, lambda: _search_hotels_uncached(city_code, check_in_date, check_out_date, adults)),
+    )
+    return hotels if isinstance(hotels, list) else []
+
+
+@instrumented("amadeus", "search_hotels")
+def _search_hotels_uncached(city_code=None, check_in_date=None, check_out_date=None, adults=1):
     if not city_code or len(city_code) != 3:
         logging.error(f"[Amadeus Hotel Search] Invalid or missing city code: {city_code}")
         return []
@@ -141,96 +256,37 @@ def search_hotels(city_code=None, check_in_date=None, check_out_date=None, adult
     try:
         if USE_MOCK_HOTEL_SEARCH:
             logging.info("Using mock hotel search data due to sandbox or limited API plan.")
+            amadeus_simulator.wait("/v3/shopping/hotel-offers")
             return mock_hotel_search(city_code, check_in_date, check_out_date, adults)
 
-        # Validate city codes only once and cache it
-        if not hasattr(search_hotels, "_valid_city_codes"):
-            search_hotels._valid_city_codes = get_valid_city_codes()
-
-        if city_code not in search_hotels._valid_city_codes:
+        if not reference_data.is_valid_city(city_code):
             logging.error(f"[Amadeus Hotel Search] City code not in Amadeus valid list: {city_code}")
             return []
 
-        if city_code not in WORKING_HOTEL_CITIES:
+        if not reference_data.supports_hotels(city_code):
             logging.warning(f"[Amadeus Hotel Search]No hotel data expected for city: {city_code}")
             return []
 
         logging.info(f"🔍 Searching hotels for cityCode={city_code}, checkInDate={check_in_date}, checkOutDate={check_out_date}, adults={adults}")
 
-        params = {
-            "cityCode": city_code,
-            "checkInDate": check_in_date,
-            "checkOutDate": check_out_date,
-            "adults": adults,
-            "roomQuantity": 1,
-            "bestRateOnly": True,
-            "paymentPolicy": "NONE",
-            "includeClosed": False,
-            "view": "FULL"
-        }
-
+        params = _hotel_offer_params(city_code, check_in_date, check_out_date, adults)
         response = amadeus.shopping.hotel_offers_search.get(**params)
         logging.info(f"Amadeus responded: {response.status_code}")
-
-        if not response.data:
-            logging.warning(f"[Amadeus Hotel Search]No hotel data returned.")
-            return []
-
-        hotels = []
-        for offer in response.data:
-            hotel = offer.get("hotel", {})
-            first_offer = offer.get("offers", [{}])[0]
-            price_info = first_offer.get("price", {})
-
-            hotels.append({
-                "name": hotel.get("name"),
-                "cityCode": hotel.get("cityCode"),
-                "checkInDate": check_in_date,
-                "checkOutDate": check_out_date,
-                "adults": adults,
-                "price": price_info.get("total", "N/A"),
-                "currency": price_info.get("currency", "USD")
-            })
-
-        return hotels
+        return _summarize_hotel_offers(response.data, check_in_date, check_out_date, adults)
 
     except ResponseError as error:
-        logging.error(f"[Amadeus Hotel Error]{error}")
-        if hasattr(error, 'response'):
-            try:
-                logging.error("Amadeus Error Response: %s", error.response.data)
-            except Exception:
-                logging.error("No detailed response data available")
-
-        if hasattr(error, 'response') and error.response.status_code == 400:
-            logging.error("[Hotel Search]Bad request — possibly unsupported city. Returning empty list.")
-            return []
-
-        return []
+        _log_hotel_search_error(error)
+        return {"error": str(error)}  # lets the cache fall back to an expired result
 
 
 def mock_hotel_search(city_code, check_in_date, check_out_date, adults=1):
-    logging.info(f"Mocking hotel search for cityCode={city_code}, checkInDate={check_in_date}, checkOutDate={check_out_date}, adults={adults}")
-    return [
-        {
-            "hotelName": "Mock Hotel 1",
-            "cityCode": city_code,
-            "checkInDate": check_in_date,
-            "checkOutDate": check_out_date,
-            "adults": adults,
-            "price": 100.0,
-            "currency": "USD"
-        },
-        {
-            "hotelName": "Mock Hotel 2",
-            "cityCode": city_code,
-            "checkInDate": check_in_date,
-            "checkOutDate": check_out_date,
-            "adults": adults,
-            "price": 150.0,
-            "currency": "USD"
-        }
-    ]
+    logging.info(f"Simulating hotel search for cityCode={city_code}, checkInDate={check_in_date}, checkOutDate={check_out_date}, adults={adults}")
+    try:
+        data = amadeus_simulator.hotel_offers(city_code, check_in_date, check_out_date, adults)
+    except (TypeError, ValueError):
+        logging.error(f"[Mock Hotel Search] Invalid dates: {check_in_date} to {check_out_date}")
+        return []
+    return _summarize_hotel_offers(data, check_in_date, check_out_date, adults)
 
 
 def check_api_plan_and_environment():
@@ -243,6 +299,7 @@ def check_api_plan_and_environment():
     return plan, restrictions
 
 
+@instrumented("amadeus")
 def verify_amadeus_credentials():
     try:
         test_response = amadeus.reference_data.locations.get(keyword="NYC", subType="CITY")
@@ -253,6 +310,7 @@ def verify_amadeus_credentials():
         return False
 
 
+@instrumented("amadeus")
 def create_flight_order(order_data, travelers):
     try:
         logging.info("Simulating flight booking in sandbox environment.")
@@ -281,6 +339,7 @@ def create_flight_order(order_data, travelers):
         return None
 
 
+@instrumented("amadeus")
 def create_hotel_booking(booking_data, guests, payments):
     try:
         logging.info("Simulating hotel booking in sandbox environment.")
@@ -307,6 +366,7 @@ def create_hotel_booking(booking_data, guests, payments):
 
 # Additional Amadeus API endpoints implementation
 
+@instrumented("amadeus")
 def flight_inspiration_search(origin: str):
     try:
         response = amadeus.shopping.flight_destinations.get(origin=origin)
@@ -315,6 +375,7 @@ def flight_inspiration_search(origin: str):
         logging.error(f"[Flight Inspiration Search Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def flight_cheapest_date_search(origin: str, destination: str):
     try:
         response = amadeus.shopping.flight_dates.get(origin=origin, destination=destination)
@@ -323,6 +384,7 @@ def flight_cheapest_date_search(origin: str, destination: str):
         logging.error(f"[Flight Cheapest Date Search Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def flight_upselling_search(body: dict):
     try:
         response = amadeus.shopping.flight_offers.upselling.post(body)
@@ -331,6 +393,7 @@ def flight_upselling_search(body: dict):
         logging.error(f"[Flight Upselling Search Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def flight_seatmap_display_get(flight_order_id: str):
     try:
         response = amadeus.shopping.seatmaps.get(**{"flight-orderId": flight_order_id})
@@ -339,6 +402,7 @@ def flight_seatmap_display_get(flight_order_id: str):
         logging.error(f"[Flight Seatmap Display GET Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def flight_seatmap_display_post(body: dict):
     try:
         response = amadeus.shopping.seatmaps.post(body)
@@ -347,6 +411,7 @@ def flight_seatmap_display_post(body: dict):
         logging.error(f"[Flight Seatmap Display POST Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def trip_purpose_prediction(origin: str, destination: str, departure_date: str, return_date: str):
     try:
         response = amadeus.travel.predictions.trip_purpose.get(
@@ -360,6 +425,7 @@ def trip_purpose_prediction(origin: str, destination: str, departure_date: str,
         logging.error(f"[Trip Purpose Prediction Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def transfer_search(body: dict):
     try:
         response = amadeus.shopping.transfer_offers.post(body)
@@ -368,6 +434,7 @@ def transfer_search(body: dict):
         logging.error(f"[Transfer Search Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def transfer_booking(body: dict, offer_id: str):
     try:
         response = amadeus.ordering.transfer_orders.post(body, offerId=offer_id)
@@ -378,6 +445,7 @@ def transfer_booking(body: dict, offer_id: str):
 
 # Booking order management
 
+@instrumented("amadeus")
 def get_flight_order(order_id: str):
     try:
         response = amadeus.booking.flight_order(order_id).get()
@@ -386,6 +454,7 @@ def get_flight_order(order_id: str):
         logging.error(f"[Get Flight Order Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def update_flight_order(order_id: str, body: dict):
     try:
         response = amadeus.booking.flight_order(order_id).put(body)
@@ -394,6 +463,7 @@ def update_flight_order(order_id: str, body: dict):
         logging.error(f"[Update Flight Order Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def delete_flight_order(order_id: str):
     try:
         response = amadeus.booking.flight_order(order_id).delete()
@@ -402,6 +472,7 @@ def delete_flight_order(order_id: str):
         logging.error(f"[Delete Flight Order Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def get_hotel_order(order_id: str):
     try:
         response = amadeus.booking.hotel_order(order_id).get()
@@ -410,6 +481,7 @@ def get_hotel_order(order_id: str):
         logging.error(f"[Get Hotel Order Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def update_hotel_order(order_id: str, body: dict):
     try:
         response = amadeus.booking.hotel_order(order_id).put(body)
@@ -418,6 +490,7 @@ def update_hotel_order(order_id: str, body: dict):
         logging.error(f"[Update Hotel Order Error] {error}")
         return {"error": str(error)}
 
+@instrumented("amadeus")
 def delete_hotel_order(order_id: str):
     try:
         response = amadeus.booking.hotel_order(order_id).delete()
@@ -425,3 +498,219 @@ def delete_hotel_order(order_id: str):
     except ResponseError as error:
         logging.error(f"[Delete Hotel Order Error] {error}")
         return {"error": str(error)}
+
+
+# Async twins: same behaviour as the functions above, served over the pooled aiohttp client
+
+def _coalesce_async(key, fn):
+    """
+    One shared upstream call per key and priority, run at that priority.
+
+    The shared call starts from a clean context, so only what is passed on here
+    carries over: the priority, which is part of the key, and the caller's span,
+    so the upstream call is traced once, under the request that started it.
+    """
+    priority = current_priority()
+    span = current_span()
+
+    async def run():
+        with request_priority(priority), use_span(span):
+            return await fn()
+
+    return amadeus_singleflight.do_async(key + (priority,), run)
+
+
+async def city_to_iata_code_async(city_name: str) -> Optional[str]:
+    code = get_location_index().resolve(city_name)
+    if code:
+        return code
+    key = ("city", (city_name or "").strip().lower())
+    return await _coalesce_async(key, lambda: _city_to_iata_code_uncached_async(city_name))
+
+
+@instrumented("amadeus", "city_to_iata_code_async")
+async def _city_to_iata_code_uncached_async(city_name: str) -> Optional[str]:
+    try:
+        response = await amadeus_async.get("/v1/reference-data/locations", keyword=city_name, subType="CITY")
+        locations = response.data
+        if locations:
+            return locations[0]["iataCode"]
+        return None
+    except ResponseError as e:
+        logging.error(f"[Amadeus City Lookup Error] {e}")
+        return None
+
+
+@traced("search_cache.flights")
+async def search_flights_async(origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0):
+    key = flight_search_key(origin, destination, departure_date, adults, children)
+    return await flight_search_cache.get_or_load_async(
+        key,
+        lambda: _coalesce_async(("flights",) + key, lambda: _search_flights_uncached_async(origin, destination, departure_date, adults, children)),
+    )
+
+
+@instrumented("amadeus", "search_flights_async")
+async def _search_flights_uncached_async(origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0):
+    if USE_MOCK_FLIGHT_SEARCH:
+        logging.info("Using simulated flight search data (USE_MOCK_FLIGHT_SEARCH=true)")
+        await amadeus_simulator.wait_async("/v2/shopping/flight-offers")
+        return _simulated_flight_offers(origin, destination, departure_date, adults, children)
+    logging.info("Using Amadeus flight search (USE_MOCK_FLIGHT_SEARCH=false)")
+    try:
+        response = await amadeus_async.get(
+            "/v2/shopping/flight-offers",
+            originLocationCode=origin,
+            destinationLocationCode=destination,
+            departureDate=departure_date,
+            adults=adults,
+            max=settings.AMADEUS_FLIGHT_SEARCH_MAX
+        )
+        return response.data
+    except ResponseError as e:
+        logging.error(f"[Amadeus Flight Search Error] {e}")
+        return {"error": str(e)}
+
+
+@instrumented("amadeus")
+async def validate_flight_offer_async(flight_offer):
+    try:
+        payload = {"data": {"type": "flight-offers-pricing", "flightOffers": [flight_offer]}}
+        response = await amadeus_async.post("/v1/shopping/flight-offers/pricing", payload)
+        return response.data
+    except ResponseError as error:
+        logging.error(f"[Amadeus Flight Offer Validation Error] {error}")
+        return {"error": str(error)}
+
+
+@traced("search_cache.hotels")
+async def search_hotels_async(city_code=None, check_in_date=None, check_out_date=None, adults=1):
+    key = hotel_search_key(city_code, check_in_date, check_out_date, adults)
+    hotels = await hotel_search_cache.get_or_load_async(
+        key,
+        lambda: _coalesce_async(("hotels",) + key, lambda: _search_hotels_uncached_async(city_code, check_in_date, check_out_date, adults)),
+    )
+    return hotels if isinstance(hotels, list) else []
+
+
+@instrumented("amadeus", "search_hotels_async")
+async def _search_hotels_uncached_async(city_code=None, check_in_date=None, check_out_date=None, adults=1):
+    if not city_code or len(city_code) != 3:
+        logging.error(f"[Amadeus Hotel Search] Invalid or missing city code: {city_code}")
+        return []
+
+    try:
+        if USE_MOCK_HOTEL_SEARCH:
+            logging.info("Using mock hotel search data due to sandbox or limited API plan.")
+            await amadeus_simulator.wait_async("/v3/shopping/hotel-offers")
+            return mock_hotel_search(city_code, check_in_date, check_out_date, adults)
+
+        if not reference_data.is_valid_city(city_code):
+            logging.error(f"[Amadeus Hotel Search] City code not in Amadeus valid list: {city_code}")
+            return []
+
+        if not reference_data.supports_hotels(city_code):
+            logging.warning(f"[Amadeus Hotel Search]No hotel data expected for city: {city_code}")
+            return []
+
+        params = _hotel_offer_params(city_code, check_in_date, check_out_date, adults)
+        response = await amadeus_async.get("/v3/shopping/hotel-offers", **params)
+        logging.info(f"Amadeus responded: {response.status_code}")
+        return _summarize_hotel_offers(response.data, check_in_date, check_out_date, adults)
+
+    except ResponseError as error:
+        _log_hotel_search_error(error)
+        return {"error": str(error)}  # lets the cache fall back to an expired result
+
+
+@instrumented("amadeus")
+async def verify_amadeus_credentials_async():
+    try:
+        test_response = await amadeus_async.get("/v1/reference-data/locations", keyword="NYC", subType="CITY")
+        logging.info(f"Amadeus API credentials verified. Sample location data: {test_response.data}")
+        return True
+    except ResponseError as error:
+        logging.error(f"[Amadeus Credential Verification Error] {error}")
+        return False
+
+
+# Not instrumented: the sync functions they delegate to already count and record each booking
+async def create_flight_order_async(order_data, travelers):
+    # Bookings are simulated in the sandbox; no upstream call to await yet
+    return create_flight_order(order_data, travelers)
+
+
+async def create_hotel_booking_async(booking_data, guests, payments):
+    return create_hotel_booking(booking_data, guests, payments)
+
+
+async def _amadeus_data_async(label: str, method: str, path: str, body=None, **params):
+    try:
+        response = await amadeus_async.request(method, path, params=params, body=body)
+        return response.data
+    except ResponseError as error:
+        logging.error(f"[{label} Error] {error}")
+        return {"error": str(error)}
+
+
+@instrumented("amadeus")
+async def flight_inspiration_search_async(origin: str):
+    return await _amadeus_data_async("Flight Inspiration Search", "GET", "/v1/shopping/flight-destinations", origin=origin)
+
+@instrumented("amadeus")
+async def flight_cheapest_date_search_async(origin: str, destination: str):
+    return await _amadeus_data_async("Flight Cheapest Date Search", "GET", "/v1/shopping/flight-dates", origin=origin, destination=destination)
+
+@instrumented("amadeus")
+async def flight_upselling_search_async(body: dict):
+    return await _amadeus_data_async("Flight Upselling Search", "POST", "/v1/shopping/flight-offers/upselling", body=body)
+
+@instrumented("amadeus")
+async def flight_seatmap_display_get_async(flight_order_id: str):
+    return await _amadeus_data_async("Flight Seatmap Display GET", "GET", "/v1/shopping/seatmaps", **{"flight-orderId": flight_order_id})
+
+@instrumented("amadeus")
+async def flight_seatmap_display_post_async(body: dict):
+    return await _amadeus_data_async("Flight Seatmap Display POST", "POST", "/v1/shopping/seatmaps", body=body)
+
+@instrumented("amadeus")
+async def trip_purpose_prediction_async(origin: str, destination: str, departure_date: str, return_date: str):
+    return await _amadeus_data_async(
+        "Trip Purpose Prediction", "GET", "/v1/travel/predictions/trip-purpose",
+        originLocationCode=origin,
+        destinationLocationCode=destination,
+        departureDate=departure_date,
+        returnDate=return_date
+    )
+
+@instrumented("amadeus")
+async def transfer_search_async(body: dict):
+    return await _amadeus_data_async("Transfer Search", "POST", "/v1/shopping/transfer-offers", body=body)
+
+@instrumented("amadeus")
+async def transfer_booking_async(body: dict, offer_id: str):
+    return await _amadeus_data_async("Transfer Booking", "POST", "/v1/ordering/transfer-orders", body=body, offerId=offer_id)
+
+@instrumented("amadeus")
+async def get_flight_order_async(order_id: str):
+    return await _amadeus_data_async("Get Flight Order", "GET", f"/v1/booking/flight-orders/{order_id}")
+
+@instrumented("amadeus")
+async def update_flight_order_async(order_id: str, body: dict):
+    return await _amadeus_data_async("Update Flight Order", "PUT", f"/v1/booking/flight-orders/{order_id}", body=body)
+
+@instrumented("amadeus")
+async def delete_flight_order_async(order_id: str):
+    return await _amadeus_data_async("Delete Flight Order", "DELETE", f"/v1/booking/flight-orders/{order_id}")
+
+@instrumented("amadeus")
+async def get_hotel_order_async(order_id: str):
+    return await _amadeus_data_async("Get Hotel Order", "GET", f"/v2/booking/hotel-orders/{order_id}")
+
+@instrumented("amadeus")
+async def update_hotel_order_async(order_id: str, body: dict):
+    return await _amadeus_data_async("Update Hotel Order", "PUT", f"/v2/booking/hotel-orders/{order_id}", body=body)
+
+@instrumented("amadeus")
+async def delete_hotel_order_async(order_id: str):
+    return await _amadeus_data_async("Delete Hotel Order", "DELETE", f"/v2/booking/hotel-orders/{order_id}")
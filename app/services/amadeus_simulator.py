@@ -0,0 +1,497 @@
+# app/services/amadeus_simulator.py
+import asyncio
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from app.config import settings
+from app.services.location_index import get_location_index
+from app.services.rate_limiter import api_family
+
+logger = logging.getLogger(__name__)
+
+AIRLINES = {
+    "AI": "AIR INDIA", "6E": "INDIGO", "UK": "VISTARA", "EK": "EMIRATES", "QR": "QATAR AIRWAYS",
+    "EY": "ETIHAD AIRWAYS", "LH": "LUFTHANSA", "BA": "BRITISH AIRWAYS", "AF": "AIR FRANCE",
+    "SQ": "SINGAPORE AIRLINES", "TK": "TURKISH AIRLINES", "UA": "UNITED AIRLINES",
+}
+# Connection points, roughly where the carriers above route through
+HUBS = {
+    "AI": ["DEL", "BOM"], "6E": ["DEL", "BLR"], "UK": ["DEL", "BOM"], "EK": ["DXB"], "QR": ["DOH"],
+    "EY": ["AUH"], "LH": ["FRA", "MUC"], "BA": ["LHR"], "AF": ["CDG"], "SQ": ["SIN"], "TK": ["IST"],
+    "UA": ["EWR", "ORD"],
+}
+AIRCRAFT = ["320", "321", "32N", "738", "7M8", "788", "789", "77W", "359", "388"]
+CABINS = [("ECONOMY", "Y", 1.0), ("PREMIUM_ECONOMY", "W", 1.7), ("BUSINESS", "J", 3.4)]
+HOTEL_CHAINS = ["HI", "MC", "RT", "HY", "WI", "BW", "IC", "SB"]
+HOTEL_WORDS = ["Grand", "Plaza", "Royal", "Park", "Central", "Harbour", "Garden", "Palace", "Residency", "Suites"]
+ROOM_TYPES = [("A1K", "STANDARD_ROOM", 1, "KING"), ("B2T", "SUPERIOR_ROOM", 2, "TWIN"),
+              ("C1Q", "DELUXE_ROOM", 1, "QUEEN"), ("S1K", "SUITE", 1, "KING")]
+
+_ORDER_PATH = re.compile(r"^/v[12]/booking/(flight|hotel)-orders(?:/([^/]+))?$")
+
+
+def _rng(*parts) -> random.Random:
+    # String seeds hash deterministically across processes (unlike hash())
+    return random.Random("|".join(str(part) for part in parts))
+
+
+def _iso_duration(minutes: int) -> str:
+    hours, minutes = divmod(minutes, 60)
+    return f"PT{hours}H{minutes}M" if minutes else f"PT{hours}H"
+
+
+def _money(value: float) -> str:
+    return f"{value:.2f}"
+
+
+def parse_latency(spec: str) -> Dict[str, Tuple[float, float]]:
+    """``"shopping=400:0.6,default=80"`` -> {"shopping": (400.0, 0.6), "default": (80.0, 0.4)}: median ms, log-sigma."""
+    latency = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        family, _, value = item.partition("=")
+        median, _, sigma = value.partition(":")
+        try:
+            latency[family.strip()] = (float(median), float(sigma) if sigma else 0.4)
+        except ValueError:
+            logger.warning(f"[Amadeus Simulator] Ignoring bad latency {item!r}")
+    return latency
+
+
+def _error(status: int, title: str, detail: str = "") -> Tuple[int, dict]:
+    return status, {"errors": [{"status": status, "code": 0, "title": title, "detail": detail}]}
+
+
+class AmadeusSimulator:
+    """
+    Seeded, in-process stand-in for the Amadeus self-service APIs.
+
+    The same query always yields the same payload, shaped like the real one and at
+    the real one's size: tens to hundreds of multi-segment flight offers with a
+    ``travelerPricings`` entry per passenger, hotel offers with room and policy
+    detail, pricing, seatmaps and stateful orders. Latency per API family is
+    lognormal around a median, and a share of calls can fail with a 500.
+
+    ``respond`` is the pure request -> (status, payload) mapping; ``sdk_http`` and
+    ``send`` plug it into the SDK client and ``AsyncAmadeusClient`` as transports.
+    """
+
+    def __init__(self, seed: int = 0, latency: Optional[Dict[str, Tuple[float, float]]] = None,
+                 error_rate: float = 0.0, min_offers: int = 30, max_offers: int = 250):
+        self.seed = seed
+        self.latency = latency or {}
+        self.error_rate = error_rate
+        self.min_offers = min_offers
+        self.max_offers = max_offers
+        self._random = random.Random(seed)  # latency and injected errors only; payloads use per-query seeds
+        self._orders: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @classmethod
+    def from_settings(cls) -> "AmadeusSimulator":
+        return cls(
+            seed=settings.AMADEUS_SIMULATOR_SEED,
+            latency=parse_latency(settings.AMADEUS_SIMULATOR_LATENCY),
+            error_rate=settings.AMADEUS_SIMULATOR_ERROR_RATE,
+        )
+
+    # Latency and failures
+
+    def sample_latency(self, path: str) -> float:
+        median, sigma = self.latency.get(api_family(path)) or self.latency.get("default") or (0.0, 0.0)
+        if median <= 0:
+            return 0.0
+        with self._lock:
+            return median * math.exp(sigma * self._random.gauss(0.0, 1.0)) / 1000
+
+    def wait(self, path: str):
+        delay = self.sample_latency(path)
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self, path: str):
+        delay = self.sample_latency(path)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _fails(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    # Payload generators
+
+    def _city_name(self, code: str) -> str:
+        location = get_location_index().by_code(code)
+        return location.name.title() if location else code
+
+    def flight_offers(self, origin: str, destination: str, departure_date: str, adults: int = 1,
+                      children: int = 0, max_offers: Optional[int] = None) -> List[dict]:
+        """Offers for one one-way search, cheapest first like Amadeus; raises ValueError on a bad date."""
+        day = datetime.strptime(departure_date, "%Y-%m-%d")
+        origin, destination = origin.upper(), destination.upper()
+        route = _rng(self.seed, origin, destination)
+        base_fare = route.uniform(70, 650)  # stable per route, so dates only move prices a little
+        block_minutes = route.randrange(55, 720, 5)
+        rng = _rng(self.seed, origin, destination, departure_date, adults, children)
+        count = rng.randint(self.min_offers, self.max_offers)
+        if max_offers:
+            count = min(count, int(max_offers))
+        travelers = ["ADULT"] * max(int(adults), 1) + ["CHILD"] * max(int(children), 0)
+        offers = []
+        for i in range(count):
+            carrier = rng.choice(list(AIRLINES))
+            stops = rng.choices((0, 1, 2), weights=(5, 4, 1))[0]
+            vias = [hub for hub in HUBS[carrier] if hub not in (origin, destination)]
+            points = [origin] + rng.sample(vias, min(stops, len(vias))) + [destination]
+            at = day + timedelta(minutes=rng.randrange(0, 24 * 60, 5))
+            segments, first_departure = [], at
+            for leg in range(len(points) - 1):
+                minutes = max(int(block_minutes / (len(points) - 1) * rng.uniform(0.8, 1.3)) // 5 * 5, 45)
+                arrival = at + timedelta(minutes=minutes)
+                segments.append({
+                    "departure": {"iataCode": points[leg], "terminal": str(rng.randint(1, 3)), "at": at.isoformat()},
+                    "arrival": {"iataCode": points[leg + 1], "terminal": str(rng.randint(1, 3)), "at": arrival.isoformat()},
+                    "carrierCode": carrier,
+                    "number": str(rng.randrange(10, 9999)),
+                    "aircraft": {"code": rng.choice(AIRCRAFT)},
+                    "operating": {"carrierCode": carrier},
+                    "duration": _iso_duration(minutes),
+                    "id": str(len(segments) + 1),
+                    "numberOfStops": 0,
+                    "blacklistedInEU": False,
+                })
+                at = arrival + timedelta(minutes=rng.randrange(50, 240, 5))
+            total_minutes = int((arrival - first_departure).total_seconds() // 60)
+            cabin, booking_class, multiplier = rng.choices(CABINS, weights=(8, 1, 1))[0]
+            adult_fare = base_fare * multiplier * (1 - 0.12 * len(segments) + 0.12) * rng.uniform(0.8, 1.6)
+            traveler_pricings, grand_total, base_total = [], 0.0, 0.0
+            for traveler_id, traveler_type in enumerate(travelers, start=1):
+                fare = adult_fare * (0.75 if traveler_type == "CHILD" else 1.0)
+                taxes = fare * 0.18
+                grand_total += fare + taxes
+                base_total += fare
+                traveler_pricings.append({
+                    "travelerId": str(traveler_id),
+                    "fareOption": "STANDARD",
+                    "travelerType": traveler_type,
+                    "price": {"currency": "USD", "total": _money(fare + taxes), "base": _money(fare)},
+                    "fareDetailsBySegment": [{
+                        "segmentId": segment["id"],
+                        "cabin": cabin,
+                        "fareBasis": f"{booking_class}{rng.choice('LKMNQ')}{carrier}{rng.randint(1, 9)}",
+                        "brandedFare": cabin[:5] + "LT" if cabin == "ECONOMY" else cabin[:5] + "FX",
+                        "class": booking_class,
+                        "includedCheckedBags": {"quantity": 0 if cabin == "ECONOMY" and rng.random() < 0.3 else 1},
+                    } for segment in segments],
+                })
+            offers.append({
+                "type": "flight-offer",
+                "id": str(i + 1),
+                "source": "GDS",
+                "instantTicketingRequired": False,
+                "nonHomogeneous": False,
+                "oneWay": False,
+                "lastTicketingDate": (day - timedelta(days=1)).date().isoformat(),
+                "numberOfBookableSeats": rng.randint(1, 9),
+                "itineraries": [{"duration": _iso_duration(total_minutes), "segments": segments}],
+                "price": {
+                    "currency": "USD",
+                    "total": _money(grand_total),
+                    "base": _money(base_total),
+                    "fees": [{"amount": "0.00", "type": "SUPPLIER"}, {"amount": "0.00", "type": "TICKETING"}],
+                    "grandTotal": _money(grand_total),
+                },
+                "pricingOptions": {"fareType": ["PUBLISHED"], "includedCheckedBagsOnly": False},
+                "validatingAirlineCodes": [carrier],
+                "travelerPricings": traveler_pricings,
+            })
+        offers.sort(key=lambda offer: float(offer["price"]["grandTotal"]))
+        for i, offer in enumerate(offers, start=1):
+            offer["id"] = str(i)
+        return offers
+
+    def hotel_offers(self, city_code: str, check_in: str, check_out: str, adults: int = 1) -> List[dict]:
+        """Raw ``/v3/shopping/hotel-offers`` data, one best-rate offer per hotel, cheapest first."""
+        city_code = city_code.upper()
+        day_in = datetime.strptime(check_in, "%Y-%m-%d")
+        nights = max((datetime.strptime(check_out, "%Y-%m-%d") - day_in).days, 1) if check_out else 1
+        city = _rng(self.seed, city_code)
+        city_name = self._city_name(city_code)
+        hotels = [(f"{city.choice(HOTEL_CHAINS)}{city_code}{n:03d}", city.random()) for n in range(city.randint(20, 80))]
+        rng = _rng(self.seed, city_code, check_in, check_out, adults)
+        latitude, longitude = city.uniform(-60, 60), city.uniform(-180, 180)
+        data = []
+        for hotel_id, tier in hotels:
+            if rng.random() < 0.25:
+                continue  # sold out for these dates
+            name_rng = _rng(self.seed, hotel_id)
+            nightly = (50 + 450 * tier ** 2) * rng.uniform(0.85, 1.3) * (1 + 0.15 * (max(int(adults), 1) - 1))
+            room_code, category, beds, bed_type = name_rng.choice(ROOM_TYPES)
+            changes = [{
+                "startDate": (day_in + timedelta(days=n)).date().isoformat(),
+                "endDate": (day_in + timedelta(days=n + 1)).date().isoformat(),
+                "base": _money(nightly * rng.uniform(0.95, 1.1)),
+            } for n in range(nights)]
+            base = sum(float(change["base"]) for change in changes)
+            offer_id = uuid.UUID(int=rng.getrandbits(128)).hex[:10].upper()
+            data.append({
+                "type": "hotel-offers",
+                "hotel": {
+                    "type": "hotel",
+                    "hotelId": hotel_id,
+                    "chainCode": hotel_id[:2],
+                    "dupeId": str(700000000 + name_rng.randrange(10 ** 6)),
+                    "name": f"{name_rng.choice(HOTEL_WORDS)} {city_name} {name_rng.choice(HOTEL_WORDS)}".upper(),
+                    "cityCode": city_code,
+                    "latitude": round(latitude + name_rng.uniform(-0.1, 0.1), 5),
+                    "longitude": round(longitude + name_rng.uniform(-0.1, 0.1), 5),
+                },
+                "available": True,
+                "offers": [{
+                    "id": offer_id,
+                    "checkInDate": check_in,
+                    "checkOutDate": (day_in + timedelta(days=nights)).date().isoformat(),
+                    "rateCode": rng.choice(["RAC", "BAR", "PRO"]),
+                    "room": {
+                        "type": room_code,
+                        "typeEstimated": {"category": category, "beds": beds, "bedType": bed_type},
+                        "description": {"text": f"{category.replace('_', ' ').title()}, {beds} {bed_type.lower()} bed(s), free WiFi",
+                                        "lang": "EN"},
+                    },
+                    "guests": {"adults": max(int(adults), 1)},
+                    "price": {
+                        "currency": "USD",
+                        "base": _money(base),
+                        "total": _money(base * 1.12),
+                        "variations": {"average": {"base": _money(base / nights)}, "changes": changes},
+                    },
+                    "policies": {
+                        "paymentType": "guarantee",
+                        "cancellation": {"deadline": (day_in - timedelta(days=1)).isoformat() + "+00:00",
+                                         "amount": _money(base / nights)},
+                    },
+                    "self": f"https://test.api.amadeus.com/v3/shopping/hotel-offers/{offer_id}",
+                }],
+                "self": f"https://test.api.amadeus.com/v3/shopping/hotel-offers?hotelIds={hotel_id}",
+            })
+        data.sort(key=lambda entry: float(entry["offers"][0]["price"]["total"]))
+        return data
+
+    def price_offers(self, offers: List[dict]) -> dict:
+        """A ``flight-offers-pricing`` result: the offers confirmed, with taxes broken out."""
+        priced = []
+        for offer in offers:
+            offer = json.loads(json.dumps(offer))
+            offer["instantTicketingRequired"] = False
+            for pricing in offer.get("travelerPricings", []):
+                price = pricing.get("price", {})
+                base = float(price.get("base") or 0)
+                price["taxes"] = [{"amount": _money(base * 0.1), "code": "YQ"}, {"amount": _money(base * 0.08), "code": "K3"}]
+                price["refundableTaxes"] = _money(base * 0.08)
+            priced.append(offer)
+        return {
+            "type": "flight-offers-pricing",
+            "flightOffers": priced,
+            "bookingRequirements": {"emailAddressRequired": True, "mobilePhoneNumberRequired": True},
+        }
+
+    def seatmaps(self, offers: List[dict]) -> List[dict]:
+        """One seatmap per segment of each offer; occupancy is seeded by the flight."""
+        maps = []
+        for offer in offers:
+            travelers = [pricing["travelerId"] for pricing in offer.get("travelerPricings", [])] or ["1"]
+            for itinerary in offer.get("itineraries", []):
+                for segment in itinerary.get("segments", []):
+                    rng = _rng(self.seed, segment.get("carrierCode"), segment.get("number"), segment["departure"].get("at"))
+                    rows, seats = rng.randint(25, 40), []
+                    for row in range(1, rows + 1):
+                        for x, letter in enumerate("ABCDEF"):
+                            window, aisle = letter in "AF", letter in "CD"
+                            seats.append({
+                                "cabin": "ECONOMY",
+                                "number": f"{row}{letter}",
+                                "characteristicsCodes": ["W" if window else "A" if aisle else "9", "CH"],
+                                "travelerPricing": [{
+                                    "travelerId": traveler,
+                                    "seatAvailabilityStatus": "OCCUPIED" if rng.random() < 0.6 else "AVAILABLE",
+                                    "price": {"currency": "USD", "total": _money(rng.choice((0, 0, 9, 15, 25)))},
+                                } for traveler in travelers],
+                                "coordinates": {"x": row, "y": x + (1 if x > 2 else 0)},
+                            })
+                    maps.append({
+                        "type": "seatmap",
+                        "id": str(len(maps) + 1),
+                        "departure": segment["departure"],
+                        "arrival": segment["arrival"],
+                        "carrierCode": segment.get("carrierCode"),
+                        "number": segment.get("number"),
+                        "aircraft": segment.get("aircraft", {"code": "320"}),
+                        "flightOfferId": offer.get("id"),
+                        "segmentId": segment.get("id"),
+                        "decks": [{
+                            "deckType": "MAIN",
+                            "deckConfiguration": {"width": 7, "length": rows, "startSeatRow": 1, "endSeatRow": rows,
+                                                  "exitRowsX": [12, 13]},
+                            "seats": seats,
+                        }],
+                    })
+        return maps
+
+    def create_order(self, kind: str, body: dict) -> dict:
+        data = dict(body.get("data", body))
+        order_id = uuid.UUID(int=_rng(self.seed, kind, json.dumps(data, sort_keys=True), len(self._orders)).getrandbits(128)).hex
+        reference = order_id[:6].upper()
+        order = {**data, "type": f"{kind}-order", "id": order_id,
+                 "associatedRecords": [{"reference": reference, "creationDate": datetime.utcnow().isoformat(timespec="seconds"),
+                                        "originSystemCode": "GDS"}]}
+        with self._lock:
+            self._orders[order_id] = order
+        return order
+
+    # Request dispatch
+
+    def respond(self, method: str, path: str, params: Optional[dict] = None, body=None) -> Tuple[int, Optional[dict]]:
+        """Map one Amadeus call to ``(status, payload)``; unknown endpoints are 404s."""
+        params = params or {}
+        self.calls += 1
+        if path == "/v1/security/oauth2/token":
+            return 200, {"type": "amadeusOAuth2Token", "access_token": f"simulated-{uuid.uuid4().hex}",
+                         "token_type": "Bearer", "expires_in": 1799, "state": "approved"}
+        if self._fails():
+            return _error(500, "INTERNAL ERROR", "simulated upstream failure")
+        try:
+            return self._route(method.upper(), path, params, body if isinstance(body, dict) else {})
+        except (KeyError, ValueError, TypeError) as e:
+            return _error(400, "INVALID FORMAT", str(e))
+
+    def _route(self, method: str, path: str, params: dict, body: dict) -> Tuple[int, Optional[dict]]:
+        if path == "/v2/shopping/flight-offers" and method == "GET":
+            offers = self.flight_offers(params["originLocationCode"], params["destinationLocationCode"],
+                                        params["departureDate"], int(params.get("adults", 1)),
+                                        int(params.get("children", 0)), int(params.get("max", 250)))
+            return 200, {"meta": {"count": len(offers)}, "data": offers}
+        if path == "/v1/shopping/flight-offers/pricing":
+            return 200, {"data": self.price_offers(body["data"]["flightOffers"])}
+        if path == "/v1/shopping/flight-offers/upselling":
+            offer = body["data"]["flightOffers"][0]
+            upsold = []
+            for name, _, multiplier in CABINS:
+                variant = json.loads(json.dumps(offer))
+                for pricing in variant.get("travelerPricings", []):
+                    for detail in pricing["fareDetailsBySegment"]:
+                        detail["cabin"] = name
+                total = float(offer["price"]["grandTotal"]) * multiplier
+                variant["price"].update(total=_money(total), grandTotal=_money(total))
+                upsold.append(variant)
+            return 200, {"data": upsold}
+        if path == "/v1/shopping/seatmaps":
+            if method == "GET":
+                order = self._orders.get(params.get("flight-orderId", ""))
+                if order is None:
+                    return _error(404, "RESOURCE NOT FOUND", "flight order not found")
+                return 200, {"data": self.seatmaps(order.get("flightOffers", []))}
+            return 200, {"data": self.seatmaps(body["data"])}
+        if path == "/v3/shopping/hotel-offers":
+            return 200, {"data": self.hotel_offers(params["cityCode"], params["checkInDate"],
+                                                   params.get("checkOutDate"), int(params.get("adults", 1)))}
+        if path == "/v1/reference-data/locations/hotels/by-city":
+            return 200, {"data": [entry["hotel"] for entry in self.hotel_offers(
+                params["cityCode"], time.strftime("%Y-%m-%d"), None)]}
+        if path == "/v1/reference-data/locations":
+            location = get_location_index().lookup(params.get("keyword", ""))
+            return 200, {"data": [{"type": "location", "subType": "CITY", "name": location.name.upper(),
+                                   "iataCode": location.city_code}] if location else []}
+        if path == "/v1/shopping/flight-destinations":
+            rng = _rng(self.seed, "destinations", params["origin"])
+            cities = sorted(get_location_index().cities)
+            return 200, {"data": [{"type": "flight-destination", "origin": params["origin"], "destination": code,
+                                   "price": {"total": _money(rng.uniform(60, 900))}}
+                                  for code in rng.sample(cities, min(40, len(cities)))]}
+        if path == "/v1/shopping/flight-dates":
+            today = datetime.utcnow()
+            return 200, {"data": [{"type": "flight-date", "origin": params["origin"], "destination": params["destination"],
+                                   "departureDate": (today + timedelta(days=n)).date().isoformat(),
+                                   "price": {"total": _money(_rng(self.seed, params["origin"], params["destination"], n).uniform(60, 900))}}
+                                  for n in range(1, 61)]}
+        if path == "/v1/travel/predictions/trip-purpose":
+            business = _rng(self.seed, params["originLocationCode"], params["destinationLocationCode"]).random()
+            return 200, {"data": {"type": "prediction", "subType": "trip-purpose-prediction",
+                                  "result": "BUSINESS" if business > 0.5 else "LEISURE", "probability": f"{max(business, 1 - business):.3f}"}}
+        if path == "/v1/shopping/transfer-offers":
+            rng = _rng(self.seed, "transfer", json.dumps(body, sort_keys=True))
+            return 200, {"data": [{"type": "transfer-offer", "id": str(n + 1), "transferType": "PRIVATE",
+                                   "quotation": {"monetaryAmount": _money(rng.uniform(20, 150)), "currencyCode": "USD"}}
+                                  for n in range(rng.randint(3, 12))]}
+        if path == "/v1/ordering/transfer-orders":
+            return 201, {"data": self.create_order("transfer", body)}
+        match = _ORDER_PATH.match(path)
+        if match:
+            return self._order(method, match.group(1), match.group(2), body)
+        return _error(404, "RESOURCE NOT FOUND", f"{method} {path} is not simulated")
+
+    def _order(self, method: str, kind: str, order_id: Optional[str], body: dict) -> Tuple[int, Optional[dict]]:
+        if order_id is None:
+            return (201, {"data": self.create_order(kind, body)}) if method == "POST" else _error(405, "METHOD NOT ALLOWED")
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None:
+                return _error(404, "RESOURCE NOT FOUND", f"{kind} order {order_id} not found")
+            if method == "DELETE":
+                del self._orders[order_id]
+                return 204, None
+            if method in ("PUT", "PATCH"):
+                order.update({key: value for key, value in body.get("data", body).items() if key not in ("id", "type")})
+        return 200, {"data": order}
+
+    # Transports
+
+    def sdk_http(self, request):
+        """Drop-in for ``urlopen`` as the SDK client's ``http`` option."""
+        url = urlsplit(request.full_url)
+        body = json.loads(request.data) if request.data else None
+        self.wait(url.path)
+        status, payload = self.respond(request.get_method(), url.path, dict(parse_qsl(url.query)), body)
+        return _SimulatedResponse(status, payload)
+
+    async def send(self, method: str, path: str, params: dict, body, timeout: Optional[float] = None):
+        """``(status, text, headers)`` for ``AsyncAmadeusClient``; raises TimeoutError past ``timeout``."""
+        delay = self.sample_latency(path)
+        if timeout and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError()
+        if delay:
+            await asyncio.sleep(delay)
+        status, payload = self.respond(method, path, params, body)
+        return status, json.dumps(payload) if payload is not None else "", dict(_SimulatedResponse.HEADERS)
+
+    def token(self) -> Tuple[int, str]:
+        status, payload = self.respond("POST", "/v1/security/oauth2/token")
+        return status, json.dumps(payload)
+
+
+class _SimulatedResponse:
+    """The bits of ``http.client.HTTPResponse`` the SDK's parser reads."""
+
+    HEADERS = [("Content-Type", "application/vnd.amadeus+json")]
+
+    def __init__(self, status: int, payload: Optional[dict]):
+        self.status = status
+        self.code = status
+        self._body = json.dumps(payload).encode() if payload is not None else b""
+
+    def getheaders(self):
+        return self.HEADERS
+
+    def read(self) -> bytes:
+        return self._body
@@ -1,23 +1,73 @@
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from app.config import settings
+from app.utils.metrics import instrumented
+from typing import List, Optional
 import datetime
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_BATCH_LIMIT = 50  # Calendar API limit on calls per batch request
+
+_discovery_doc = None
+_credentials = None
+_generation = 0
+_client_lock = threading.Lock()
+_local = threading.local()
+
+def calendar_configured() -> bool:
+    return bool(settings.GOOGLE_REFRESH_TOKEN and settings.GOOGLE_CLIENT_ID and settings.GOOGLE_CLIENT_SECRET)
+
+def _calendar_discovery_doc() -> dict:
+    # The discovery document bundled with googleapiclient, parsed once per process
+    global _discovery_doc
+    if _discovery_doc is None:
+        doc = json.loads(get_static_doc("calendar", "v3"))
+        if settings.GOOGLE_CALENDAR_ROOT_URL:
+            doc["rootUrl"] = settings.GOOGLE_CALENDAR_ROOT_URL.rstrip("/") + "/"
+        _discovery_doc = doc
+    return _discovery_doc
+
+def _calendar_credentials() -> Credentials:
+    global _credentials
+    if _credentials is None:
+        _credentials = Credentials(
+            None,
+            refresh_token=settings.GOOGLE_REFRESH_TOKEN,
+            client_id=settings.GOOGLE_CLIENT_ID,
+            client_secret=settings.GOOGLE_CLIENT_SECRET,
+            token_uri=settings.GOOGLE_TOKEN_URI
+        )
+    return _credentials
+
+def reset_calendar_client():
+    """Drop cached clients, e.g. after changing the endpoint settings."""
+    global _discovery_doc, _credentials, _generation
+    with _client_lock:
+        _discovery_doc = None
+        _credentials = None
+        _generation += 1
 
 def get_calendar_service():
-    creds = Credentials(
-        None,
-        refresh_token=settings.GOOGLE_REFRESH_TOKEN,
-        client_id=settings.GOOGLE_CLIENT_ID,
-        client_secret=settings.GOOGLE_CLIENT_SECRET,
-        token_uri="https://oauth2.googleapis.com/token"
-    )
-    service = build('calendar', 'v3', credentials=creds)
+    # httplib2 connections are not thread-safe, so each thread keeps its own client;
+    # the parsed discovery document and the OAuth credentials are shared.
+    service = getattr(_local, "service", None)
+    if service is None or _local.generation != _generation:
+        with _client_lock:
+            doc, creds, generation = _calendar_discovery_doc(), _calendar_credentials(), _generation
+        service = build_from_document(doc, credentials=creds)
+        _local.service, _local.generation = service, generation
     return service
 
-def create_event(summary, description, start_time, end_time, attendees_emails):
-    service = get_calendar_service()
-    event = {
+def _event_body(summary, description, start_time, end_time, attendees_emails):
+    return {
         'summary': summary,
         'description': description,
         'start': {
@@ -30,9 +80,134 @@ def create_event(summary, description, start_time, end_time, attendees_emails):
         },
         'attendees': [{'email': email} for email in attendees_emails],
     }
+
+@instrumented("calendar")
+def create_event(summary, description, start_time, end_time, attendees_emails):
+    service = get_calendar_service()
+    event = _event_body(summary, description, start_time, end_time, attendees_emails)
     try:
-        created_event = service.events().insert(calendarId='primary', body=event).execute()
+        created_event = service.events().insert(calendarId=settings.GOOGLE_CALENDAR_ID, body=event).execute()
         return created_event
     except HttpError as error:
-        print(f"An error occurred: {error}")
+        logger.error(f"[Calendar Error] {error}")
+        return None
+
+@instrumented("calendar")
+def create_events(events: List[dict], calendar_id: Optional[str] = None) -> List[Optional[dict]]:
+    """
+    Insert many events using batch requests of up to 50 calls each.
+
+    Returns the created events in input order, with None where an insert failed.
+    """
+    service = get_calendar_service()
+    calendar_id = calendar_id or settings.GOOGLE_CALENDAR_ID
+    results = [None] * len(events)
+
+    def on_response(request_id, response, exception):
+        if exception is not None:
+            logger.error(f"[Calendar Error] event {request_id}: {exception}")
+        else:
+            results[int(request_id)] = response
+
+    for start in range(0, len(events), CALENDAR_BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=on_response)
+        for index in range(start, min(start + CALENDAR_BATCH_LIMIT, len(events))):
+            batch.add(service.events().insert(calendarId=calendar_id, body=events[index]), request_id=str(index))
+        try:
+            batch.execute()
+        except HttpError as error:
+            logger.error(f"[Calendar Batch Error] {error}")
+    return results
+
+def booking_event(booking: dict) -> Optional[dict]:
+    """All-day calendar entry for a stored booking; None if it has no travel date."""
+    departure = booking.get("departure_date")
+    if not departure or not booking.get("email"):
         return None
+    if isinstance(departure, str):
+        departure = datetime.date.fromisoformat(departure)
+    route = " to ".join(code for code in (booking.get("origin"), booking.get("destination")) if code)
+    details = [f"Booking #{booking['id']}" if booking.get("id") else None, booking.get("flight_number")]
+    return {
+        'summary': f"Flight {route}".strip() if route else "Trip",
+        'description': ", ".join(d for d in details if d),
+        'start': {'date': departure.isoformat()},
+        'end': {'date': (departure + datetime.timedelta(days=1)).isoformat()},
+        'attendees': [{'email': booking["email"]}],
+    }
+
+_STOP = object()
+
+class CalendarEventQueue:
+    """
+    Sends calendar events from a background thread so requests never wait on Google.
+
+    Events are coalesced for up to ``flush_interval`` seconds (or ``batch_size``
+    events) and sent as one batch request.
+    """
+
+    def __init__(self, send=None, batch_size: int = CALENDAR_BATCH_LIMIT, flush_interval: float = 0.5):
+        self._send = send or create_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+
+    def enqueue(self, event: dict):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="calendar-events", daemon=True)
+                self._thread.start()
+        self._queue.put(event)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch, stopping = [item], False
+            flush_at = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = flush_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._send_batch(batch)
+            if stopping:
+                return
+
+    def _send_batch(self, batch: List[dict]):
+        try:
+            results = self._send(batch)
+        except Exception as e:
+            logger.error(f"[Calendar Queue Error] {e}")
+            results = [None] * len(batch)
+        created = sum(1 for result in results if result)
+        self.sent += created
+        self.failed += len(batch) - created
+        self.batches += 1
+
+    def stop(self, timeout: float = 10.0):
+        """Flush what is queued and stop the worker thread."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "sent": self.sent, "failed": self.failed, "batches": self.batches}
+
+calendar_queue = CalendarEventQueue(flush_interval=settings.CALENDAR_FLUSH_INTERVAL)
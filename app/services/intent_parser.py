@@ -0,0 +1,152 @@
+# app/services/intent_parser.py
+import re
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.services.location_index import get_location_index, normalize_name
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4, "may": 5,
+    "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "wednesday": 2, "thu": 3, "thur": 3,
+    "thurs": 3, "thursday": 3, "fri": 4, "friday": 4, "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+# Words that end a place name when the gazetteer has no match ("from delhi to dubai on august 15")
+_SLOT_STOP = frozenset({
+    "on", "for", "at", "by", "with", "and", "please", "around", "departing", "leaving", "returning", "tomorrow",
+    "today", "tonight", "next", "this", "coming", "day", "in", "the", "from", "to", "hotel", "hotels", "flight",
+    "flights", "adult", "adults", "child", "children", "people", "person", "persons", "passengers",
+}) | frozenset(MONTHS) | frozenset(WEEKDAYS)
+
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY = "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+
+_FLIGHT = re.compile(r"\bfrom\s+(.+?)\s+to\s+(.+)")
+_HOTEL = re.compile(r"\bhotels?\s+(?:in|at|near)\s+(.+)")
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+_SLASH_DATE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")  # month/day, as dateutil reads it
+_DAY_MONTH = re.compile(rf"\b{_DAY}\s+(?:of\s+)?({_MONTH})\b\.?(?:,?\s+(\d{{4}}))?")
+_MONTH_DAY = re.compile(rf"\b({_MONTH})\.?\s+(?:the\s+)?{_DAY}\b(?:,?\s+(\d{{4}}))?")
+_RELATIVE_DAY = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight)\b")
+_IN_PERIOD = re.compile(r"\bin\s+(\d{1,3}|a|one|two|three)\s+(days?|weeks?)\b")
+_WEEKDAY_REF = re.compile(rf"\b(?:(next|this|coming)\s+)?({_WEEKDAY})\b")
+_NEXT_WEEK = re.compile(r"\bnext\s+week\b")
+_WORD_NUMBERS = {"a": 1, "one": 1, "two": 2, "three": 3}
+
+
+class Intent(NamedTuple):
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    city: Optional[str] = None
+    date: Optional[str] = None
+    # IATA codes when the gazetteer recognised the place; None means it still needs resolving
+    origin_code: Optional[str] = None
+    destination_code: Optional[str] = None
+    city_code: Optional[str] = None
+
+
+def _calendar_date(year: int, month: int, day: int, today: date, explicit_year: bool) -> Optional[date]:
+    try:
+        resolved = date(year, month, day)
+    except ValueError:
+        return None
+    if not explicit_year and resolved < today:
+        # Travel is booked forward: a past day-and-month means next year
+        try:
+            resolved = resolved.replace(year=resolved.year + 1)
+        except ValueError:
+            return None
+    return resolved
+
+
+def resolve_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    """
+    The travel date mentioned in ``text``: ISO and m/d dates, "15th aug", "august 15, 2031",
+    "tomorrow", "day after tomorrow", "in 3 days", "next friday", "friday". None if there is none.
+    """
+    today = today or date.today()
+    text = text.lower()
+    match = _ISO_DATE.search(text)
+    if match:
+        return _calendar_date(int(match.group(1)), int(match.group(2)), int(match.group(3)), today, True)
+    for pattern, day_group, month_group in ((_DAY_MONTH, 1, 2), (_MONTH_DAY, 2, 1)):
+        match = pattern.search(text)
+        if match:
+            year = match.group(3)
+            return _calendar_date(int(year) if year else today.year, MONTHS[match.group(month_group)],
+                                  int(match.group(day_group)), today, bool(year))
+    match = _SLASH_DATE.search(text)
+    if match:
+        year = match.group(3)
+        if year and len(year) == 2:
+            year = "20" + year
+        return _calendar_date(int(year) if year else today.year, int(match.group(1)), int(match.group(2)),
+                              today, bool(year))
+    match = _RELATIVE_DAY.search(text)
+    if match:
+        word = match.group(1)
+        return today + timedelta(days=2 if word == "day after tomorrow" else 1 if word == "tomorrow" else 0)
+    match = _IN_PERIOD.search(text)
+    if match:
+        count = _WORD_NUMBERS.get(match.group(1)) or int(match.group(1))
+        return today + timedelta(days=count * (7 if match.group(2).startswith("week") else 1))
+    match = _WEEKDAY_REF.search(text)
+    if match:
+        ahead = (WEEKDAYS[match.group(2)] - today.weekday()) % 7
+        if ahead == 0 and match.group(1) == "next":
+            ahead = 7
+        return today + timedelta(days=ahead)
+    if _NEXT_WEEK.search(text):
+        return today + timedelta(days=7)
+    return None
+
+
+def _place(words: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """``(name, code)`` for the place at the start of ``words``: the longest gazetteer name, else the words up to a stop word."""
+    index = get_location_index()
+    location, size = index.longest_match(words)
+    if location is not None:
+        return " ".join(words[:size]), location.code
+    name = []
+    for word in words:
+        if word in _SLOT_STOP or word[:1].isdigit():
+            break
+        name.append(word)
+    if len(name) == 1 and len(name[0]) == 3:
+        location = index.by_code(name[0])  # "from del to dxb"
+        if location is not None:
+            return name[0], location.code
+    return (" ".join(name) or None), None
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str, today: date) -> Intent:
+    date_value = resolve_date(text, today)
+    date_str = date_value.isoformat() if date_value else None
+    normalized = normalize_name(text)
+    match = _FLIGHT.search(normalized)
+    if match:
+        origin, origin_code = _place(match.group(1).split())
+        destination, destination_code = _place(match.group(2).split())
+        if origin or destination:
+            return Intent(origin, destination, None, date_str, origin_code, destination_code)
+    match = _HOTEL.search(normalized)
+    if match:
+        city, city_code = _place(match.group(1).split())
+        return Intent(city=city, date=date_str, city_code=city_code)
+    return Intent(date=date_str)
+
+
+def parse_intent(text: str, today: Optional[date] = None) -> Intent:
+    """
+    Slots from one utterance: flight origin/destination or hotel city, plus the date.
+
+    Results are memoized per (utterance, day), since voice sessions repeat the
+    same phrases; the day is part of the key so "tomorrow" stays correct.
+    """
+    return _parse(" ".join((text or "").lower().split()), today or date.today())
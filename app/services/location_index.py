@@ -0,0 +1,229 @@
+# app/services/location_index.py
+import bisect
+import logging
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LOCATIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "locations.tsv")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NOISE_SUFFIXES = (" international airport", " airport", " international", " city")
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+class Location:
+    __slots__ = ("kind", "code", "ref", "country", "name")
+
+    def __init__(self, kind: str, code: str, ref: str, country: str, name: str):
+        self.kind = kind
+        self.code = code
+        self.ref = ref
+        self.country = country
+        self.name = name
+
+    @property
+    def city_code(self) -> str:
+        return self.code if self.kind == "C" else self.ref
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "CITY" if self.kind == "C" else "AIRPORT",
+            "iataCode": self.code,
+            "cityCode": self.city_code,
+            "countryCode": self.country,
+            "name": self.name,
+        }
+
+    def __repr__(self):
+        return f"Location({self.kind}, {self.code}, {self.name!r})"
+
+
+def _osa_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, giving up once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _deletes(word: str, distance: int) -> set:
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def _max_edits(term: str) -> int:
+    if len(term) <= 4:
+        return 0
+    return 1 if len(term) <= 8 else 2
+
+
+class LocationIndex:
+    """
+    In-memory index over the bundled cities/airports file.
+
+    Exact name, alias and IATA code lookups are dict hits; prefix search bisects a
+    sorted key array; typo-tolerant lookup uses a symmetric-delete table built on
+    first use.
+    """
+
+    def __init__(self, rows: List[Location], names: Dict[str, List[Location]]):
+        self.cities = {loc.code: loc for loc in rows if loc.kind == "C"}
+        self.airports = {loc.code: loc for loc in rows if loc.kind == "A"}
+        self._names = names
+        self._sorted_names = sorted(names)
+        self._deletes = None
+        self._deletes_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str = LOCATIONS_PATH) -> "LocationIndex":
+        rows, names = [], {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                kind, code, ref, country, name, aliases = (line.rstrip("\n").split("\t") + [""] * 6)[:6]
+                loc = Location(kind, code, ref, country, name)
+                rows.append(loc)
+                for label in [name] + aliases.split(","):
+                    key = normalize_name(label)
+                    if key:
+                        names.setdefault(key, []).append(loc)
+        logger.info(f"Loaded location index with {len(rows)} entries from {path}")
+        return cls(rows, names)
+
+    @staticmethod
+    def _best(candidates: List[Location]) -> Location:
+        # Prefer the metro/city entry over a same-named airport
+        for loc in candidates:
+            if loc.kind == "C":
+                return loc
+        return candidates[0]
+
+    def by_code(self, code: str) -> Optional[Location]:
+        code = (code or "").strip().upper()
+        return self.cities.get(code) or self.airports.get(code)
+
+    def lookup(self, text: str, fuzzy: bool = True) -> Optional[Location]:
+        """Resolve a spoken/typed place name (or IATA code) to a location."""
+        key = normalize_name(text)
+        if not key:
+            return None
+        hit = self._names.get(key)
+        if hit:
+            return self._best(hit)
+        for suffix in _NOISE_SUFFIXES:
+            if key.endswith(suffix) and key[: -len(suffix)] in self._names:
+                return self._best(self._names[key[: -len(suffix)]])
+        if len(key) == 3 and key.isalpha():
+            loc = self.by_code(key)
+            if loc:
+                return loc
+        return self.fuzzy(key) if fuzzy else None
+
+    def longest_match(self, words: Sequence[str], max_words: int = 4) -> Tuple[Optional[Location], int]:
+        """Longest run of leading normalized ``words`` that is a place name: ["new", "york", "on"] -> (NYC, 2)."""
+        for size in range(min(max_words, len(words)), 0, -1):
+            hit = self._names.get(" ".join(words[:size]))
+            if hit:
+                return self._best(hit), size
+        return None, 0
+
+    def resolve(self, text: str) -> Optional[str]:
+        loc = self.lookup(text)
+        return loc.code if loc else None
+
+    def prefix(self, text: str, limit: int = 10) -> List[Location]:
+        key = normalize_name(text)
+        if not key:
+            return []
+        results, seen = [], set()
+        start = bisect.bisect_left(self._sorted_names, key)
+        for name in self._sorted_names[start:]:
+            if not name.startswith(key):
+                break
+            for loc in self._names[name]:
+                if loc.code not in seen:
+                    seen.add(loc.code)
+                    results.append(loc)
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def _delete_table(self) -> Dict[str, List[str]]:
+        if self._deletes is None:
+            with self._deletes_lock:
+                if self._deletes is None:
+                    table = {}
+                    for name in self._names:
+                        for variant in _deletes(name, _max_edits(name)):
+                            table.setdefault(variant, []).append(name)
+                    self._deletes = table
+        return self._deletes
+
+    def fuzzy(self, text: str) -> Optional[Location]:
+        key = normalize_name(text)
+        limit = _max_edits(key)
+        if not limit:
+            return None
+        table = self._delete_table()
+        best_name, best_distance = None, limit + 1
+        for variant in _deletes(key, limit):
+            for name in table.get(variant, ()):
+                distance = _osa_distance(key, name, min(limit, _max_edits(name)))
+                if distance < best_distance or (distance == best_distance and best_name and name < best_name):
+                    best_name, best_distance = name, distance
+        if best_name is None or best_distance > limit:
+            return None
+        return self._best(self._names[best_name])
+
+    def primary_airport(self, code: str) -> str:
+        """Metro/city code to its main airport (LON -> LHR); airports and unknown codes pass through."""
+        code = (code or "").strip().upper()
+        city = self.cities.get(code)
+        return city.ref if city else code
+
+    def metro_code(self, code: str) -> str:
+        """Airport code to the city code hotels are listed under (LHR -> LON)."""
+        code = (code or "").strip().upper()
+        if code in self.cities:
+            return code
+        airport = self.airports.get(code)
+        return airport.ref if airport else code
+
+
+_index: Optional[LocationIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_location_index() -> LocationIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LocationIndex.load()
+    return _index
@@ -0,0 +1,194 @@
+# app/services/offer_index.py
+import base64
+import bisect
+import json
+import re
+from datetime import datetime
+from typing import List, Optional
+
+INF = float("inf")
+
+_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def parse_duration_minutes(value: str) -> float:
+    """ISO-8601 duration as Amadeus sends it ("PT2H35M", "P1DT3H") in minutes."""
+    match = _DURATION.fullmatch(value or "")
+    if not match or not any(match.groups()):
+        return INF
+    days, hours, minutes = (int(part or 0) for part in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+def _epoch(value: Optional[str]) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return INF
+
+
+def _price(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return INF
+
+
+class FlightRecord:
+    """
+    Sort and filter keys for one flight offer. ``duration`` is the total over every
+    itinerary; ``stops`` is the most on any one itinerary, so on a round trip
+    ``max_stops=0`` means nonstop both ways.
+    """
+    __slots__ = ("index", "price", "duration", "stops", "carrier", "carriers", "departure")
+
+    def __init__(self, index: int, offer: dict):
+        itineraries = offer.get("itineraries") or [{}]
+        segments = [seg for itinerary in itineraries for seg in itinerary.get("segments") or []]
+        price = offer.get("price", {})
+        self.index = index
+        self.price = _price(price.get("grandTotal") or price.get("total"))
+        self.duration = sum(parse_duration_minutes(it.get("duration")) for it in itineraries)
+        self.stops = max(max(len(it.get("segments") or [None]) - 1, 0) for it in itineraries)
+        self.carriers = frozenset(seg.get("carrierCode") for seg in segments if seg.get("carrierCode"))
+        self.carrier = (segments[0].get("carrierCode") if segments else None) or \
+            (offer.get("validatingAirlineCodes") or [None])[0]
+        self.departure = _epoch(segments[0].get("departure", {}).get("at")) if segments else INF
+
+
+class HotelRecord:
+    __slots__ = ("index", "price", "name")
+
+    def __init__(self, index: int, hotel: dict):
+        self.index = index
+        self.price = _price(hotel.get("price"))
+        self.name = (hotel.get("name") or hotel.get("hotelName") or "").lower()
+
+
+FLIGHT_SORTS = {
+    "price": lambda r: (r.price, r.duration, r.index),
+    "duration": lambda r: (r.duration, r.price, r.index),
+    "stops": lambda r: (r.stops, r.price, r.index),
+    "departure": lambda r: (r.departure, r.price, r.index),
+}
+
+HOTEL_SORTS = {
+    "price": lambda r: (r.price, r.name, r.index),
+    "name": lambda r: (r.name, r.price, r.index),
+}
+
+
+class _Ranking:
+    """Slotted records for one result list, with sort orders computed on first use."""
+
+    def __init__(self, items: list, record_type, sorts: dict):
+        self.records = [record_type(i, item) for i, item in enumerate(items)]
+        self.sorts = sorts
+        self._orders = {}
+
+    def order(self, sort: str):
+        cached = self._orders.get(sort)
+        if cached is None:
+            key = self.sorts[sort]
+            records = sorted(self.records, key=key)
+            cached = (records, [key(r) for r in records])
+            self._orders[sort] = cached
+        return cached
+
+
+class OfferSet:
+    """
+    One search result with its ranking, for sorting, filtering and paging.
+
+    The ranking is built once per cached result list and kept on the list itself
+    (``CachedList.derived``), so ranking and paging a cached search is a pass over
+    small objects rather than a re-walk of the nested offer dicts, and it is freed
+    when the cache evicts the entry.
+    """
+
+    def __init__(self, items: list, ranking: _Ranking):
+        self.items = items
+        self.ranking = ranking
+
+    def order(self, sort: str):
+        return self.ranking.order(sort)
+
+    def query(self, sort: str = "price", predicate=None, limit: Optional[int] = None, cursor: Optional[str] = None):
+        """Return ``(items, total, next_cursor)`` for one page of the filtered, sorted set."""
+        records, keys = self.order(sort)
+        start = 0
+        if cursor:
+            try:
+                start = bisect.bisect_right(keys, decode_cursor(cursor))
+            except TypeError:
+                raise ValueError("Invalid cursor")
+        if predicate is None:
+            total, tail = len(records), records[start:]
+        else:
+            total, tail = 0, []
+            for position, record in enumerate(records):
+                if predicate(record):
+                    total += 1
+                    if position >= start:
+                        tail.append(record)
+        page = tail[:limit] if limit else tail
+        next_cursor = encode_cursor(self.ranking.sorts[sort](page[-1])) if limit and len(tail) > limit else None
+        return [self.items[r.index] for r in page], total, next_cursor
+
+
+def encode_cursor(key: tuple) -> str:
+    raw = json.dumps([None if v == INF else v for v in key], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return tuple(INF if v is None else v for v in json.loads(raw))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _offer_set(items: list, record_type, sorts: dict) -> OfferSet:
+    derived = getattr(items, "derived", None)
+    if derived is None:
+        # Not from the search cache, so nothing would reuse the ranking
+        return OfferSet(items, _Ranking(items, record_type, sorts))
+    ranking = derived.get(record_type)
+    if ranking is None:
+        # Two requests racing here both build it; the last one stored wins, which is harmless
+        ranking = derived[record_type] = _Ranking(items, record_type, sorts)
+    return OfferSet(items, ranking)
+
+
+def flight_offer_set(offers: list) -> OfferSet:
+    return _offer_set(offers, FlightRecord, FLIGHT_SORTS)
+
+
+def hotel_offer_set(hotels: list) -> OfferSet:
+    return _offer_set(hotels, HotelRecord, HOTEL_SORTS)
+
+
+def flight_filter(max_stops: Optional[int] = None, carriers: Optional[List[str]] = None,
+                  max_price: Optional[float] = None):
+    allowed = frozenset(c.upper() for c in carriers) if carriers else None
+    if max_stops is None and allowed is None and max_price is None:
+        return None
+
+    def keep(record: FlightRecord) -> bool:
+        if max_stops is not None and record.stops > max_stops:
+            return False
+        if max_price is not None and record.price > max_price:
+            return False
+        # Every marketing carrier on the itinerary must be one the caller asked for
+        if allowed is not None and not (record.carriers and record.carriers <= allowed):
+            return False
+        return True
+
+    return keep
+
+
+def hotel_filter(max_price: Optional[float] = None):
+    if max_price is None:
+        return None
+    return lambda record: record.price <= max_price
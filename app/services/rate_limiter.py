@@ -0,0 +1,278 @@
+# app/services/rate_limiter.py
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+BATCH = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background", BATCH: "batch"}
+
+# Anything not marked otherwise is a user waiting on an answer
+_priority = contextvars.ContextVar("amadeus_priority", default=INTERACTIVE)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: int):
+    """Run the enclosed Amadeus calls at ``priority`` (tasks started inside inherit it)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+# Amadeus rate limits are per API; the first path segment after the version names it
+API_FAMILIES = {
+    "shopping": "shopping",
+    "reference-data": "reference-data",
+    "booking": "booking",
+    "ordering": "booking",
+}
+
+
+def api_family(path: str) -> str:
+    parts = path.split("/")
+    return API_FAMILIES.get(parts[2] if len(parts) > 2 else "", "default")
+
+
+def parse_rate_limits(spec: str) -> Dict[str, tuple]:
+    """``"shopping=5:10,booking=2"`` -> {"shopping": (5.0, 10), "booking": (2.0, 2)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        family, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        try:
+            limits[family.strip()] = (float(rate), int(burst) if burst else max(int(float(rate)), 1))
+        except ValueError:
+            logger.warning(f"[Rate Limiter] Ignoring bad rate limit {item!r}")
+    return limits
+
+
+class RateLimited(Exception):
+    """A call waited longer than allowed for a token, or the monthly quota is spent."""
+
+    def __init__(self, family: str, reason: str):
+        super().__init__(f"{family}: {reason}")
+        self.family = family
+        self.reason = reason
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until or self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def delay(self) -> float:
+        """Seconds until the next token is available."""
+        now = time.monotonic()
+        self._refill(now)
+        return max(self.paused_until - now, (1 - self.tokens) / self.rate, 0.0)
+
+    def pause(self, seconds: float):
+        """Upstream said slow down: hand out nothing for ``seconds``."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _Family:
+    __slots__ = ("name", "bucket", "waiters", "timer", "timer_loop", "acquired", "delayed", "wait_total", "wait_max",
+                 "rejected", "throttled", "month", "month_calls")
+
+    def __init__(self, name: str, bucket: TokenBucket):
+        self.name = name
+        self.bucket = bucket
+        self.waiters = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.timer_loop = None
+        self.acquired = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.rejected = 0
+        self.throttled = 0
+        self.month = None
+        self.month_calls = 0
+
+
+class RateLimiter:
+    """
+    Client-side token buckets per Amadeus API family with a priority queue in front.
+
+    Calls that find the bucket empty wait in a heap ordered by priority, then
+    arrival, and are granted tokens as they refill, so interactive requests
+    overtake queued background work. A call waits at most ``max_wait`` seconds.
+    ``monthly_quota`` caps each family's calls this month (0 = no quota, counted
+    per process); the last ``interactive_reserve`` share of it is kept for
+    interactive calls, and once it is used up every call is rejected. A call
+    claims its quota slot before it queues and hands it back if it gives up.
+
+    Not thread-safe: every caller must be on the event loop that owns it (the
+    sync SDK functions in amadeus_service do not go through it).
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10, limits: Optional[Dict[str, tuple]] = None,
+                 max_wait: float = 10.0, monthly_quota: int = 0, interactive_reserve: float = 0.0):
+        self.rate = rate
+        self.burst = burst
+        self.limits = limits or {}
+        self.max_wait = max_wait
+        self.monthly_quota = monthly_quota
+        self.background_quota = int(monthly_quota * (1 - min(max(interactive_reserve, 0.0), 1.0)))
+        self._families: Dict[str, _Family] = {}
+        self._seq = itertools.count()
+
+    def _family(self, name: str) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            rate, burst = self.limits.get(name, (self.rate, self.burst))
+            family = self._families[name] = _Family(name, TokenBucket(rate, burst))
+        return family
+
+    def _quota_exceeded(self, family: _Family, priority: int) -> Optional[str]:
+        month = datetime.date.today().strftime("%Y-%m")
+        if family.month != month:
+            family.month, family.month_calls = month, 0
+        if not self.monthly_quota:
+            return None
+        if family.month_calls >= self.monthly_quota:
+            return "monthly quota used up"
+        if priority != INTERACTIVE and family.month_calls >= self.background_quota:
+            return "monthly quota reserved for interactive requests"
+        return None
+
+    def _claim_quota(self, family: _Family, priority: int):
+        reason = self._quota_exceeded(family, priority)
+        if reason:
+            family.rejected += 1
+            raise RateLimited(family.name, reason)
+        family.month_calls += 1
+
+    async def acquire(self, path_or_family: str, priority: Optional[int] = None) -> float:
+        """Wait for a token; returns the seconds spent queued."""
+        name = api_family(path_or_family) if path_or_family.startswith("/") else path_or_family
+        family = self._family(name)
+        priority = current_priority() if priority is None else priority
+        self._claim_quota(family, priority)
+        if not family.waiters and family.bucket.take():
+            family.acquired += 1
+            return 0.0
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(family.waiters, entry)
+        self._schedule(family)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.cancel():
+                family.waiters.remove(entry)
+                heapq.heapify(family.waiters)
+            else:
+                family.bucket.tokens += 1  # granted just as we gave up; hand it back
+            family.month_calls = max(family.month_calls - 1, 0)  # the call never happened
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            family.rejected += 1
+            raise RateLimited(name, f"no token within {self.max_wait:.1f}s")
+        waited = time.monotonic() - started
+        family.acquired += 1
+        family.delayed += 1
+        family.wait_total += waited
+        family.wait_max = max(family.wait_max, waited)
+        return waited
+
+    def try_acquire(self, path_or_family: str) -> bool:
+        """Take a token only if one is free and nobody is queued (e.g. for a hedged retry)."""
+        name = api_family(path_or_family) if path_or_family.startswith("/") else path_or_family
+        family = self._family(name)
+        if self._quota_exceeded(family, current_priority()) or family.waiters or not family.bucket.take():
+            return False
+        family.acquired += 1
+        family.month_calls += 1
+        return True
+
+    def _schedule(self, family: _Family):
+        loop = asyncio.get_running_loop()
+        # A handle from another (finished) loop will never fire
+        if family.timer is not None and family.timer_loop is loop:
+            return
+        family.timer = loop.call_later(family.bucket.delay(), self._grant, family)
+        family.timer_loop = loop
+
+    def _grant(self, family: _Family):
+        family.timer = None
+        waiters = family.waiters
+        while waiters:
+            future = waiters[0][2]
+            if future.done() or future.get_loop().is_closed():
+                heapq.heappop(waiters)
+                continue
+            if not family.bucket.take():
+                break
+            heapq.heappop(waiters)
+            future.set_result(None)
+        if waiters:
+            self._schedule(family)
+
+    def throttled(self, path_or_family: str, retry_after: Optional[float] = None):
+        """Record an upstream 429 and hold the family's bucket for ``retry_after`` seconds."""
+        name = api_family(path_or_family) if path_or_family.startswith("/") else path_or_family
+        family = self._family(name)
+        family.throttled += 1
+        family.bucket.pause(retry_after if retry_after is not None else 1.0 / family.bucket.rate)
+        logger.warning(f"[Rate Limiter] Amadeus throttled {name}; pausing {family.bucket.delay():.2f}s")
+
+    def stats(self) -> dict:
+        stats = {}
+        for name, family in list(self._families.items()):
+            queued = [entry for entry in family.waiters if not entry[2].done()]
+            stats[name] = {
+                "rate": family.bucket.rate,
+                "burst": family.bucket.burst,
+                "queued": len(queued),
+                "queued_by_priority": {
+                    PRIORITY_NAMES.get(p, str(p)): sum(1 for entry in queued if entry[0] == p)
+                    for p in sorted({entry[0] for entry in queued})
+                },
+                "acquired": family.acquired,
+                "delayed": family.delayed,
+                "avg_wait_ms": round(family.wait_total / family.delayed * 1000, 2) if family.delayed else 0.0,
+                "max_wait_ms": round(family.wait_max * 1000, 2),
+                "rejected": family.rejected,
+                "throttled": family.throttled,
+                "month_calls": family.month_calls,
+            }
+        return stats
@@ -0,0 +1,174 @@
+# app/services/reference_data.py
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from amadeus import ResponseError
+
+from app.services.location_index import get_location_index
+from app.services.rate_limiter import BATCH, request_priority
+
+logger = logging.getLogger(__name__)
+
+# Hotel probe outcomes
+HOTELS = "hotels"
+NO_HOTELS = "no_hotels"
+UNKNOWN_CITY = "unknown_city"
+
+
+class ReferenceDataStore:
+    """
+    Valid city codes and hotel-supported city codes, persisted to disk.
+
+    Loaded once at startup (or lazily from disk on first use) and refreshed on a
+    schedule by a background task, so membership checks on the request path are
+    plain set lookups and never touch the network.
+
+    Amadeus has no listing of every valid city, so a code is only ruled out once
+    a hotel probe has checked it. Codes never checked (e.g. resolved upstream for
+    a city outside the bundled index) pass and are probed on the next refresh;
+    after that each city is re-probed once its answer is ``recheck_after`` old.
+    """
+
+    def __init__(self, path: str, hotel_cities: Iterable[str], recheck_after: float = 30 * 24 * 3600):
+        self.path = path
+        self.recheck_after = recheck_after
+        self._seed_hotel_cities = frozenset(hotel_cities)
+        self.valid_city_codes = frozenset()
+        self.hotel_city_codes = frozenset()
+        self.checked_at: Dict[str, float] = {}  # when each code was last probed; 0 = seeded, never probed
+        self.refreshed_at: Optional[float] = None
+        self._unchecked = set()  # codes seen on the request path that no probe has answered yet
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            data = None
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"[Reference Data] Could not read {self.path}: {e}")
+            if data:
+                self.valid_city_codes = frozenset(data.get("valid_city_codes", []))
+                self.hotel_city_codes = frozenset(data.get("hotel_city_codes", []))
+                self.refreshed_at = data.get("refreshed_at")
+                # Files written before per-city timestamps count as never probed
+                self.checked_at = {code: 0.0 for code in self.valid_city_codes}
+                self.checked_at.update(data.get("checked_at", {}))
+            else:
+                # First boot: the bundled location index is the source of valid cities
+                self.valid_city_codes = frozenset(get_location_index().cities) | self._seed_hotel_cities
+                self.hotel_city_codes = self._seed_hotel_cities
+                self.checked_at = {code: 0.0 for code in self.valid_city_codes}
+            self._loaded = True
+            logger.info(
+                f"[Reference Data] {len(self.valid_city_codes)} valid cities, "
+                f"{len(self.hotel_city_codes)} hotel cities loaded"
+            )
+
+    def save(self):
+        payload = {
+            "refreshed_at": self.refreshed_at,
+            "valid_city_codes": sorted(self.valid_city_codes),
+            "hotel_city_codes": sorted(self.hotel_city_codes),
+            "checked_at": dict(sorted(self.checked_at.items())),
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def _known(self, code: str) -> bool:
+        if code in self.checked_at:
+            return True
+        self._unchecked.add(code)
+        return False
+
+    def is_valid_city(self, code: str) -> bool:
+        self._ensure_loaded()
+        code = (code or "").upper()
+        return code in self.valid_city_codes or not self._known(code)
+
+    def supports_hotels(self, code: str) -> bool:
+        self._ensure_loaded()
+        code = (code or "").upper()
+        return code in self.hotel_city_codes or not self._known(code)
+
+    async def _probe_hotel_city(self, client, city_code: str) -> Optional[str]:
+        """HOTELS, NO_HOTELS or UNKNOWN_CITY from the Amadeus hotel listing, None on errors."""
+        try:
+            response = await client.get("/v1/reference-data/locations/hotels/by-city", cityCode=city_code, radius=5)
+            return HOTELS if response.data else NO_HOTELS
+        except ResponseError as error:
+            status = getattr(error.response, "status_code", None)
+            if status == 400:
+                return UNKNOWN_CITY
+            if status == 404:
+                return NO_HOTELS
+            logger.warning(f"[Reference Data] Hotel probe failed for {city_code}: {error}")
+            return None
+
+    def _due(self, now: float) -> list:
+        """Cities never probed, or whose last answer is older than ``recheck_after``."""
+        codes = set(get_location_index().cities) | set(self.checked_at) | self._unchecked
+        return sorted(code for code in codes if now - self.checked_at.get(code, 0.0) >= self.recheck_after)
+
+    async def refresh(self, client, concurrency: int = 4):
+        """Probe the cities that are new or stale, update both sets, then persist."""
+        self._ensure_loaded()
+        now = time.time()
+        candidates = self._due(now)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def probe(code):
+            async with semaphore:
+                return code, await self._probe_hotel_city(client, code)
+
+        results = await asyncio.gather(*[probe(code) for code in candidates])
+        if results and all(outcome is None for _, outcome in results):
+            raise RuntimeError("every hotel probe failed; keeping the current reference data")
+        valid, hotel_cities, checked_at = set(self.valid_city_codes), set(self.hotel_city_codes), dict(self.checked_at)
+        for code, outcome in results:
+            if outcome is None:
+                continue  # keep the previous answer; still due, so the next refresh retries it
+            checked_at[code] = now
+            self._unchecked.discard(code)
+            (valid.add if outcome != UNKNOWN_CITY else valid.discard)(code)
+            (hotel_cities.add if outcome == HOTELS else hotel_cities.discard)(code)
+
+        self.valid_city_codes = frozenset(valid)
+        self.hotel_city_codes = frozenset(hotel_cities)
+        self.checked_at = checked_at
+        self.refreshed_at = now
+        await asyncio.to_thread(self.save)
+        logger.info(f"[Reference Data] Refreshed: probed {len(candidates)} cities, {len(self.hotel_city_codes)} hotel cities")
+
+    async def run_refresher(self, client, interval: float, retry_delay: float = 300):
+        """Background task: refresh whenever the persisted data is older than ``interval``."""
+        while True:
+            age = time.time() - (self.refreshed_at or 0)
+            if age < interval:
+                await asyncio.sleep(interval - age)
+                continue
+            try:
+                with request_priority(BATCH):
+                    await self.refresh(client)
+            except Exception as e:
+                logger.error(f"[Reference Data] Refresh failed: {e}")
+                await asyncio.sleep(min(interval, retry_delay))
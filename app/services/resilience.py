@@ -0,0 +1,252 @@
+# app/services/resilience.py
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"circuit open for {endpoint}; retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies, in seconds."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after too many failures in the recent window; open -> half-open
+    after ``recovery_timeout``; one successful probe closes it again, a failed
+    probe re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, failure_rate: float = 0.5, window: int = 20,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = "closed"
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self):
+        """Raise ``CircuitOpen`` unless a call may go through right now."""
+        with self._lock:
+            if self.state == "open":
+                retry_in = self._opened_at + self.recovery_timeout - time.monotonic()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitOpen(self.name, retry_in)
+                self.state, self._probes = "half_open", 0
+            if self.state == "half_open":
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    raise CircuitOpen(self.name, 0.0)
+                self._probes += 1
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+        logger.warning(f"[Circuit Breaker] {self.name} opened for {self.recovery_timeout:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "closed"
+                self._outcomes.clear()
+                logger.info(f"[Circuit Breaker] {self.name} closed")
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == "half_open":
+                self._open()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if failures >= self.failure_threshold and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def release(self):
+        """A call ended without an outcome, or with one that says nothing about upstream health."""
+        with self._lock:
+            if self.state == "half_open" and self._probes:
+                self._probes -= 1
+
+
+class Endpoint:
+    __slots__ = ("breaker", "latency", "hedges", "hedge_wins")
+
+    def __init__(self, breaker: CircuitBreaker, latency: LatencyTracker):
+        self.breaker = breaker
+        self.latency = latency
+        self.hedges = 0
+        self.hedge_wins = 0
+
+
+class ResiliencePolicy:
+    """
+    Per-endpoint circuit breakers, latency-derived timeouts and hedged requests.
+
+    Once an endpoint has ``min_samples`` latencies its timeout shrinks to
+    ``timeout_multiplier`` x p99 (between ``min_timeout`` and ``default_timeout``),
+    and hedgeable calls still running at p95 get a second, parallel attempt; the
+    first good answer wins and the other attempt is cancelled.
+    """
+
+    def __init__(self, default_timeout: float = 15.0, min_timeout: float = 2.0, timeout_multiplier: float = 3.0,
+                 hedge: bool = True, min_samples: int = 20, failure_threshold: int = 5, failure_rate: float = 0.5,
+                 window: int = 20, recovery_timeout: float = 30.0):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge = hedge
+        self.min_samples = min_samples
+        self._breaker_options = dict(
+            failure_threshold=failure_threshold, failure_rate=failure_rate,
+            window=window, recovery_timeout=recovery_timeout,
+        )
+        self._endpoints: Dict[str, Endpoint] = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, key: str) -> Endpoint:
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            with self._lock:
+                endpoint = self._endpoints.get(key)
+                if endpoint is None:
+                    endpoint = Endpoint(CircuitBreaker(key, **self._breaker_options), LatencyTracker())
+                    self._endpoints[key] = endpoint
+        return endpoint
+
+    def timeout_for(self, endpoint: Endpoint) -> float:
+        if len(endpoint.latency) < self.min_samples:
+            return self.default_timeout
+        p99 = endpoint.latency.percentile(0.99)
+        return max(self.min_timeout, min(self.default_timeout, p99 * self.timeout_multiplier))
+
+    def hedge_delay_for(self, endpoint: Endpoint) -> Optional[float]:
+        if not self.hedge or len(endpoint.latency) < self.min_samples:
+            return None
+        return endpoint.latency.percentile(0.95)
+
+    async def call(self, key: str, attempt: Callable[[float], Awaitable[T]], hedge: bool = False,
+                   is_failure: Callable[[T], bool] = lambda result: False,
+                   is_neutral: Callable[[T], bool] = lambda result: False) -> T:
+        """
+        Run ``attempt(timeout)`` under the endpoint's breaker. Exceptions and results
+        matching ``is_failure`` count against the breaker; both are passed through.
+        Results matching ``is_neutral`` (e.g. a 401 or 429, which come back fast)
+        count as neither a success nor a latency sample.
+        """
+        endpoint = self.endpoint(key)
+        endpoint.breaker.allow()
+        timeout = self.timeout_for(endpoint)
+        delay = self.hedge_delay_for(endpoint) if hedge else None
+        started = time.monotonic()
+        try:
+            if delay is not None and delay < timeout:
+                result = await self._hedged(endpoint, attempt, timeout, delay, is_failure)
+            else:
+                result = await attempt(timeout)
+        except asyncio.CancelledError:
+            endpoint.breaker.release()
+            raise
+        except Exception:
+            endpoint.breaker.record_failure()
+            raise
+        if is_failure(result):
+            endpoint.breaker.record_failure()
+        elif is_neutral(result):
+            endpoint.breaker.release()
+        else:
+            endpoint.breaker.record_success()
+            endpoint.latency.add(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, endpoint: Endpoint, attempt, timeout: float, delay: float, is_failure):
+        first = asyncio.ensure_future(attempt(timeout))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        endpoint.hedges += 1
+        second = asyncio.ensure_future(attempt(max(timeout - delay, self.min_timeout)))
+        pending = {first, second}
+        fallback, error = None, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result = task.result()
+                    if is_failure(result) and pending:
+                        fallback = result  # wait for the other attempt before settling for this
+                        continue
+                    if task is second:
+                        endpoint.hedge_wins += 1
+                    return result
+            if fallback is not None:
+                return fallback
+            raise error
+        finally:
+            for task in (first, second):
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        return {
+            key: {
+                "state": endpoint.breaker.state,
+                "opened": endpoint.breaker.opened,
+                "rejected": endpoint.breaker.rejected,
+                "samples": len(endpoint.latency),
+                "p50": endpoint.latency.percentile(0.5),
+                "p95": endpoint.latency.percentile(0.95),
+                "p99": endpoint.latency.percentile(0.99),
+                "timeout": self.timeout_for(endpoint),
+                "hedges": endpoint.hedges,
+                "hedge_wins": endpoint.hedge_wins,
+            }
+            for key, endpoint in endpoints.items()
+        }
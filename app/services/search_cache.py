@@ -0,0 +1,241 @@
+# app/services/search_cache.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from app.services.rate_limiter import BACKGROUND, request_priority
+
+logger = logging.getLogger(__name__)
+
+# Background revalidation for sync callers; async callers refresh on their own loop
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="search-cache-refresh")
+
+
+def _is_cacheable(value) -> bool:
+    # Errors come back as {"error": ...} and "nothing found" as []; neither should stick
+    return isinstance(value, list) and len(value) > 0
+
+
+def _is_failure(value) -> bool:
+    return isinstance(value, dict) and "error" in value
+
+
+def _estimate_size(value) -> int:
+    try:
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return 0
+
+
+class CachedList(list):
+    """
+    A list result as the cache stores it. ``derived`` holds structures built from
+    the list (such as offer rankings), so they are dropped with the entry.
+    """
+    __slots__ = ("derived",)
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self.derived = {}
+
+
+class _Entry:
+    __slots__ = ("value", "size", "stored_at")
+
+    def __init__(self, value, size: int, stored_at: float):
+        self.value = value
+        self.size = size
+        self.stored_at = stored_at
+
+
+class SearchCache:
+    """
+    Thread-safe TTL + LRU cache for upstream search results.
+
+    Entries are fresh for ``ttl`` seconds and may then be served stale for a further
+    ``stale_ttl`` seconds while a single background refresh repopulates them.
+    Past that, an entry is kept for ``stale_if_error`` more seconds and only
+    served if reloading it fails (an exception or a result matching ``is_failure``),
+    so an upstream outage degrades to old results instead of errors.
+    Eviction is least-recently-used, bounded by both ``max_entries`` and ``max_bytes``.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 1024, max_bytes: int = 0,
+                 cacheable: Callable[[Any], bool] = _is_cacheable, stale_if_error: float = 0,
+                 is_failure: Callable[[Any], bool] = _is_failure):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stale_if_error = stale_if_error
+        self.is_failure = is_failure
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cacheable = cacheable
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.error_fallbacks = 0
+
+    def _lookup(self, key):
+        """Return (value, state) where state is "fresh", "stale", "expired" or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            age = now - entry.stored_at
+            if age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value, "fresh"
+            if age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                return entry.value, "stale"
+            if age <= self.ttl + self.stale_ttl + self.stale_if_error:
+                self.misses += 1
+                return entry.value, "expired"
+            self._remove(key)
+            self.misses += 1
+            return None, None
+
+    def get(self, key) -> Optional[Any]:
+        value, state = self._lookup(key)
+        return value if state in ("fresh", "stale") else None
+
+    def _fall_back(self, key, expired):
+        with self._lock:
+            self.error_fallbacks += 1
+        logger.warning(f"[{self.name} cache] Upstream failed for {key}; serving an expired result")
+        return expired
+
+    def set(self, key, value):
+        """Store ``value`` and return what callers should use: the stored copy, or ``value`` if not cached."""
+        if not self.cacheable(value):
+            return value
+        size = _estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return value
+        if isinstance(value, list) and not isinstance(value, CachedList):
+            value = CachedList(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, time.monotonic())
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return value
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _claim_refresh(self, key) -> bool:
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self.refreshes += 1
+            return True
+
+    def _release_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def get_or_load(self, key, loader: Callable[[], Any]):
+        value, state = self._lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if self._claim_refresh(key):
+                _refresh_executor.submit(self._refresh, key, loader)
+            return value
+        expired = value if state == "expired" else None
+        try:
+            value = loader()
+        except Exception:
+            if expired is None:
+                raise
+            return self._fall_back(key, expired)
+        if expired is not None and self.is_failure(value):
+            return self._fall_back(key, expired)
+        return self.set(key, value)
+
+    def _refresh(self, key, loader):
+        try:
+            self.set(key, loader())
+        except Exception as e:
+            logger.warning(f"[{self.name} cache] Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+    async def get_or_load_async(self, key, loader: Callable[[], Any]):
+        value, state = self._lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if self._claim_refresh(key):
+                task = asyncio.create_task(self._refresh_async(key, loader))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+        expired = value if state == "expired" else None
+        try:
+            value = await loader()
+        except Exception:
+            if expired is None:
+                raise
+            return self._fall_back(key, expired)
+        if expired is not None and self.is_failure(value):
+            return self._fall_back(key, expired)
+        return self.set(key, value)
+
+    async def _refresh_async(self, key, loader):
+        try:
+            # Nobody is waiting on a revalidation; let live requests go first
+            with request_priority(BACKGROUND):
+                value = await loader()
+            self.set(key, value)
+        except Exception as e:
+            logger.warning(f"[{self.name} cache] Background refresh failed for {key}: {e}")
+        finally:
+            self._release_refresh(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes,
+                "error_fallbacks": self.error_fallbacks,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,223 @@
+# app/services/stripe_events.py
+import asyncio
+import datetime
+import json
+import logging
+import uuid
+from typing import List, Optional
+
+from sqlalchemy import case, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.booking import Booking
+from app.models.stripe_event import StripeEvent
+
+logger = logging.getLogger(__name__)
+
+# Payment status a booking moves to for each Stripe event type we act on
+PAYMENT_STATUS_BY_EVENT = {
+    "checkout.session.completed": "paid",
+    "checkout.session.async_payment_succeeded": "paid",
+    "checkout.session.async_payment_failed": "failed",
+}
+
+
+def booking_id_for(event: dict) -> Optional[int]:
+    session = (event.get("data") or {}).get("object") or {}
+    try:
+        return int((session.get("metadata") or {}).get("booking_id"))
+    except (TypeError, ValueError):
+        return None
+
+
+async def record_stripe_event(db: AsyncSession, event: dict) -> bool:
+    """Store a verified event in the outbox; False if this event id was already stored."""
+    db.add(StripeEvent(
+        event_id=event["id"],
+        event_type=event.get("type") or "",
+        payload=json.dumps(event, default=str),
+    ))
+    try:
+        await db.commit()
+        return True
+    except IntegrityError:
+        await db.rollback()
+        return False
+
+
+class StripeEventProcessor:
+    """
+    Background workers that apply stored Stripe events to bookings.
+
+    Workers claim pending outbox rows in batches with a single conditional UPDATE,
+    so concurrent workers (or processes) never pick up the same event, and apply a
+    whole batch as one UPDATE per payment status. Claims older than
+    ``claim_timeout`` are treated as abandoned and put back in the queue.
+    """
+
+    def __init__(self, sessionmaker=AsyncSessionLocal, batch_size: int = 100, batch_window: float = 0.05,
+                 poll_interval: float = 5.0, max_attempts: int = 5, claim_timeout: float = 300.0):
+        self.sessionmaker = sessionmaker
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self.batches = 0
+
+    def notify(self):
+        """Wake the workers; called after a new event is stored."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self, workers: int = 2):
+        self._wake = asyncio.Event()
+        prefix = uuid.uuid4().hex[:8]
+        self._tasks = [asyncio.create_task(self._worker(f"{prefix}-{i}")) for i in range(workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wake = None
+
+    async def _worker(self, name: str):
+        while True:
+            try:
+                claimed = await self.process_batch(name)
+            except Exception as e:
+                logger.error(f"[Stripe Worker Error] {e}")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue  # backlog: keep draining without waiting
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                continue
+            self._wake.clear()
+            # Give a burst a moment to land so it is applied as one batch
+            await asyncio.sleep(self.batch_window)
+
+    async def _claim(self, db: AsyncSession, worker: str) -> List[StripeEvent]:
+        now = datetime.datetime.utcnow()
+        abandoned_before = now - datetime.timedelta(seconds=self.claim_timeout)
+        await db.execute(
+            update(StripeEvent)
+            .where(StripeEvent.status == "processing", StripeEvent.claimed_at < abandoned_before)
+            .values(status="pending", claimed_by=None, claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        oldest = (
+            select(StripeEvent.event_id)
+            .where(StripeEvent.status == "pending")
+            .order_by(StripeEvent.received_at)
+            .limit(self.batch_size)
+        )
+        await db.execute(
+            update(StripeEvent)
+            .where(StripeEvent.event_id.in_(oldest.scalar_subquery()), StripeEvent.status == "pending")
+            .values(status="processing", claimed_by=worker, claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        result = await db.execute(
+            select(StripeEvent)
+            .where(StripeEvent.claimed_by == worker, StripeEvent.status == "processing")
+            .order_by(StripeEvent.received_at)
+        )
+        return list(result.scalars().all())
+
+    async def process_batch(self, worker: str = "drain") -> int:
+        """Claim and apply one batch; returns how many events were claimed."""
+        async with self.sessionmaker() as db:
+            events = await self._claim(db, worker)
+            if not events:
+                return 0
+            event_ids = [event.event_id for event in events]
+
+            # Later events win when one booking appears more than once in a batch
+            statuses = {}
+            for event in events:
+                payment_status = PAYMENT_STATUS_BY_EVENT.get(event.event_type)
+                if payment_status is None:
+                    continue
+                booking_id = booking_id_for(json.loads(event.payload))
+                if booking_id is None:
+                    logger.warning(f"[Stripe Worker] Booking ID not found in metadata of {event.event_id}")
+                    continue
+                statuses[booking_id] = payment_status
+            by_status = {}
+            for booking_id, payment_status in statuses.items():
+                by_status.setdefault(payment_status, []).append(booking_id)
+
+            try:
+                for payment_status, booking_ids in by_status.items():
+                    result = await db.execute(
+                        update(Booking)
+                        .where(Booking.id.in_(booking_ids))
+                        .values(payment_status=payment_status)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if result.rowcount < len(booking_ids):
+                        logger.warning(f"[Stripe Worker] {len(booking_ids) - result.rowcount} booking(s) not found")
+                    logger.info(f"Marked {result.rowcount} booking(s) {payment_status}")
+                await db.execute(
+                    update(StripeEvent)
+                    .where(StripeEvent.event_id.in_(event_ids))
+                    .values(status="processed", processed_at=datetime.datetime.utcnow(), claimed_by=None)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                self.processed += len(events)
+                self.batches += 1
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"[Stripe Worker Error] Batch of {len(events)} failed: {e}")
+                await self._release(db, event_ids, str(e))
+            return len(events)
+
+    async def _release(self, db: AsyncSession, event_ids: List[str], error: str):
+        give_up = StripeEvent.attempts + 1 >= self.max_attempts
+        await db.execute(
+            update(StripeEvent)
+            .where(StripeEvent.event_id.in_(event_ids))
+            .values(
+                attempts=StripeEvent.attempts + 1,
+                status=case((give_up, "failed"), else_="pending"),
+                last_error=error[:1000],
+                claimed_by=None,
+                claimed_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        self.failed += len(event_ids)
+
+    async def drain(self) -> int:
+        """Process everything currently pending (used at shutdown and in tests)."""
+        total = 0
+        while True:
+            claimed = await self.process_batch()
+            if not claimed:
+                return total
+            total += claimed
+
+    def stats(self) -> dict:
+        return {"processed": self.processed, "failed": self.failed, "batches": self.batches, "workers": len(self._tasks)}
+
+
+stripe_event_processor = StripeEventProcessor(
+    batch_size=settings.STRIPE_WEBHOOK_BATCH_SIZE,
+    batch_window=settings.STRIPE_WEBHOOK_BATCH_WINDOW,
+    poll_interval=settings.STRIPE_WEBHOOK_POLL_INTERVAL,
+    max_attempts=settings.STRIPE_WEBHOOK_MAX_ATTEMPTS,
+    claim_timeout=settings.STRIPE_WEBHOOK_CLAIM_TIMEOUT,
+)
@@ -1,9 +1,13 @@
 # app/services/stripe_service.py
 import stripe
 from app.config import settings
+from app.utils.metrics import instrumented
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE.rstrip("/")
 
+@instrumented("stripe")
 def create_checkout_session(amount_usd: float, currency="usd", success_url="https://example.com/success", cancel_url="https://example.com/cancel"):
     try:
         session = stripe.checkout.Session.create(
@@ -27,6 +31,7 @@ def create_checkout_session(amount_usd: float, currency="usd", success_url="http
         print(f"[Stripe Error] {e}")
         return None
 
+@instrumented("stripe", cassette=False)  # signature check is local, never recorded or replayed
 def handle_stripe_webhook(payload, sig_header):
     import stripe
     from app.config import settings
@@ -0,0 +1,332 @@
+# app/services/travel_service.py
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+import aiohttp
+
+from app.config import settings
+from app.services.amadeus_service import search_flights_async, search_hotels_async
+from app.utils.helpers import normalize_city_code, normalize_hotel_city_code
+from app.utils.tracing import inject_headers, start_span, traced
+
+logger = logging.getLogger(__name__)
+
+
+class LocalTravelService:
+    """In-process flight/hotel search shared by the /booking routes and the voice agent."""
+
+    @traced("travel_service.find_flights")
+    async def find_flights(self, origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0,
+                           session_id: str = None):
+        return await search_flights_async(
+            normalize_city_code(origin),
+            normalize_city_code(destination),
+            departure_date,
+            adults=adults,
+            children=children,
+        )
+
+    @traced("travel_service.find_hotels")
+    async def find_hotels(self, city_code: str, check_in_date: str, check_out_date: str, adults: int = 1, children: int = 0,
+                          session_id: str = None):
+        return await search_hotels_async(normalize_hotel_city_code(city_code), check_in_date, check_out_date, adults + children)
+
+    async def iter_flights_flex(self, origins, destinations, dates, adults: int = 1, children: int = 0,
+                                concurrency: int = 8, deadline: float = 12.0):
+        """
+        Search every origin x destination x date combination concurrently, yielding
+        each result cell as soon as its search completes.
+
+        At most ``concurrency`` searches run at once; whatever has not finished after
+        ``deadline`` seconds is yielded as timed out rather than holding the response.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        combos = [(o, d, day) for o in origins for d in destinations for day in dates if o != d]
+
+        async def one(origin, destination, day):
+            async with semaphore:
+                return await self.find_flights(origin, destination, day, adults=adults, children=children)
+
+        tasks = {asyncio.create_task(one(*combo)): combo for combo in combos}
+        pending = set(tasks)
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + deadline
+        try:
+            while pending:
+                remaining = give_up_at - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    origin, destination, day = tasks[task]
+                    if task.exception() is not None:
+                        logger.error(f"[Flex Search] {origin}-{destination} {day} failed: {task.exception()}")
+                        yield flight_cell(origin, destination, day, status="error")
+                    else:
+                        yield flight_cell(origin, destination, day, offers=task.result())
+            for task in pending:
+                task.cancel()
+            for task in pending:
+                yield flight_cell(*tasks[task], status="timeout")
+        finally:
+            # Also reached when the consumer stops early (e.g. a streaming client disconnects)
+            for task in pending:
+                task.cancel()
+
+    async def find_flights_flex(self, origins, destinations, dates, adults: int = 1, children: int = 0,
+                                concurrency: int = 8, deadline: float = 12.0):
+        cells = [cell async for cell in self.iter_flights_flex(
+            origins, destinations, dates, adults=adults, children=children, concurrency=concurrency, deadline=deadline
+        )]
+        return merge_flight_cells(cells)
+
+    async def _find_hotels_for_stay(self, city_code: str, check_in: str, check_out: str, adults: int, children: int):
+        if check_in >= check_out:
+            logger.warning(f"[Trip Search] Arrival on {check_in} is on or after check-out {check_out}")
+            return []
+        return await self.find_hotels(city_code, check_in, check_out, adults=adults, children=children)
+
+    async def iter_trip(self, origin: str, destination: str, departure_date: str, check_out_date: str = None,
+                        nights: int = None, adults: int = 1, children: int = 0):
+        """
+        Cheapest flight plus hotel for one trip, searched concurrently.
+
+        Yields ``("flight", ...)`` and ``("hotel", ...)`` events as each part lands,
+        then a final ``("summary", bundle)``. The hotel search starts right away
+        assuming check-in on the departure date; if the cheapest flight lands on a
+        later day it is re-run for the arrival date (emitting a second hotel event),
+        so the common same-day case costs max(flight, hotel).
+        """
+        def stay(check_in: str):
+            check_out = check_out_date or (date.fromisoformat(check_in) + timedelta(days=nights or 1)).isoformat()
+            return check_in, check_out
+
+        hotel_city = normalize_hotel_city_code(destination)
+        check_in, check_out = stay(departure_date)
+        flight_task = asyncio.create_task(
+            self.find_flights(origin, destination, departure_date, adults=adults, children=children)
+        )
+        hotel_task = asyncio.create_task(
+            self._find_hotels_for_stay(hotel_city, check_in, check_out, adults, children)
+        )
+        flights, flight, hotels, hotel, requeried = [], None, [], None, False
+        pending = {flight_task, hotel_task}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if flight_task in done:
+                    flights = flight_task.result()
+                    if isinstance(flights, dict) or not flights:
+                        flights = []
+                    flight = min(flights, key=offer_price) if flights else None
+                    yield "flight", {
+                        "flight": flight,
+                        "flight_summary": summarize_flight_offer(flight) if flight else None,
+                        "flights_found": len(flights),
+                    }
+                    arrival_day = ((summarize_flight_offer(flight)["arrival_at"] or "")[:10] if flight else "")
+                    if arrival_day and arrival_day != check_in:
+                        hotel_task.cancel()
+                        pending.discard(hotel_task)
+                        requeried = True
+                        check_in, check_out = stay(arrival_day)
+                        hotel_task = asyncio.create_task(
+                            self._find_hotels_for_stay(hotel_city, check_in, check_out, adults, children)
+                        )
+                        pending.add(hotel_task)
+                if hotel_task in done:
+                    hotels = hotel_task.result() or []
+                    priced = sorted((h for h in hotels if hotel_price(h) != float("inf")), key=hotel_price)
+                    hotel = priced[0] if priced else None
+                    yield "hotel", {
+                        "hotel": hotel,
+                        "check_in_date": check_in,
+                        "check_out_date": check_out,
+                        "hotels_found": len(hotels),
+                        "hotel_requeried": requeried,
+                    }
+        finally:
+            flight_task.cancel()
+            hotel_task.cancel()
+        yield "summary", bundle_trip(flight, hotel, check_in, check_out, len(flights), len(hotels), requeried)
+
+    async def find_trip(self, origin: str, destination: str, departure_date: str, check_out_date: str = None,
+                        nights: int = None, adults: int = 1, children: int = 0):
+        async for event, data in self.iter_trip(origin, destination, departure_date, check_out_date=check_out_date,
+                                                nights=nights, adults=adults, children=children):
+            if event == "summary":
+                return data
+
+
+class RemoteTravelService:
+    """Same interface as LocalTravelService, served by a remote deployment's /booking API."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._session_loop = loop
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get(self, path: str, params: dict, key: str):
+        try:
+            with start_span("travel_service.remote", path=path):
+                # The booking service continues our trace from the traceparent header
+                headers = inject_headers({})
+                async with self._get_session().get(f"{self.base_url}{path}", params=params, headers=headers) as resp:
+                    if resp.status != 200:
+                        logger.warning(f"[Remote Travel Service] {path} returned {resp.status}")
+                        return []
+                    result = await resp.json()
+                    return result.get(key) or []
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"[Remote Travel Service] {path} failed: {e}")
+            return []
+
+    async def find_flights(self, origin: str, destination: str, departure_date: str, adults: int = 1, children: int = 0,
+                           session_id: str = "voice"):
+        params = {
+            "originLocationCode": origin,
+            "destinationLocationCode": destination,
+            "departureDate": departure_date,
+            "adults": adults,
+            "children": children,
+            "session_id": session_id,
+        }
+        return await self._get("/booking/flights", params, "flights")
+
+    async def find_hotels(self, city_code: str, check_in_date: str, check_out_date: str, adults: int = 1, children: int = 0,
+                          session_id: str = "voice"):
+        params = {
+            "city_code": city_code,
+            "check_in_date": check_in_date,
+            "check_out_date": check_out_date,
+            "adults": adults,
+            "children": children,
+            "session_id": session_id,
+        }
+        return await self._get("/booking/hotels", params, "hotels")
+
+
+travel_service = LocalTravelService()
+remote_travel_service = RemoteTravelService(settings.BOOKING_API_BASE_URL)
+
+
+def get_voice_travel_service():
+    """The voice agent searches in-process unless VOICE_DISPATCH_MODE=remote."""
+    if settings.VOICE_DISPATCH_MODE == "remote":
+        return remote_travel_service
+    return travel_service
+
+
+def summarize_flight_offer(offer: dict) -> dict:
+    """Flatten an Amadeus flight offer into the few fields the voice agent speaks."""
+    segments = (offer.get("itineraries") or [{}])[0].get("segments") or [{}]
+    first, last = segments[0], segments[-1]
+    price = offer.get("price", {})
+    carrier = first.get("carrierCode") or (offer.get("validatingAirlineCodes") or [None])[0]
+    return {
+        "airline": carrier,
+        "flight_number": f"{carrier or ''}{first.get('number', '')}",
+        "departure_at": first.get("departure", {}).get("at"),
+        "arrival_at": last.get("arrival", {}).get("at"),
+        "stops": max(len(segments) - 1, 0),
+        "price": price.get("grandTotal") or price.get("total"),
+        "currency": price.get("currency"),
+    }
+
+
+def offer_price(offer: dict) -> float:
+    price = offer.get("price", {})
+    try:
+        return float(price.get("grandTotal") or price.get("total"))
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+def flight_cell(origin: str, destination: str, day: str, offers=None, status: str = None) -> dict:
+    """One origin/destination/date entry of a multi-search result."""
+    cell = {"origin": origin, "destination": destination, "date": day}
+    if status is None:
+        if isinstance(offers, dict) and "error" in offers:
+            status, offers = "error", None
+        elif not offers:
+            status, offers = "no_flights", None
+        else:
+            status = "ok"
+    cell["status"] = status
+    if offers:
+        offers = sorted(offers, key=offer_price)
+        cheapest = offers[0]
+        cell["cheapest_price"] = offer_price(cheapest)
+        cell["currency"] = cheapest.get("price", {}).get("currency")
+        cell["offer_count"] = len(offers)
+        cell["offers"] = offers
+    return cell
+
+
+def merge_flight_cells(cells) -> dict:
+    """Price-sorted list plus a route x date matrix of cheapest prices."""
+    priced = sorted((c for c in cells if c["status"] == "ok"), key=lambda c: c["cheapest_price"])
+    unpriced = [c for c in cells if c["status"] != "ok"]
+    matrix = {}
+    for cell in priced:
+        matrix.setdefault(f"{cell['origin']}-{cell['destination']}", {})[cell["date"]] = cell["cheapest_price"]
+    return {
+        "results": priced + unpriced,
+        "cheapest": priced[0] if priced else None,
+        "matrix": matrix,
+        "searched": len(cells),
+        "timed_out": sum(1 for c in cells if c["status"] == "timeout"),
+        "failed": sum(1 for c in cells if c["status"] == "error"),
+    }
+
+
+def hotel_price(hotel: dict) -> float:
+    try:
+        return float(hotel.get("price"))
+    except (TypeError, ValueError):
+        return float("inf")
+
+
+def bundle_trip(flight, hotel, check_in_date: str, check_out_date: str, flights_found: int, hotels_found: int,
+                hotel_requeried: bool = False) -> dict:
+    """Trip search result; the total is only given when both parts are priced in one currency."""
+    flight_currency = flight.get("price", {}).get("currency") if flight else None
+    hotel_currency = hotel.get("currency") if hotel else None
+    total = None
+    if flight and hotel and flight_currency == hotel_currency:
+        total = round(offer_price(flight) + hotel_price(hotel), 2)
+    return {
+        "flight": flight,
+        "flight_summary": summarize_flight_offer(flight) if flight else None,
+        "hotel": hotel,
+        "check_in_date": check_in_date,
+        "check_out_date": check_out_date,
+        "flights_found": flights_found,
+        "hotels_found": hotels_found,
+        "hotel_requeried": hotel_requeried,
+        "total_price": total,
+        "currency": flight_currency if total is not None else None,
+    }
+
+
+def compact_flight_offer(offer: dict) -> dict:
+    return {"id": offer.get("id"), **summarize_flight_offer(offer)}
+
+
+def compact_hotel(hotel: dict) -> dict:
+    return {key: hotel.get(key) for key in ("name", "price", "currency", "checkInDate", "checkOutDate")}
@@ -0,0 +1,224 @@
+# app/utils/cassette.py
+import asyncio
+import functools
+import hashlib
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt but optional at runtime
+    orjson = None
+
+MAGIC = b"MAXXCAS1"
+# Per frame: 16-byte request digest, recorded latency in seconds, payload length
+_FRAME = struct.Struct("<16sdI")
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recording for a call and live fallback is off."""
+
+
+def _key_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    return str(value)
+
+
+def _dumps(value, sort_keys: bool = False) -> bytes:
+    # Both encoders emit the same compact UTF-8 form, so digests do not depend on which is installed
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(value, option=option, default=_key_default)
+    return json.dumps(value, default=_key_default, sort_keys=sort_keys, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def request_key(service: str, function: str, args: tuple, kwargs: dict) -> Tuple[bytes, bytes]:
+    """``(digest, canonical request)`` for one call; keyword order does not matter."""
+    canonical = _dumps([service, function, list(args), kwargs], sort_keys=True)
+    return hashlib.blake2b(canonical, digest_size=16).digest(), canonical
+
+
+class Cassette:
+    """
+    Append-only file of service-layer calls and their results, for offline replay.
+
+    Each frame is a fixed header (request digest, latency, length) followed by a
+    zlib-compressed JSON payload. Recording appends a frame per completed call
+    with one ``os.write`` on an O_APPEND descriptor, so several workers can share
+    a file. Replay scans only the headers to build the digest -> offsets index,
+    then decodes payloads straight from a read-only mmap on demand. Repeated
+    recordings of the same request are served round-robin, and ``latency_scale``
+    replays the recorded latencies (1.0 real time, 0.5 twice as fast, 0 instant).
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 0.0, on_miss: str = "error"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.on_miss = on_miss
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[bytes, List[Tuple[int, int, float]]] = {}
+        self._turns: Dict[bytes, itertools.count] = {}
+        self._lock = threading.Lock()
+        if mode == "record":
+            self._open_for_append()
+        else:
+            self._load_index()
+
+    @classmethod
+    def from_settings(cls) -> Optional["Cassette"]:
+        mode = (settings.CASSETTE_MODE or "off").lower()
+        if mode == "off":
+            return None
+        return cls(settings.CASSETTE_PATH, mode, settings.CASSETTE_LATENCY_SCALE, settings.CASSETTE_ON_MISS)
+
+    # Recording
+
+    def _open_for_append(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, MAGIC)
+
+    def record(self, digest: bytes, canonical: bytes, result, latency: float):
+        # The canonical request is already JSON, so splice it in rather than encode it twice
+        payload = zlib.compress(b'{"request":' + canonical + b',"response":' + _dumps(result)
+                                + b',"recorded_at":' + _dumps(time.time()) + b"}")
+        os.write(self._fd, _FRAME.pack(digest, latency, len(payload)) + payload)
+        self.recorded += 1
+
+    # Replay
+
+    def _load_index(self):
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size <= len(MAGIC):
+                return
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a cassette file")
+        position, size = len(MAGIC), len(self._map)
+        while position + _FRAME.size <= size:
+            digest, latency, length = _FRAME.unpack_from(self._map, position)
+            start = position + _FRAME.size
+            if start + length > size:
+                logger.warning(f"[Cassette Error] Ignoring truncated frame at byte {position} of {self.path}")
+                break
+            self._index.setdefault(digest, []).append((start, length, latency))
+            position = start + length
+
+    def _decode(self, start: int, length: int) -> dict:
+        return _loads(zlib.decompress(self._map[start:start + length]))
+
+    def lookup(self, digest: bytes) -> Optional[Tuple[object, float]]:
+        """Next recorded ``(result, latency)`` for the request, or None."""
+        entries = self._index.get(digest)
+        if not entries:
+            return None
+        with self._lock:
+            turn = next(self._turns.setdefault(digest, itertools.count()))
+        start, length, latency = entries[turn % len(entries)]
+        return self._decode(start, length)["response"], latency * self.latency_scale
+
+    def entries(self) -> Iterator[dict]:
+        """Every recorded frame, in file order (for inspection and tooling)."""
+        frames = sorted((start, length, latency) for entries in self._index.values() for start, length, latency in entries)
+        for start, length, latency in frames:
+            entry = self._decode(start, length)
+            entry["latency"] = latency
+            yield entry
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "path": self.path, "requests": len(self._index),
+                "recorded": self.recorded, "replayed": self.replayed, "misses": self.misses}
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    # Wrapping service functions
+
+    def _miss(self, service: str, function: str):
+        self.misses += 1
+        if self.on_miss != "live":
+            raise CassetteMiss(f"no recording for {service}.{function} in {self.path}")
+        logger.warning(f"[Cassette Error] No recording for {service}.{function}; calling upstream")
+
+    def wrap(self, service: str, function: str, func):
+        """Wrap a sync or async service function so its calls are recorded or replayed."""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                digest, canonical = request_key(service, function, args, kwargs)
+                if self.mode == "replay":
+                    hit = self.lookup(digest)
+                    if hit is not None:
+                        self.replayed += 1
+                        if hit[1]:
+                            await asyncio.sleep(hit[1])
+                        return hit[0]
+                    self._miss(service, function)
+                started = time.perf_counter()
+                result = await func(*args, **kwargs)
+                if self.mode == "record":
+                    self.record(digest, canonical, result, time.perf_counter() - started)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            digest, canonical = request_key(service, function, args, kwargs)
+            if self.mode == "replay":
+                hit = self.lookup(digest)
+                if hit is not None:
+                    self.replayed += 1
+                    if hit[1]:
+                        time.sleep(hit[1])
+                    return hit[0]
+                self._miss(service, function)
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            if self.mode == "record":
+                self.record(digest, canonical, result, time.perf_counter() - started)
+            return result
+
+        return wrapper
+
+
+# Set from CASSETTE_MODE at import; service functions are wrapped as they are decorated
+CASSETTE = Cassette.from_settings()
+
+
+def through_cassette(service: str, function: str, func):
+    """``func`` wrapped by the configured cassette, or unchanged when recording/replay is off."""
+    return CASSETTE.wrap(service, function, func) if CASSETTE is not None else func
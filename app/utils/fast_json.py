@@ -0,0 +1,31 @@
+# app/utils/fast_json.py
+import json
+import logging
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt but optional at runtime
+    orjson = None
+    logger.info("orjson not installed; falling back to the standard json encoder")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson when it is available.
+
+    Return it directly from a route (rather than a dict) so FastAPI skips
+    ``jsonable_encoder``, which walks every node of large Amadeus payloads.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
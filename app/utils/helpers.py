@@ -0,0 +1,9 @@
+from app.services.location_index import get_location_index
+
+def normalize_city_code(code: str) -> str:
+    """Metro/city code to the primary airport used for flight searches (LON -> LHR)."""
+    return get_location_index().primary_airport(code)
+
+def normalize_hotel_city_code(code: str) -> str:
+    """Airport code to the city code hotels are listed under (LHR -> LON)."""
+    return get_location_index().metro_code(code)
@@ -0,0 +1,307 @@
+# app/utils/metrics.py
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.utils.cassette import through_cassette
+from app.utils.tracing import start_span
+
+# Seconds; covers cache hits (sub-millisecond) through slow Amadeus searches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + rendered + "}" if rendered else ""
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Metric:
+    """A named metric family; ``labels(...)`` returns (and caches) one child series."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        return _Value()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def samples(self) -> List[Tuple[str, tuple, float]]:
+        return [(self.name, tuple(zip(self.labelnames, key)), child.value)
+                for key, child in list(self._children.items())]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self):
+        samples = []
+        for key, child in list(self._children.items()):
+            labels = tuple(zip(self.labelnames, key))
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", labels + (("le", _format_value(float(bound))),), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+    """
+    Holds metric families plus collector callbacks, and renders the Prometheus text format.
+
+    Collectors are called at scrape time and return ``(name, kind, help, samples)``
+    tuples, where samples are ``(labels_dict, value)``; they suit numbers other
+    components already keep (cache counters, queue depths) and cost nothing between scrapes.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics, collectors = list(self._metrics.values()), list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_format_labels(labels.items())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+
+UPSTREAM_CALLS = Counter("upstream_calls_total", "Service-layer calls by outcome.", ("service", "function", "outcome"))
+UPSTREAM_LATENCY = Histogram("upstream_call_duration_seconds", "Service-layer call latency.", ("service", "function"))
+UPSTREAM_IN_FLIGHT = Gauge("upstream_calls_in_flight", "Service-layer calls in progress.", ("service",))
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing every HTTP request under its route template
+    (``/booking/flights``, not the raw URL), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+
+
+def _outcome_for_error(error: BaseException) -> str:
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return str(status) if status else type(error).__name__
+
+
+def _outcome_for_result(result) -> str:
+    # Service functions report upstream failures as {"error": ...} rather than raising
+    return "error" if isinstance(result, dict) and "error" in result else "ok"
+
+
+def instrumented(service: str, name: Optional[str] = None, cassette: bool = True):
+    """
+    Count and time calls to a sync or async service function, as a trace span too.
+
+    Outcomes are "ok", "error" for ``{"error": ...}`` results, and the HTTP status
+    (or exception class) for exceptions that escape. Calls are recorded or replayed
+    here too when CASSETTE_MODE is set; pass ``cassette=False`` for functions that
+    do local work (such as verifying a webhook) rather than call upstream.
+    """
+
+    def decorate(func):
+        function = name or func.__name__
+        if cassette:
+            func = through_cassette(service, function, func)
+        span_name = f"{service}.{function}"
+        latency = UPSTREAM_LATENCY.labels(service, function)
+        in_flight = UPSTREAM_IN_FLIGHT.labels(service)
+
+        def record(started, outcome):
+            latency.observe(time.perf_counter() - started)
+            UPSTREAM_CALLS.labels(service, function, outcome).inc()
+            in_flight.dec()
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                in_flight.inc()
+                started = time.perf_counter()
+                try:
+                    with start_span(span_name):
+                        result = await func(*args, **kwargs)
+                except BaseException as e:
+                    record(started, "cancelled" if isinstance(e, asyncio.CancelledError) else _outcome_for_error(e))
+                    raise
+                record(started, _outcome_for_result(result))
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            in_flight.inc()
+            started = time.perf_counter()
+            try:
+                with start_span(span_name):
+                    result = func(*args, **kwargs)
+            except Exception as e:
+                record(started, _outcome_for_error(e))
+                raise
+            record(started, _outcome_for_result(result))
+            return result
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,131 @@
+# app/utils/profiling.py
+import cProfile
+import hmac
+import io
+import logging
+import marshal
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from app.utils.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+
+class Profile:
+    __slots__ = ("id", "method", "path", "created", "duration_ms", "trace_id", "profiler")
+
+    def __init__(self, profile_id: str, method: str, path: str, profiler: cProfile.Profile, duration: float,
+                 trace_id: Optional[str]):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.created = time.time()
+        self.duration_ms = round(duration * 1000, 3)
+        self.trace_id = trace_id
+        self.profiler = profiler
+
+    def summary(self) -> dict:
+        return {"id": self.id, "method": self.method, "path": self.path, "created": self.created,
+                "duration_ms": self.duration_ms, "trace_id": self.trace_id}
+
+    def dump(self) -> bytes:
+        """The profile in the ``.prof`` format that pstats, snakeviz etc. load."""
+        self.profiler.create_stats()
+        return marshal.dumps(self.profiler.stats)
+
+    def text(self, sort: str = "cumulative", limit: int = 60) -> str:
+        buffer = io.StringIO()
+        pstats.Stats(self.profiler, stream=buffer).sort_stats(sort).print_stats(limit)
+        return buffer.getvalue()
+
+
+class ProfileStore:
+    def __init__(self, max_profiles: int = 20):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles.values())]
+
+
+PROFILES = ProfileStore()
+
+# cProfile hooks the whole interpreter thread, so only one request is profiled at a time
+_profiling = threading.Lock()
+
+
+def is_admin(token: Optional[str], admin_token: Optional[str]) -> bool:
+    return bool(admin_token and token and hmac.compare_digest(token.encode(), admin_token.encode()))
+
+
+class ProfilingMiddleware:
+    """
+    Runs a request under cProfile when an admin asks for it (``X-Profile: 1`` with a
+    valid ``X-Admin-Token``) or when it is picked by ``sample_rate``, and stores the
+    profile for download from ``/admin/profiles``. The response carries ``X-Profile-Id``.
+
+    Other requests only pay for a header scan. Since the event loop is shared, a
+    profile also contains whatever else the loop ran during that request, while
+    work handed to worker threads shows up only as the wait for it.
+    """
+
+    def __init__(self, app, admin_token: Optional[str] = None, sample_rate: float = 0.0, store: ProfileStore = PROFILES):
+        self.app = app
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self.store = store
+
+    def _requested(self, scope) -> bool:
+        if self.admin_token:
+            headers = dict(scope["headers"])
+            if headers.get(b"x-profile") in (b"1", b"true") and \
+                    is_admin(headers.get(b"x-admin-token", b"").decode("latin-1"), self.admin_token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope) or not _profiling.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        profiler = cProfile.Profile()
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError as e:  # another profiler (e.g. a debugger or coverage) is active
+            _profiling.release()
+            logger.warning(f"[Profiling Error] {e}")
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.disable()
+            _profiling.release()
+            span = current_span()
+            self.store.add(Profile(profile_id, scope["method"], scope["path"], profiler,
+                                   time.perf_counter() - started, span.trace_id if span is not None else None))
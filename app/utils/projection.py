@@ -0,0 +1,46 @@
+# app/utils/projection.py
+from functools import lru_cache
+from typing import Callable, Optional
+
+
+@lru_cache(maxsize=256)
+def parse_fields(fields: str) -> dict:
+    """
+    Turn ``"id,price.total,itineraries.segments.carrierCode"`` into a nested
+    selection tree. Lists are traversed transparently, so a path names dict keys
+    only.
+    """
+    tree = {}
+    for path in fields.split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def project(value, tree: dict):
+    """Keep only the parts of ``value`` selected by ``tree``; missing keys are skipped."""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+def make_shaper(view: str = "full", fields: Optional[str] = None,
+                compact: Optional[Callable[[dict], dict]] = None) -> Callable[[list], list]:
+    """
+    Per-request function that strips a list of offers down to the requested shape.
+
+    ``fields`` wins over ``view``; ``view=compact`` uses the route's ``compact``
+    summarizer; ``view=full`` returns items untouched.
+    """
+    if fields:
+        tree = parse_fields(fields)
+        return lambda items: [project(item, tree) for item in items]
+    if view == "compact" and compact is not None:
+        return lambda items: [compact(item) for item in items]
+    return lambda items: items
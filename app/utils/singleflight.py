@@ -0,0 +1,89 @@
+# app/utils/singleflight.py
+import asyncio
+import contextvars
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one upstream call.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait for and share its result (or exception). Sync callers coordinate
+    across threads, async callers across tasks on the same event loop.
+
+    An async shared call runs in an empty ``contextvars`` context rather than the
+    first caller's, so its request state (trace span, Amadeus priority) does not
+    leak to the others. Anything the call depends on belongs in the key and ``fn``.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_calls.get(key)
+            if entry is not None and entry[0] is loop:
+                task = entry[1]
+                self.shared += 1
+            else:
+                task = loop.create_task(fn(), context=contextvars.Context())
+                self._async_calls[key] = (loop, task)
+                self.calls += 1
+                task.add_done_callback(lambda t: self._forget(key, t))
+        # Shield so one waiter being cancelled does not cancel the call for everyone else
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        with self._lock:
+            entry = self._async_calls.get(key)
+            if entry is not None and entry[1] is task:
+                del self._async_calls[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls) + len(self._async_calls)}
@@ -0,0 +1,45 @@
+# app/utils/streaming.py
+import json
+import logging
+from typing import AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.utils.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_event(event: str, data, fmt: str) -> str:
+    payload = dumps(data).decode("utf-8")
+    if fmt == "sse":
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f'{{"event":{json.dumps(event)},"data":{payload}}}\n'
+
+
+def event_stream(events: AsyncIterator[Tuple[str, object]], fmt: str) -> StreamingResponse:
+    """
+    Stream ``(event, data)`` pairs as NDJSON lines or Server-Sent Events.
+
+    Each event is flushed as soon as it is produced. A failure part-way through
+    is reported as a final ``error`` event, since the status line has already
+    been sent by then.
+    """
+    async def body():
+        try:
+            async for event, data in events:
+                yield encode_event(event, data, fmt)
+        except Exception as e:
+            logger.error(f"[Stream Error] {e}")
+            yield encode_event("error", {"detail": str(e)}, fmt)
+
+    return StreamingResponse(
+        body(),
+        media_type=STREAM_MEDIA_TYPES[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,227 @@
+# app/utils/tracing.py
+import asyncio
+import contextlib
+import contextvars
+import functools
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+# W3C trace context: version-traceid-parentid-flags
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    # Ids only need to be unique, not unpredictable; getrandbits is far cheaper than urandom
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "sampled", "attributes", "started", "duration", "error")
+
+    def __init__(self, trace_id: str, span_id: str, parent_id: Optional[str], name: str, sampled: bool,
+                 attributes: Optional[dict] = None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.started = time.time()
+        self.duration = None
+        self.error = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        self.duration = time.time() - self.started
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.started,
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+def parse_traceparent(header: Optional[str]):
+    """Return ``(trace_id, parent_span_id, sampled)`` from a W3C ``traceparent``, or None."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or match.group(1) == "ff" or set(match.group(2)) == {"0"} or set(match.group(3)) == {"0"}:
+        return None
+    return match.group(2), match.group(3), bool(int(match.group(4), 16) & 1)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def use_span(span: Optional[Span]):
+    """Make ``span`` current for the block, e.g. for work carried over into another context."""
+    token = _current.set(span)
+    try:
+        yield span
+    finally:
+        _current.reset(token)
+
+
+def inject_headers(headers: dict) -> dict:
+    """Add the current ``traceparent`` to outgoing headers (our own services only)."""
+    span = _current.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+class TraceStore:
+    """The spans of the most recent ``max_traces`` sampled traces, for the admin endpoints."""
+
+    def __init__(self, max_traces: int = 200):
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, span: Span):
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span.to_dict())
+
+    def get(self, trace_id: str) -> Optional[List[dict]]:
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            return sorted(spans, key=lambda s: s["start"]) if spans is not None else None
+
+    def recent(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            items = list(self._traces.items())[-limit:]
+        summaries = []
+        for trace_id, spans in reversed(items):
+            ids = {s["span_id"] for s in spans}
+            roots = [s for s in spans if s["parent_id"] not in ids] or spans
+            root = max(roots, key=lambda s: s["duration_ms"])
+            summaries.append({"trace_id": trace_id, "name": root["name"], "duration_ms": root["duration_ms"],
+                              "spans": len(spans), "start": root["start"]})
+        return summaries
+
+
+TRACES = TraceStore()
+
+
+@contextlib.contextmanager
+def start_span(name: str, **attributes):
+    """
+    Time a block as a child of the current span. Yields the span, or None when the
+    request is not being traced, in which case nothing is allocated or recorded.
+    """
+    parent = _current.get()
+    if parent is None or not parent.sampled:
+        yield None
+        return
+    span = Span(parent.trace_id, _new_id(64), parent.span_id, name, True, attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.error = type(e).__name__
+        raise
+    finally:
+        span.finish()
+        _current.reset(token)
+        TRACES.record(span)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of ``start_span`` for sync and async functions."""
+
+    def decorate(func):
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+class TracingMiddleware:
+    """
+    Opens a root span per HTTP request, continuing the caller's trace when a valid
+    ``traceparent`` arrives, and returns our ``traceparent`` on the response.
+
+    A request is recorded when the caller's trace is sampled or, for new traces,
+    with probability ``sample_rate``; unsampled requests only carry ids.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.0, store: TraceStore = TRACES):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.store = store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                incoming = parse_traceparent(value.decode("latin-1"))
+                break
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+        else:
+            trace_id, parent_id = _new_id(128), None
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        span = Span(trace_id, _new_id(64), parent_id, scope["method"], sampled)
+        status = 500
+
+        async def send_with_traceparent(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", span.traceparent.encode())]
+            await send(message)
+
+        token = _current.set(span)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            if sampled:
+                span.finish()
+                route = getattr(scope.get("route"), "path", None) or scope.get("path", "")
+                span.name = f"{scope['method']} {route}"
+                span.set("http.status", status)
+                self.store.record(span)
@@ -0,0 +1,121 @@
+# benchmarks/intent_parser.py
+"""
+Benchmark the voice intent parser against the regex + dateutil ``extract_info`` it replaced.
+
+Reports per-utterance parse time (cold, and warm for the memoized parser) and how
+many place slots each leaves unresolvable offline, i.e. would cost an Amadeus
+location lookup, as JSON.
+
+    python -m benchmarks.intent_parser --rounds 2000
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from datetime import date, datetime
+
+from dateutil import parser as date_parser
+from dateutil.relativedelta import relativedelta
+
+from app.services.intent_parser import _parse, parse_intent
+from app.services.location_index import get_location_index
+
+UTTERANCES = [
+    "Book a flight from Delhi to Dubai on August 15",
+    "I want to fly from Mumbai to London on 15th Aug",
+    "from new york to paris on december 3rd please",
+    "find me a hotel in Singapore on March 10",
+    "flights from bangalore to singapore tomorrow",
+    "hotel in rio de janeiro on the 3rd of march",
+    "book flight from chennai to kochi next friday for 2 adults",
+    "from del to dxb on 2031-01-05",
+    "can you find a hotel in london on 12/24",
+    "fly from toronto to san francisco in 2 weeks",
+    "from dehli to dubai on 20 september",
+    "hotel in paris this saturday",
+]
+
+
+def legacy_extract_info(text: str):
+    """``app.routes.voice.extract_info`` as it was before the intent parser, kept for comparison."""
+    origin, destination, city, date_str = None, None, None, None
+    text = text.lower()
+
+    flight_match = re.search(r"from\s+([\w\s]+)\s+to\s+([\w\s]+)", text)
+    hotel_match = re.search(r"hotel\s+in\s+([\w\s]+)", text)
+    date_match = re.search(r"on\s+([a-zA-Z0-9\s,]+)", text)
+
+    if flight_match:
+        origin = flight_match.group(1).strip()
+        destination = flight_match.group(2).strip()
+    elif hotel_match:
+        city = hotel_match.group(1).strip()
+
+    if date_match:
+        try:
+            parsed_date = date_parser.parse(date_match.group(1), fuzzy=True)
+            now = datetime.now()
+            if parsed_date < now and (now - parsed_date).days < 180:
+                parsed_date += relativedelta(years=1)
+            date_str = parsed_date.strftime("%Y-%m-%d")
+        except Exception:
+            date_str = None
+
+    return origin, destination, city, date_str
+
+
+def compiled_extract_info(text: str):
+    intent = parse_intent(text)
+    return intent.origin, intent.destination, intent.city, intent.date
+
+
+def time_per_call(func, utterances, rounds: int, before_each=None) -> float:
+    """Mean microseconds per call over ``rounds`` passes of the corpus."""
+    elapsed = 0.0
+    for _ in range(rounds):
+        for text in utterances:
+            if before_each:
+                before_each()
+            started = time.perf_counter()
+            func(text)
+            elapsed += time.perf_counter() - started
+    return round(elapsed / (rounds * len(utterances)) * 1e6, 2)
+
+
+def unresolved_places(func, utterances) -> int:
+    """Place slots the offline index cannot resolve even fuzzily, so voice would ask Amadeus."""
+    index = get_location_index()
+    misses = 0
+    for text in utterances:
+        origin, destination, city, _ = func(text)
+        misses += sum(1 for place in (origin, destination, city) if place and index.lookup(place) is None)
+    return misses
+
+
+def run(rounds: int) -> dict:
+    get_location_index()  # load outside the timed region
+    results = {}
+    for name, func in (("legacy", legacy_extract_info), ("compiled", compiled_extract_info)):
+        results[name] = {
+            "cold_us": time_per_call(func, UTTERANCES, rounds, _parse.cache_clear if name == "compiled" else None),
+            "warm_us": time_per_call(func, UTTERANCES, rounds),
+            "unresolved_places": unresolved_places(func, UTTERANCES),
+            "dates_found": sum(1 for text in UTTERANCES if func(text)[3]),
+            "sample": dict(zip(UTTERANCES[:3], (func(text) for text in UTTERANCES[:3]))),
+        }
+    results["speedup_cold"] = round(results["legacy"]["cold_us"] / results["compiled"]["cold_us"], 2)
+    results["speedup_warm"] = round(results["legacy"]["warm_us"] / results["compiled"]["warm_us"], 2)
+    return {"utterances": len(UTTERANCES), "rounds": rounds, "today": date.today().isoformat(), "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.rounds), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
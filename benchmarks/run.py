@@ -0,0 +1,319 @@
+# benchmarks/run.py
+"""
+Load-test the app against the local Amadeus/Stripe stand-in and report latency as JSON.
+
+Starts the stand-in in-process and the app under uvicorn in a subprocess (with a
+throwaway SQLite database), then drives each scenario with ``--concurrency``
+workers for ``--duration`` seconds and reports RPS, error rate and latency
+percentiles. Pass ``--compare`` with an earlier report to flag regressions.
+
+    python -m benchmarks.run --concurrency 32 --duration 20 --latency-ms 150 --output after.json
+    python -m benchmarks.run --scenarios flights,hotels --compare before.json
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.standin import build_standin
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = [("DEL", "DXB"), ("BOM", "LHR"), ("DEL", "SIN"), ("BLR", "DXB"), ("NYC", "LON"), ("PAR", "IST")]
+HOTEL_CITIES = ["NYC", "LON", "DXB", "PAR", "SIN", "IST"]
+VOICE_CITIES = [("delhi", "dubai"), ("mumbai", "london"), ("bangalore", "singapore")]
+WEBHOOK_SECRET = "whsec_benchmark"
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(q * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, statuses: Dict[str, int]) -> dict:
+    ordered = sorted(latencies)
+    total = len(ordered)
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": ms(sum(ordered) / total) if total else None,
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p95_ms": ms(percentile(ordered, 0.95)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "max_ms": ms(ordered[-1]) if ordered else None,
+        "statuses": statuses,
+    }
+
+
+def _future_day(rng: random.Random, key_space: int) -> date:
+    return date.today() + timedelta(days=7 + rng.randrange(max(key_space, 1)))
+
+
+def _stripe_signature(payload: bytes, secret: str = WEBHOOK_SECRET) -> str:
+    timestamp = int(time.time())
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+# Each scenario turns (rng, key_space) into (method, path, request kwargs)
+def flights_request(rng, key_space):
+    origin, destination = rng.choice(ROUTES)
+    return "GET", "/booking/flights", {"params": {
+        "originLocationCode": origin, "destinationLocationCode": destination,
+        "departureDate": _future_day(rng, key_space).isoformat(), "session_id": "bench", "limit": "10",
+    }}
+
+
+def hotels_request(rng, key_space):
+    check_in = _future_day(rng, key_space)
+    return "GET", "/booking/hotels", {"params": {
+        "city_code": rng.choice(HOTEL_CITIES), "check_in_date": check_in.isoformat(),
+        "check_out_date": (check_in + timedelta(days=2)).isoformat(), "limit": "10",
+    }}
+
+
+def confirm_request(rng, key_space):
+    n = rng.randrange(1_000_000)
+    origin, destination = rng.choice(ROUTES)
+    return "POST", "/booking/confirm", {"json": {
+        "user_name": f"Bench User {n}", "email": f"bench{n}@example.com", "phone": f"+1555{n:07d}",
+        "origin": origin, "destination": destination, "departure_date": _future_day(rng, key_space).isoformat(),
+        "flight_number": f"EK{rng.randrange(100, 999)}", "amount_paid": round(rng.uniform(100, 900), 2),
+    }}
+
+
+def stripe_webhook_request(rng, key_space):
+    event = {
+        "id": f"evt_{uuid.uuid4().hex}",
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": f"cs_{uuid.uuid4().hex}", "metadata": {"booking_id": str(rng.randrange(1, 1000))}}},
+    }
+    payload = json.dumps(event).encode()
+    return "POST", "/booking/stripe-webhook", {
+        "data": payload, "headers": {"Stripe-Signature": _stripe_signature(payload), "Content-Type": "application/json"},
+    }
+
+
+def voice_request(rng, key_space):
+    origin, destination = rng.choice(VOICE_CITIES)
+    day = _future_day(rng, key_space)
+    return "POST", "/voice/voice/voice-webhook", {"json": {
+        "session_id": f"bench-{rng.randrange(1000)}",
+        "text": f"book a flight from {origin} to {destination} on {day.strftime('%B %d')}",
+        "metadata": {"origin": origin, "destination": destination, "date": day.isoformat()},
+    }}
+
+
+def pay_request(rng, key_space):
+    return "POST", "/booking/pay", {"json": {"amount": round(rng.uniform(100, 900), 2)}}
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "flights": flights_request,
+    "hotels": hotels_request,
+    "confirm": confirm_request,
+    "stripe_webhook": stripe_webhook_request,
+    "voice": voice_request,
+    "pay": pay_request,
+}
+DEFAULT_SCENARIOS = "flights,hotels,confirm,stripe_webhook,voice"
+
+
+async def drive(session: aiohttp.ClientSession, base_url: str, scenario: Callable, concurrency: int,
+                duration: float, key_space: int, seed: int) -> dict:
+    latencies, statuses = [], {}
+    errors = 0
+    stop_at = time.perf_counter() + duration
+
+    async def worker(index: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < stop_at:
+            method, path, kwargs = scenario(rng, key_space)
+            started = time.perf_counter()
+            try:
+                async with session.request(method, base_url + path, **kwargs) as response:
+                    await response.read()
+                    status = str(response.status)
+                    failed = response.status >= 400
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, failed = type(e).__name__, True
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(i) for i in range(concurrency)])
+    return summarize(latencies, errors, time.perf_counter() - started, statuses)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def app_environment(standin_url: str, workdir: str, args) -> dict:
+    reference = os.path.join(workdir, "reference_data.json")
+    codes = sorted({code for route in ROUTES for code in route} | set(HOTEL_CITIES))
+    with open(reference, "w", encoding="utf-8") as f:
+        # Fresh reference data, so the app does not start a background refresh mid-run
+        json.dump({"refreshed_at": time.time(), "valid_city_codes": codes, "hotel_city_codes": HOTEL_CITIES}, f)
+    env = dict(os.environ)
+    env.update({
+        "AMADEUS_CLIENT_ID": "bench", "AMADEUS_CLIENT_SECRET": "bench", "AMADEUS_BASE_URL": standin_url,
+        "USE_MOCK_FLIGHT_SEARCH": "false", "USE_MOCK_HOTEL_SEARCH": "false",
+        "STRIPE_SECRET_KEY": "sk_test_bench", "STRIPE_WEBHOOK_SECRET": WEBHOOK_SECRET, "STRIPE_API_BASE": standin_url,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "REFERENCE_DATA_PATH": reference,
+        "AMADEUS_FLIGHT_SEARCH_MAX": str(args.flight_offers),
+        "AMADEUS_RATE_LIMIT": str(args.amadeus_rate), "AMADEUS_RATE_BURST": str(int(args.amadeus_rate)),
+        "GOOGLE_REFRESH_TOKEN": "",  # no calendar invites during load tests
+    })
+    return env
+
+
+async def wait_until_up(session: aiohttp.ClientSession, url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited with code {process.returncode}")
+        try:
+            async with session.get(url + "/") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("app did not start in time")
+
+
+async def run(args) -> dict:
+    standin, standin_stats = build_standin(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status, args.seed)
+    runner = web.AppRunner(standin)
+    await runner.setup()
+    standin_port = _free_port()
+    await web.TCPSite(runner, "127.0.0.1", standin_port).start()
+    standin_url = f"http://127.0.0.1:{standin_port}"
+
+    app_port = _free_port()
+    base_url = f"http://127.0.0.1:{app_port}"
+    workdir = tempfile.mkdtemp(prefix="maxx-bench-")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(app_port),
+         "--log-level", "warning", "--no-access-log", "--workers", str(args.workers)],
+        cwd=ROOT, env=app_environment(standin_url, workdir, args),
+    )
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    report = {
+        "config": {key: getattr(args, key) for key in (
+            "concurrency", "duration", "warmup", "latency_ms", "jitter_ms", "error_rate", "error_status",
+            "key_space", "workers", "amadeus_rate", "flight_offers", "seed")},
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "scenarios": {},
+    }
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+            await wait_until_up(session, base_url, process)
+            for name in args.scenarios.split(","):
+                scenario = SCENARIOS[name.strip()]
+                if args.warmup:
+                    await drive(session, base_url, scenario, args.concurrency, args.warmup, args.key_space, args.seed + 1)
+                report["scenarios"][name.strip()] = await drive(
+                    session, base_url, scenario, args.concurrency, args.duration, args.key_space, args.seed)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        await runner.cleanup()
+    report["standin"] = standin_stats.as_dict()
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Human-readable regressions: p95 up, or RPS down, by more than ``tolerance``."""
+    regressions = []
+    for name, current in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if before.get("p95_ms") and current.get("p95_ms") and current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if before.get("rps") and current["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {before['rps']} -> {current['rps']}")
+        if current["error_rate"] > before.get("error_rate", 0) + tolerance / 10:
+            regressions.append(f"{name}: error rate {before.get('error_rate', 0)} -> {current['error_rate']}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", default=DEFAULT_SCENARIOS, help=f"comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unrecorded seconds before each scenario")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="stand-in response delay")
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stand-in responses that fail")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--key-space", type=int, default=60, help="distinct travel dates; smaller means more cache hits")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--amadeus-rate", type=float, default=1000.0, help="client-side Amadeus rate limit per family")
+    parser.add_argument("--flight-offers", type=int, default=50, help="offers the app asks for per flight search")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression for --compare")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios.split(",") if name.strip() not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    rendered = json.dumps(report, indent=2)
+    print(rendered)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(rendered + "\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# benchmarks/standin.py
+"""
+Local stand-in for the Amadeus and Stripe APIs used by the benchmark harness.
+
+Serves the Amadeus endpoints from the seeded ``AmadeusSimulator`` (so payloads
+match what USE_MOCK_* and AMADEUS_SIMULATOR produce in-process) over real HTTP,
+after an injected delay, and fails a configurable share of requests so retries,
+circuit breakers and cache fallbacks can be measured too.
+
+    python -m benchmarks.standin --port 8081 --latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import random
+import uuid
+
+from aiohttp import web
+
+from app.services.amadeus_simulator import AmadeusSimulator
+
+
+class StandinStats:
+    def __init__(self):
+        self.requests = {}
+        self.errors = {}
+
+    def as_dict(self) -> dict:
+        return {"requests": dict(self.requests), "errors": dict(self.errors)}
+
+
+def build_standin(latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0,
+                  error_status: int = 500, seed: int = 0):
+    """Return ``(app, stats)``; the OAuth token endpoint never fails or waits."""
+    rng = random.Random(seed)
+    stats = StandinStats()
+    simulator = AmadeusSimulator(seed=seed)
+
+    @web.middleware
+    async def inject(request, handler):
+        path = request.path
+        stats.requests[path] = stats.requests.get(path, 0) + 1
+        if path == "/v1/security/oauth2/token":
+            return await handler(request)
+        delay = max(latency_ms + rng.uniform(-jitter_ms, jitter_ms), 0.0) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if error_rate and rng.random() < error_rate:
+            stats.errors[path] = stats.errors.get(path, 0) + 1
+            return web.json_response({"errors": [{"status": error_status, "title": "INJECTED"}]}, status=error_status)
+        return await handler(request)
+
+    async def amadeus(request):
+        body = await request.json() if request.can_read_body and request.path != "/v1/security/oauth2/token" else None
+        status, payload = simulator.respond(request.method, request.path, dict(request.query), body)
+        return web.json_response(payload, status=status) if payload is not None else web.Response(status=status)
+
+    async def checkout_session(request):
+        session_id = f"cs_test_{uuid.uuid4().hex}"
+        return web.json_response({"id": session_id, "object": "checkout.session",
+                                  "url": f"https://checkout.stripe.com/c/pay/{session_id}"})
+
+    app = web.Application(middlewares=[inject])
+    app.router.add_post("/v1/checkout/sessions", checkout_session)
+    app.router.add_route("*", "/{path:v[0-9]/.*}", amadeus)
+    return app, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    args = parser.parse_args()
+    app, _ = build_standin(args.latency_ms, args.jitter_ms, args.error_rate, args.error_status)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# The Amadeus SDK refuses to build a client without credentials; offline tests never use them.
+os.environ.setdefault("AMADEUS_CLIENT_ID", "test-client-id")
+os.environ.setdefault("AMADEUS_CLIENT_SECRET", "test-client-secret")
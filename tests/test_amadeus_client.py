@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from amadeus import ResponseError
+
+from app.services import amadeus_service
+from app.services.amadeus_client import AmadeusTokenManager, AsyncAmadeusClient
+
+
+def make_standin():
+    state = {"token_calls": 0, "peers": set(), "requests": []}
+
+    async def token(request):
+        state["token_calls"] += 1
+        await asyncio.sleep(0.02)
+        return web.json_response({"access_token": f"standin-token-{state['token_calls']}", "expires_in": 1799})
+
+    async def flight_offers(request):
+        state["peers"].add(request.transport.get_extra_info("peername"))
+        state["requests"].append((request.headers.get("Authorization"), dict(request.query)))
+        if request.headers.get("Authorization") == "Bearer revoked":
+            return web.json_response({"errors": [{"status": 401}]}, status=401)
+        if request.query.get("originLocationCode") == "ERR":
+            return web.json_response({"errors": [{"source": {"parameter": "originLocationCode"}, "detail": "bad origin"}]}, status=400)
+        return web.json_response({"data": [{"id": "1", "price": {"total": "99.00"}}]})
+
+    app = web.Application()
+    app.router.add_post("/v1/security/oauth2/token", token)
+    app.router.add_get("/v2/shopping/flight-offers", flight_offers)
+    return app, state
+
+
+def run_with_standin(coro_factory):
+    async def runner():
+        app, state = make_standin()
+        server = TestServer(app)
+        await server.start_server()
+        client = AsyncAmadeusClient("id", "secret", base_url=str(server.make_url("")), max_connections_per_host=2)
+        try:
+            return await coro_factory(client), state
+        finally:
+            await client.close()
+            await server.close()
+
+    return asyncio.run(runner())
+
+
+def test_token_is_reused_and_connections_are_pooled():
+    async def scenario(client):
+        for _ in range(5):
+            await client.get("/v2/shopping/flight-offers", originLocationCode="DEL", nonStop=False)
+
+    _, state = run_with_standin(scenario)
+    assert state["token_calls"] == 1
+    assert len(state["peers"]) == 1
+    auth, query = state["requests"][0]
+    assert auth == "Bearer standin-token-1"
+    assert query["nonStop"] == "false"
+
+
+def test_per_host_limit_bounds_concurrent_connections():
+    async def scenario(client):
+        await asyncio.gather(*[client.get("/v2/shopping/flight-offers", originLocationCode="DEL") for _ in range(10)])
+
+    _, state = run_with_standin(scenario)
+    assert len(state["peers"]) <= 2
+
+
+def test_error_status_raises_sdk_response_error():
+    async def scenario(client):
+        with pytest.raises(ResponseError) as excinfo:
+            await client.get("/v2/shopping/flight-offers", originLocationCode="ERR")
+        return excinfo.value
+
+    error, _ = run_with_standin(scenario)
+    assert error.response.status_code == 400
+    assert "bad origin" in str(error)
+
+
+def test_search_flights_async_uses_shared_client(monkeypatch):
+    monkeypatch.setattr(amadeus_service, "USE_MOCK_FLIGHT_SEARCH", False)
+    amadeus_service.flight_search_cache.clear()
+
+    async def scenario(client):
+        monkeypatch.setattr(amadeus_service, "amadeus_async", client)
+        ok = await amadeus_service.search_flights_async("DEL", "DXB", "2030-01-01")
+        failed = await amadeus_service.search_flights_async("ERR", "DXB", "2030-01-01")
+        return ok, failed
+
+    (ok, failed), _ = run_with_standin(scenario)
+    assert ok == [{"id": "1", "price": {"total": "99.00"}}]
+    assert "error" in failed
+
+
+def test_expired_token_is_replaced_and_revoked_token_retried_once():
+    async def scenario(client):
+        client.token_manager._token = "revoked"
+        client.token_manager._expires_at = time.time() + 600
+        client.token_manager._lifetime = 1799
+        return await client.get("/v2/shopping/flight-offers", originLocationCode="DEL")
+
+    response, state = run_with_standin(scenario)
+    assert response.status_code == 200
+    assert [auth for auth, _ in state["requests"]] == ["Bearer revoked", "Bearer standin-token-1"]
+
+
+def test_token_manager_refreshes_once_for_concurrent_callers_and_ahead_of_expiry():
+    async def scenario(client):
+        manager = client.token_manager
+        tokens = await asyncio.gather(*[manager.get_token_async() for _ in range(5)])
+        threaded = await asyncio.gather(*[asyncio.to_thread(manager.get_token) for _ in range(5)])
+        assert manager.refresh_count == 1
+
+        # Inside the refresh margin: callers keep the current token while a background refresh runs
+        manager._expires_at = time.time() + 60
+        assert manager.get_token() == "standin-token-1"
+        for _ in range(100):
+            if manager.refresh_count == 2:
+                break
+            await asyncio.sleep(0.01)
+        return tokens + threaded, manager.get_token()
+
+    (tokens, refreshed), state = run_with_standin(scenario)
+    assert set(tokens) == {"standin-token-1"}
+    assert refreshed == "standin-token-2"
+    assert state["token_calls"] == 2
+
+
+def test_sdk_client_uses_shared_token_manager():
+    assert amadeus_service.amadeus.access_token.manager is amadeus_service.amadeus_token_manager
+    assert amadeus_service.amadeus_async.token_manager is amadeus_service.amadeus_token_manager
@@ -0,0 +1,70 @@
+import asyncio
+
+from app.services.amadeus_client import AmadeusTokenManager, AsyncAmadeusClient
+from app.services.amadeus_simulator import AmadeusSimulator, parse_latency
+from app.services.offer_index import hotel_offer_set
+from app.services import amadeus_service
+
+
+def test_flight_offers_are_seeded_and_realistically_shaped():
+    simulator = AmadeusSimulator(seed=7)
+    offers = simulator.flight_offers("DEL", "LHR", "2030-08-15", adults=2, children=1)
+    assert offers == AmadeusSimulator(seed=7).flight_offers("DEL", "LHR", "2030-08-15", adults=2, children=1)
+    assert offers != AmadeusSimulator(seed=8).flight_offers("DEL", "LHR", "2030-08-15", adults=2, children=1)
+    assert 30 <= len(offers) <= 250
+
+    prices = [float(offer["price"]["grandTotal"]) for offer in offers]
+    assert prices == sorted(prices)
+    assert any(len(offer["itineraries"][0]["segments"]) > 1 for offer in offers)
+    for offer in offers:
+        segments = offer["itineraries"][0]["segments"]
+        assert segments[0]["departure"]["iataCode"] == "DEL" and segments[-1]["arrival"]["iataCode"] == "LHR"
+        assert [p["travelerType"] for p in offer["travelerPricings"]] == ["ADULT", "ADULT", "CHILD"]
+        assert all(len(p["fareDetailsBySegment"]) == len(segments) for p in offer["travelerPricings"])
+        total = sum(float(p["price"]["total"]) for p in offer["travelerPricings"])
+        assert abs(total - float(offer["price"]["grandTotal"])) < 0.05
+
+    assert len(simulator.flight_offers("DEL", "LHR", "2030-08-15", max_offers=5)) == 5
+
+
+def test_mock_hotel_search_uses_name_like_the_real_path():
+    hotels = amadeus_service.mock_hotel_search("PAR", "2030-08-10", "2030-08-13")
+    assert len(hotels) > 2
+    assert all(hotel["name"] and "hotelName" not in hotel for hotel in hotels)
+    assert set(hotels[0]) == {"name", "cityCode", "checkInDate", "checkOutDate", "adults", "price", "currency"}
+    # The summarized list feeds the hotel offer index like real results do
+    records, _ = hotel_offer_set(hotels).order("name")
+    assert [r.name for r in records] == sorted(r.name for r in records)
+
+
+def test_async_client_runs_over_the_simulator_transport():
+    simulator = AmadeusSimulator(seed=1)
+    client = AsyncAmadeusClient(None, None, token_manager=AmadeusTokenManager(None, None, transport=simulator),
+                                transport=simulator)
+
+    async def scenario():
+        search = await client.get("/v2/shopping/flight-offers", originLocationCode="BOM",
+                                  destinationLocationCode="SIN", departureDate="2030-03-01", adults=1, max=20)
+        offer = search.data[0]
+        priced = await client.post("/v1/shopping/flight-offers/pricing",
+                                   {"data": {"type": "flight-offers-pricing", "flightOffers": [offer]}})
+        order = await client.post("/v1/booking/flight-orders", {"data": {"flightOffers": [offer], "travelers": []}})
+        seatmaps = await client.get("/v1/shopping/seatmaps", **{"flight-orderId": order.data["id"]})
+        deleted = await client.delete(f"/v1/booking/flight-orders/{order.data['id']}")
+        return search, priced, seatmaps, deleted
+
+    search, priced, seatmaps, deleted = asyncio.run(scenario())
+    assert len(search.data) == 20
+    assert priced.data["type"] == "flight-offers-pricing"
+    assert len(seatmaps.data) == len(search.data[0]["itineraries"][0]["segments"])
+    assert deleted.status_code == 204
+
+
+def test_latency_spec_and_injected_errors():
+    assert parse_latency("shopping=400:0.6, default=80,bad=x") == {"shopping": (400.0, 0.6), "default": (80.0, 0.4)}
+    simulator = AmadeusSimulator(latency={"shopping": (100.0, 0.0)}, error_rate=1.0)
+    assert simulator.sample_latency("/v2/shopping/flight-offers") == 0.1
+    assert simulator.sample_latency("/v1/reference-data/locations") == 0.0
+    status, payload = simulator.respond("GET", "/v3/shopping/hotel-offers", {"cityCode": "PAR", "checkInDate": "2030-01-01"})
+    assert status == 500 and payload["errors"][0]["status"] == 500
+    assert simulator.respond("POST", "/v1/security/oauth2/token")[0] == 200  # tokens are never failed
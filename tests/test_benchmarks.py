@@ -0,0 +1,50 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient as AioTestClient, TestServer
+
+from benchmarks.run import compare, parse_args, percentile, summarize
+from benchmarks.standin import build_standin
+
+
+def test_percentiles_and_summary():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 0.50) == 0.05
+    assert percentile(values, 0.99) == 0.099
+    assert percentile([], 0.5) is None
+
+    summary = summarize(values, errors=5, elapsed=2.0, statuses={"200": 95, "500": 5})
+    assert summary["requests"] == 100 and summary["rps"] == 50.0
+    assert summary["error_rate"] == 0.05
+    assert summary["p95_ms"] == 95.0 and summary["max_ms"] == 100.0
+
+
+def test_compare_flags_latency_and_throughput_regressions():
+    baseline = {"scenarios": {"flights": {"p95_ms": 100.0, "rps": 200.0, "error_rate": 0.0}}}
+    steady = {"scenarios": {"flights": {"p95_ms": 105.0, "rps": 195.0, "error_rate": 0.0}}}
+    slower = {"scenarios": {"flights": {"p95_ms": 150.0, "rps": 120.0, "error_rate": 0.0}}}
+    assert compare(steady, baseline, 0.10) == []
+    assert len(compare(slower, baseline, 0.10)) == 2
+
+
+def test_parse_args_rejects_unknown_scenarios(capsys):
+    assert parse_args(["--scenarios", "flights,voice"]).scenarios == "flights,voice"
+    try:
+        parse_args(["--scenarios", "flights,nope"])
+    except SystemExit as e:
+        assert e.code == 2
+    assert "nope" in capsys.readouterr().err
+
+
+def test_standin_injects_errors_but_never_on_the_token_endpoint():
+    async def scenario():
+        app, stats = build_standin(error_rate=1.0, error_status=503)
+        async with AioTestClient(TestServer(app)) as client:
+            token = await client.post("/v1/security/oauth2/token")
+            search = await client.get("/v2/shopping/flight-offers", params={
+                "originLocationCode": "DEL", "destinationLocationCode": "DXB", "departureDate": "2030-01-01"})
+            return token.status, search.status, stats.as_dict()
+
+    token_status, search_status, stats = asyncio.run(scenario())
+    assert token_status == 200  # the token endpoint is never failed
+    assert search_status == 503
+    assert stats["errors"] == {"/v2/shopping/flight-offers": 1}
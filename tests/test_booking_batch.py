@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.crud import create_bookings
+from app.db.session import create_async_db_engine, get_async_db, init_db
+from app.main import app
+
+
+def booking(i, **overrides):
+    return {"user_name": f"Guest {i}", "email": f"guest{i}@example.com", "phone": "+15550000000",
+            "destination": "DXB", "amount_paid": 120.0 + i, **overrides}
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    asyncio.run(init_db(engine))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+def test_batch_confirm_reports_per_row_errors(sessions):
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override
+    try:
+        records = [booking(0), {"user_name": "No Email", "phone": "1"}, booking(2), booking(3)]
+        response = TestClient(app).post("/booking/confirm/batch", json=records)
+    finally:
+        app.dependency_overrides.clear()
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["stored"], body["failed"]) == (3, 1)
+    assert [r["index"] for r in body["results"]] == [0, 1, 2, 3]
+    assert body["results"][1]["error"][0]["loc"] == ["email"]
+    ids = [r["booking_id"] for r in body["results"] if "booking_id" in r]
+    assert ids == sorted(ids) and len(set(ids)) == 3
+
+
+def test_bulk_insert_isolates_rows_the_database_rejects(sessions):
+    async def run():
+        async with sessions() as db:
+            return await create_bookings(db, [booking(0), booking(1, user_name=None), booking(2)])
+
+    outcomes = asyncio.run(run())
+    assert outcomes[0][0] and outcomes[2][0]
+    assert outcomes[1][0] is None and "NOT NULL" in outcomes[1][1]
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.crud import create_bookings
+from app.db.session import create_async_db_engine, get_async_db, init_db
+from app.main import app
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def seed():
+        await init_db(engine)
+        async with sessions() as db:
+            await create_bookings(db, [{
+                "user_name": f"Guest {i}",
+                "email": "repeat@example.com" if i % 2 else f"guest{i}@example.com",
+                "phone": f"+1555000{i:04d}",
+                "destination": "DXB" if i % 3 else "LHR",
+                "departure_date": date(2026, 12, 1) + timedelta(days=i),
+            } for i in range(30)])
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    asyncio.run(seed())
+    app.dependency_overrides[get_async_db] = override
+    yield TestClient(app), engine
+    app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+
+
+def test_keyset_pages_cover_every_match_once(client):
+    client, _ = client
+    seen, cursor = [], None
+    while True:
+        params = {"email": "repeat@example.com", "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/booking/bookings", params=params).json()
+        seen += [b["id"] for b in body["bookings"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 15 and seen == sorted(seen, reverse=True)
+
+
+def test_destination_and_date_range_filters(client):
+    client, _ = client
+    body = client.get("/booking/bookings", params={
+        "destination": "lhr", "departure_from": "2026-12-05", "departure_to": "2026-12-20",
+    }).json()
+    assert [b["departure_date"] for b in body["bookings"]] == ["2026-12-19", "2026-12-16", "2026-12-13", "2026-12-10", "2026-12-07"]
+    assert client.get("/booking/bookings", params={"departure_from": "2026-12-05", "departure_to": "2026-12-01"}).status_code == 400
+
+
+def test_lookups_use_indexes(client):
+    _, engine = client
+
+    async def plan(sql):
+        async with engine.connect() as conn:
+            return " ".join(row[-1] for row in (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all())
+
+    assert "ix_bookings_email_id" in asyncio.run(plan(
+        "SELECT * FROM bookings WHERE email = 'x' AND id < 10 ORDER BY id DESC LIMIT 5"))
+    assert "ix_bookings_destination_departure_id" in asyncio.run(plan(
+        "SELECT * FROM bookings WHERE destination = 'DXB' AND departure_date BETWEEN '2026-12-01' AND '2026-12-09'"))
+
+
+def test_destination_matches_whatever_case_it_was_booked_in(client):
+    client, _ = client
+    guest = {"email": "mixed@example.com", "phone": "+15559990000"}
+    assert client.post("/booking/confirm", json={**guest, "user_name": "Single", "destination": "Dubai"}).status_code == 200
+    batch = client.post("/booking/confirm/batch", json=[{**guest, "user_name": "Batch", "destination": " dxb "}])
+    assert batch.json()["stored"] == 1
+
+    for query in ("dubai", "DUBAI"):
+        body = client.get("/booking/bookings", params={"destination": query}).json()
+        assert [b["user_name"] for b in body["bookings"]] == ["Single"]
+    body = client.get("/booking/bookings", params={"destination": "Dxb", "email": "mixed@example.com"}).json()
+    assert [b["user_name"] for b in body["bookings"]] == ["Batch"]
@@ -0,0 +1,145 @@
+import asyncio
+import email.parser
+import email.policy
+import json
+import re
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.db.session import create_async_db_engine, get_async_db, init_db
+from app.main import app
+from app.routes import booking as booking_routes
+from app.services import calendar_service
+
+
+class GoogleStandIn(BaseHTTPRequestHandler):
+    """Just enough of the OAuth token endpoint and the Calendar batch API."""
+
+    calls = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body: bytes, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.calls.append(self.path)
+        if self.path == "/token":
+            return self._reply(200, json.dumps({"access_token": "standin-token", "expires_in": 3600}).encode())
+        assert self.headers["Authorization"] == "Bearer standin-token"
+        if self.path.startswith("/calendar/v3/calendars/primary/events"):
+            return self._reply(200, json.dumps({"id": "single", **json.loads(body)}).encode())
+        if self.path == "/batch/calendar/v3":
+            return self._batch(body)
+        self._reply(404, b"{}")
+
+    def _batch(self, body):
+        message = email.parser.BytesParser(policy=email.policy.compat32).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        boundary = "standin-boundary"
+        parts = []
+        for part in message.get_payload():
+            content_id = part["Content-ID"].strip("<>")
+            inner = re.split(r"\r?\n\r?\n", part.get_payload(), maxsplit=1)[1]
+            event = json.loads(inner)
+            if event["summary"] == "fail":
+                status, payload = "400 Bad Request", {"error": {"code": 400, "message": "bad event"}}
+            else:
+                status, payload = "200 OK", {"id": f"evt-{content_id.split('+')[-1].strip()}", **event}
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n"
+            )
+        reply = ("".join(parts) + f"--{boundary}--\r\n").encode()
+        self._reply(200, reply, content_type=f"multipart/mixed; boundary={boundary}")
+
+
+@pytest.fixture
+def google(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GoogleStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    root = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(settings, "GOOGLE_CALENDAR_ROOT_URL", root)
+    monkeypatch.setattr(settings, "GOOGLE_TOKEN_URI", f"{root}/token")
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", "client")
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(settings, "GOOGLE_REFRESH_TOKEN", "refresh")
+    GoogleStandIn.calls = []
+    calendar_service.reset_calendar_client()
+    yield GoogleStandIn.calls
+    server.shutdown()
+    calendar_service.reset_calendar_client()
+
+
+def event(i):
+    return calendar_service.booking_event({"id": i, "email": f"g{i}@example.com", "origin": "DEL",
+                                           "destination": "DXB", "departure_date": date(2026, 12, 1)})
+
+
+def test_client_is_built_once_and_reused(google):
+    assert calendar_service.get_calendar_service() is calendar_service.get_calendar_service()
+
+
+def test_batch_insert_uses_one_request_per_fifty_events(google):
+    events = [event(i) for i in range(60)]
+    events[7] = {**events[7], "summary": "fail"}
+    results = calendar_service.create_events(events)
+
+    assert google.count("/batch/calendar/v3") == 2
+    assert google.count("/token") == 1
+    assert results[7] is None
+    assert sum(1 for r in results if r) == 59
+    assert results[0]["attendees"] == [{"email": "g0@example.com"}]
+
+
+def test_single_event_still_supported(google):
+    created = calendar_service.create_event("Trip", "", datetime(2026, 12, 1, 9),
+                                            datetime(2026, 12, 1, 11), ["a@example.com"])
+    assert created["id"] == "single"
+
+
+def test_queue_coalesces_events_into_one_batch(google):
+    queue = calendar_service.CalendarEventQueue(flush_interval=0.2)
+    for i in range(5):
+        queue.enqueue(event(i))
+    queue.stop()
+    assert queue.stats() == {"queued": 0, "sent": 5, "failed": 0, "batches": 1}
+    assert google.count("/batch/calendar/v3") == 1
+
+
+def test_confirm_queues_invite_without_calling_google(google, tmp_path, monkeypatch):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'cal.db'}")
+    asyncio.run(init_db(engine))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    queued = []
+    monkeypatch.setattr(booking_routes.calendar_queue, "enqueue", queued.append)
+    app.dependency_overrides[get_async_db] = override
+    try:
+        response = TestClient(app).post("/booking/confirm", json={
+            "user_name": "A", "email": "a@example.com", "phone": "1", "destination": "DXB", "departure_date": "2026-12-01",
+        })
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+
+    assert response.status_code == 200
+    assert queued[0]["start"] == {"date": "2026-12-01"}
+    assert google == []
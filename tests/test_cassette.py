@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils import cassette as cassette_module
+from app.utils.cassette import MAGIC, Cassette, CassetteMiss
+from app.utils.metrics import instrumented
+
+
+def test_record_then_replay_round_robin(tmp_path):
+    path = str(tmp_path / "upstream.cassette")
+    prices = iter([100, 120, 90])
+    recorder = Cassette(path, "record")
+    quote = recorder.wrap("amadeus", "quote", lambda origin, destination, adults=1: {"price": next(prices)})
+    quote("DEL", "DXB", adults=2)
+    quote("DEL", "DXB", adults=2)
+    quote("BOM", "LHR")
+    recorder.close()
+
+    player = Cassette(path, "replay")
+    replay = player.wrap("amadeus", "quote", lambda *args, **kwargs: pytest.fail("replay must not call upstream"))
+    assert [replay("DEL", "DXB", adults=2)["price"] for _ in range(3)] == [100, 120, 100]
+    assert replay("BOM", "LHR") == {"price": 90}
+    with pytest.raises(CassetteMiss):
+        replay("DEL", "SIN")
+    assert player.stats()["replayed"] == 4 and player.stats()["misses"] == 1
+    assert [entry["request"][1] for entry in player.entries()] == ["quote"] * 3
+    assert next(player.entries())["request"][2] == ["DEL", "DXB"]
+
+
+def test_replay_falls_back_to_live_when_allowed(tmp_path):
+    path = str(tmp_path / "empty.cassette")
+    Cassette(path, "record").close()
+    player = Cassette(path, "replay", on_miss="live")
+    assert player.wrap("stripe", "create_checkout_session", lambda amount: f"url-{amount}")(10) == "url-10"
+
+
+def test_time_scaled_async_replay(tmp_path):
+    path = str(tmp_path / "slow.cassette")
+
+    async def search(city):
+        await asyncio.sleep(0.1)
+        return [city]
+
+    async def scenario(cassette):
+        wrapped = cassette.wrap("amadeus", "search", search)
+        started = time.perf_counter()
+        result = await wrapped("PAR")
+        return result, time.perf_counter() - started
+
+    recorder = Cassette(path, "record")
+    assert asyncio.run(scenario(recorder))[0] == ["PAR"]
+    recorder.close()
+    result, elapsed = asyncio.run(scenario(Cassette(path, "replay", latency_scale=0.5)))
+    assert result == ["PAR"] and 0.04 < elapsed < 0.09
+    assert asyncio.run(scenario(Cassette(path, "replay")))[1] < 0.02
+
+
+def test_truncated_tail_is_ignored(tmp_path):
+    path = tmp_path / "crashed.cassette"
+    recorder = Cassette(str(path), "record")
+    recorder.wrap("calendar", "create_event", lambda summary: {"id": summary})("trip")
+    recorder.close()
+    path.write_bytes(path.read_bytes() + b"\x00" * 40)  # a frame header whose payload never landed
+    assert path.read_bytes().startswith(MAGIC)
+    player = Cassette(str(path), "replay")
+    assert player.wrap("calendar", "create_event", None)("trip") == {"id": "trip"}
+
+
+def test_instrumented_service_functions_go_through_the_cassette(tmp_path, monkeypatch):
+    path = str(tmp_path / "service.cassette")
+    monkeypatch.setattr(cassette_module, "CASSETTE", Cassette(path, "record"))
+
+    @instrumented("amadeus", "cassette_probe")
+    def probe(code):
+        return {"code": code, "live": True}
+
+    probe("NYC")
+    cassette_module.CASSETTE.close()
+    monkeypatch.setattr(cassette_module, "CASSETTE", Cassette(path, "replay"))
+
+    @instrumented("amadeus", "cassette_probe")
+    def offline(code):
+        raise AssertionError("network call during replay")
+
+    assert offline("NYC") == {"code": "NYC", "live": True}
+
+
+def test_local_work_bypasses_replay(tmp_path, monkeypatch):
+    path = str(tmp_path / "webhooks.cassette")
+    Cassette(path, "record").close()
+    monkeypatch.setattr(cassette_module, "CASSETTE", Cassette(path, "replay"))
+
+    @instrumented("stripe", "webhook_probe", cassette=False)
+    def verify(payload):
+        return {"id": payload}
+
+    assert verify("evt_new") == {"id": "evt_new"}  # not in the cassette, and no CassetteMiss
+    assert cassette_module.CASSETTE.stats()["misses"] == 0
+
+
+def test_stdlib_json_fallback_reads_the_same_cassettes(tmp_path, monkeypatch):
+    path = str(tmp_path / "portable.cassette")
+    recorder = Cassette(path, "record")
+    recorder.wrap("amadeus", "search", lambda city, **kw: {"city": city, "offers": [{"price": 99.5, "name": "Café"}]})(
+        "PAR", adults=2, rooms=1)
+    recorder.close()
+    digest = cassette_module.request_key("amadeus", "search", ("PAR",), {"rooms": 1, "adults": 2})[0]
+
+    monkeypatch.setattr(cassette_module, "orjson", None)
+    assert cassette_module.request_key("amadeus", "search", ("PAR",), {"rooms": 1, "adults": 2})[0] == digest
+    player = Cassette(path, "replay")
+    replay = player.wrap("amadeus", "search", lambda *args, **kwargs: pytest.fail("replay must not call upstream"))
+    assert replay("PAR", rooms=1, adults=2) == {"city": "PAR", "offers": [{"price": 99.5, "name": "Café"}]}
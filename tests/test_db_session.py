@@ -0,0 +1,54 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy import text
+
+from app.db.crud import create_booking, update_booking_payment_status
+from app.db.session import async_database_url, create_async_db_engine, create_db_engine, init_db
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+
+def booking(i):
+    return {
+        "user_name": f"Guest {i}", "email": f"guest{i}@example.com", "phone": "+15550000000",
+        "origin": "DEL", "destination": "DXB", "departure_date": date(2026, 12, 1),
+        "flight_number": "EK511", "amount_paid": 250.0, "payment_status": "pending",
+    }
+
+
+def test_async_url_mapping():
+    assert async_database_url("sqlite:///./maxx.db") == "sqlite+aiosqlite:///./maxx.db"
+    assert async_database_url("postgresql://u:p@db/maxx") == "postgresql+asyncpg://u:p@db/maxx"
+    assert async_database_url("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_sqlite_connections_are_tuned(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() > 0
+    engine.dispose()
+
+
+def test_concurrent_async_writes(tmp_path):
+    async def run():
+        engine = create_async_db_engine(f"sqlite:///{tmp_path / 'async.db'}")
+        await init_db(engine)
+        sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def confirm(i):
+            async with sessions() as db:
+                return (await create_booking(db, booking(i))).id
+
+        ids = await asyncio.gather(*[confirm(i) for i in range(20)])
+        async with sessions() as db:
+            updated = await update_booking_payment_status(db, ids[0], "paid")
+            missing = await update_booking_payment_status(db, 10_000, "paid")
+        await engine.dispose()
+        return ids, updated, missing
+
+    ids, updated, missing = asyncio.run(run())
+    assert sorted(ids) == list(range(1, 21))
+    assert updated.payment_status == "paid"
+    assert missing is None
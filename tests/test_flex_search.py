@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services import amadeus_service
+
+client = TestClient(app)
+
+
+def future(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def install_fake_search(monkeypatch, delay=0.1, slow_routes=()):
+    calls = []
+
+    async def fake_search(origin, destination, departure_date, adults=1, children=0):
+        calls.append((origin, destination, departure_date))
+        await asyncio.sleep(5 if destination in slow_routes else delay)
+        price = 100 + 10 * int(departure_date[-2:]) + (50 if destination == "AUH" else 0)
+        return [{"id": f"{destination}{departure_date}", "price": {"total": f"{price:.2f}", "currency": "USD"}}]
+
+    amadeus_service.flight_search_cache.clear()
+    monkeypatch.setattr(amadeus_service, "_search_flights_uncached_async", fake_search)
+    return calls
+
+
+def test_flex_search_fans_out_concurrently_and_sorts_by_price(monkeypatch):
+    calls = install_fake_search(monkeypatch)
+    started = time.perf_counter()
+    response = client.get("/booking/flights/flex", params={
+        "origins": "DEL", "destinations": "DXB,AUH", "date_from": future(10), "date_to": future(16),
+    })
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(calls) == 14
+    assert elapsed < 0.1 * 14 / 2
+    prices = [cell["cheapest_price"] for cell in body["results"]]
+    assert prices == sorted(prices)
+    assert body["cheapest"] == body["results"][0]
+    assert set(body["matrix"]) == {"DEL-DXB", "DEL-AUH"}
+    assert len(body["matrix"]["DEL-DXB"]) == 7
+
+
+def test_flex_search_reports_unfinished_routes_after_deadline(monkeypatch):
+    install_fake_search(monkeypatch, delay=0.01, slow_routes={"AUH"})
+    monkeypatch.setattr(settings, "FLEX_SEARCH_DEADLINE", 0.3)
+    response = client.get("/booking/flights/flex", params={
+        "origins": "DEL", "destinations": "DXB,AUH", "dates": f"{future(10)},{future(11)}",
+    })
+    body = response.json()
+    assert response.status_code == 200
+    assert body["timed_out"] == 2
+    assert {c["destination"] for c in body["results"] if c["status"] == "ok"} == {"DXB"}
+
+
+def test_flex_search_rejects_oversized_requests():
+    limit = settings.FLEX_SEARCH_MAX_COMBINATIONS
+    response = client.get("/booking/flights/flex", params={
+        "origins": "DEL,BOM", "destinations": "DXB,AUH,DOH",
+        "date_from": future(1), "date_to": future(1 + limit),
+    })
+    assert response.status_code == 400
+
+
+def test_flex_search_streams_cells_as_they_complete(monkeypatch):
+    install_fake_search(monkeypatch, delay=0.01, slow_routes={"AUH"})
+    monkeypatch.setattr(settings, "FLEX_SEARCH_DEADLINE", 0.3)
+    with client.stream("GET", "/booking/flights/flex", params={
+        "origins": "DEL", "destinations": "AUH,DXB", "dates": future(10), "stream": "ndjson",
+    }) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert [e["event"] for e in events] == ["result", "result", "summary"]
+    assert events[0]["data"]["destination"] == "DXB"
+    assert events[1]["data"]["status"] == "timeout"
+    assert events[2]["data"]["cheapest"]["destination"] == "DXB"
+    assert "results" not in events[2]["data"]
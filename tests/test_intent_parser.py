@@ -0,0 +1,54 @@
+from datetime import date
+
+from app.routes.voice import extract_info
+from app.services.intent_parser import Intent, _parse, parse_intent, resolve_date
+
+TODAY = date(2026, 10, 17)  # a Saturday
+
+
+def test_flight_slots_stop_at_the_date():
+    intent = parse_intent("Book a flight from Delhi to Dubai on August 15", TODAY)
+    assert intent == Intent("delhi", "dubai", None, "2027-08-15", "DEL", "DXB")
+    intent = parse_intent("flights from new york to san francisco next friday for 2 adults", TODAY)
+    assert (intent.origin_code, intent.destination_code, intent.date) == ("NYC", "SFO", "2026-10-23")
+    # Unknown names are cut at the first stop word rather than swallowing the rest
+    assert parse_intent("from dehli to dubai tomorrow", TODAY)[:4] == ("dehli", "dubai", None, "2026-10-18")
+    assert parse_intent("from del to dxb on 2031-01-05", TODAY)[4:6] == ("DEL", "DXB")
+
+
+def test_hotel_slots():
+    intent = parse_intent("find a hotel in rio de janeiro on the 3rd of march", TODAY)
+    assert (intent.city, intent.city_code, intent.date) == ("rio de janeiro", "RIO", "2027-03-03")
+    assert parse_intent("hello there", TODAY) == Intent()
+
+
+def test_resolve_date_forms():
+    cases = {
+        "on 2030-08-15": date(2030, 8, 15),
+        "15th aug": date(2027, 8, 15),
+        "august 15, 2031": date(2031, 8, 15),
+        "december 3rd": date(2026, 12, 3),
+        "october 17": TODAY,  # today is not rolled into next year
+        "12/24": date(2026, 12, 24),
+        "today": TODAY,
+        "tomorrow": date(2026, 10, 18),
+        "day after tomorrow": date(2026, 10, 19),
+        "in 3 days": date(2026, 10, 20),
+        "in two weeks": date(2026, 10, 31),
+        "this saturday": TODAY,
+        "next saturday": date(2026, 10, 24),
+        "monday": date(2026, 10, 19),
+        "february 30": None,
+        "whenever": None,
+    }
+    assert {text: resolve_date(text, TODAY) for text in cases} == cases
+
+
+def test_repeated_utterances_are_memoized_and_extract_info_keeps_its_shape():
+    _parse.cache_clear()
+    for _ in range(3):
+        parse_intent("  From Mumbai to London   on 15th Aug ", TODAY)
+    info = _parse.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+    origin, destination, city, date_str = extract_info("from mumbai to london on 2030-01-05")
+    assert (origin, destination, city, date_str) == ("mumbai", "london", None, "2030-01-05")
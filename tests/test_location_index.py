@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.routes import voice
+from app.services import amadeus_service
+from app.services.location_index import get_location_index
+from app.utils.helpers import normalize_city_code, normalize_hotel_city_code
+
+
+@pytest.mark.parametrize("text,code", [
+    ("London", "LON"),
+    ("new york", "NYC"),
+    ("Bombay", "BOM"),
+    ("São Paulo", "SAO"),
+    ("heathrow airport", "LHR"),
+    ("jfk", "JFK"),
+    ("Washington D.C.", "WAS"),
+])
+def test_exact_alias_and_code_lookup(text, code):
+    assert get_location_index().resolve(text) == code
+
+
+@pytest.mark.parametrize("text,code", [("Londn", "LON"), ("abu dabi", "AUH"), ("kolkatta", "CCU")])
+def test_typo_tolerant_lookup(text, code):
+    assert get_location_index().resolve(text) == code
+
+
+def test_short_unknown_words_are_not_fuzzed():
+    assert get_location_index().resolve("xyz") is None
+    assert get_location_index().resolve("on august") is None
+
+
+def test_prefix_lookup():
+    codes = [loc.code for loc in get_location_index().prefix("new")]
+    assert "NYC" in codes and "DEL" in codes
+
+
+def test_city_code_normalization_matches_previous_map():
+    previous = {"LON": "LHR", "NYC": "JFK", "PAR": "CDG", "DEL": "DEL", "BOM": "BOM",
+                "DXB": "DXB", "IST": "IST", "MAN": "MAN", "SFO": "SFO", "SIN": "SIN"}
+    assert {code: normalize_city_code(code) for code in previous} == previous
+    assert normalize_city_code("xyz") == "XYZ"
+    assert normalize_hotel_city_code("LHR") == "LON"
+
+
+def test_call_sites_resolve_offline(monkeypatch):
+    def no_upstream(*args, **kwargs):
+        raise AssertionError("resolved offline, upstream must not be called")
+
+    monkeypatch.setattr(amadeus_service, "_city_to_iata_code_uncached_async", no_upstream)
+    monkeypatch.setattr(amadeus_service, "_city_to_iata_code_uncached", no_upstream)
+    assert asyncio.run(voice.resolve_iata("Abu Dhabi")) == "AUH"
+    assert amadeus_service.city_to_iata_code("Singapore") == "SIN"
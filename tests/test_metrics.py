@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from amadeus.client.errors import ClientError
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import amadeus_service
+from app.services.amadeus_client import AmadeusResponse
+from app.utils.metrics import UPSTREAM_CALLS, Counter, Histogram, Registry, instrumented
+
+
+def test_render_prometheus_text_format():
+    registry = Registry()
+    requests = Counter("demo_requests_total", "Requests.", ("route",), registry=registry)
+    latency = Histogram("demo_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry)
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value)
+    registry.register_collector(lambda: [("demo_ratio", "gauge", "Ratio.", [({"cache": "x"}, 0.75), ({}, None)])])
+
+    text = registry.render()
+    assert '# TYPE demo_requests_total counter' in text
+    assert 'demo_requests_total{route="/a\\"b"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{le="1"} 2' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in text
+    assert 'demo_seconds_count 3' in text
+    assert 'demo_ratio{cache="x"} 0.75' in text
+    with pytest.raises(ValueError):
+        Counter("demo_requests_total", "again", registry=registry)
+
+
+def test_instrumented_records_outcomes_for_sync_and_async_functions():
+    @instrumented("demo")
+    def lookup(fail=None):
+        if fail == "dict":
+            return {"error": "upstream said no"}
+        if fail == "raise":
+            raise ClientError(AmadeusResponse(429, ""))
+        return [1]
+
+    @instrumented("demo", "lookup_async")
+    async def lookup_async():
+        return [1]
+
+    lookup()
+    lookup("dict")
+    with pytest.raises(ClientError):
+        lookup("raise")
+    asyncio.run(lookup_async())
+
+    assert UPSTREAM_CALLS.labels("demo", "lookup", "ok").value == 1
+    assert UPSTREAM_CALLS.labels("demo", "lookup", "error").value == 1
+    assert UPSTREAM_CALLS.labels("demo", "lookup", "429").value == 1
+    assert UPSTREAM_CALLS.labels("demo", "lookup_async", "ok").value == 1
+    assert lookup.__name__ == "lookup"
+
+
+def test_metrics_endpoint_reports_routes_caches_and_db():
+    client = TestClient(app)
+    assert client.get("/booking/cache-stats").status_code == 200
+    assert client.get("/no-such-page").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/booking/cache-stats",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/booking/cache-stats",le="+Inf"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'http_requests_in_flight{method="GET"} 1' in body  # the scrape itself
+    assert 'search_cache_hit_ratio{cache="flights"}' in body
+    assert "# TYPE db_query_duration_seconds histogram" in body
+
+
+def test_async_booking_twins_count_each_booking_once():
+    def total(function):
+        return sum(UPSTREAM_CALLS.labels("amadeus", function, outcome).value for outcome in ("ok", "error"))
+
+    before = total("create_flight_order"), total("create_flight_order_async")
+    asyncio.run(amadeus_service.create_flight_order_async({"flightOffers": []}, []))
+    assert (total("create_flight_order"), total("create_flight_order_async")) == (before[0] + 1, before[1])
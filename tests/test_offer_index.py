@@ -0,0 +1,109 @@
+import timeit
+import weakref
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import amadeus_service
+from app.services.offer_index import flight_filter, flight_offer_set, parse_duration_minutes
+from app.services.search_cache import SearchCache
+
+client = TestClient(app)
+
+
+def offer(i, price, carriers, duration, departs):
+    return {
+        "id": str(i),
+        "price": {"total": f"{price:.2f}", "currency": "USD"},
+        "itineraries": [{
+            "duration": duration,
+            "segments": [{"carrierCode": c, "number": str(i), "departure": {"at": departs}} for c in carriers],
+        }],
+    }
+
+
+OFFERS = [
+    offer(0, 420, ["AI"], "PT9H", "2026-12-01T09:00:00"),
+    offer(1, 310, ["EK", "EK"], "PT14H30M", "2026-12-01T02:00:00"),
+    offer(2, 505, ["LH", "AI"], "PT11H", "2026-12-01T06:00:00"),
+    offer(3, 310, ["QR", "BA"], "PT12H", "2026-12-01T22:00:00"),
+    offer(4, 650, ["BA"], "PT9H30M", "2026-12-01T13:00:00"),
+]
+
+
+def test_parse_duration_minutes():
+    assert parse_duration_minutes("PT2H35M") == 155
+    assert parse_duration_minutes("P1DT3H") == 1620
+    assert parse_duration_minutes("") == float("inf")
+
+
+def test_sort_filter_and_cursor_pages():
+    offers = flight_offer_set(OFFERS)
+
+    ids = lambda page: [o["id"] for o in page]
+    page, total, cursor = offers.query("price", limit=2)
+    assert (ids(page), total) == (["3", "1"], 5)
+    page, _, cursor = offers.query("price", limit=2, cursor=cursor)
+    assert ids(page) == ["0", "2"]
+    page, _, cursor = offers.query("price", limit=2, cursor=cursor)
+    assert (ids(page), cursor) == (["4"], None)
+
+    assert ids(offers.query("duration")[0]) == ["0", "4", "2", "3", "1"]
+    assert ids(offers.query("departure")[0])[0] == "1"
+    direct_ai_or_ba = flight_filter(max_stops=0, carriers=["ai", "BA"])
+    assert ids(offers.query("price", direct_ai_or_ba)[0]) == ["0", "4"]
+    assert offers.query("price", flight_filter(max_price=400))[1] == 2
+
+
+def test_round_trip_stops_count_the_return_leg():
+    outbound = [{"carrierCode": "AI", "departure": {"at": "2026-12-01T09:00:00"}}]
+    connecting = outbound * 2
+    offers = [
+        {"id": "nonstop-both", "price": {"total": "500"},
+         "itineraries": [{"duration": "PT9H", "segments": outbound}, {"duration": "PT9H", "segments": outbound}]},
+        {"id": "stop-on-return", "price": {"total": "400"},
+         "itineraries": [{"duration": "PT9H", "segments": outbound}, {"duration": "PT12H", "segments": connecting}]},
+    ]
+    offer_set = flight_offer_set(offers)
+    assert [r.stops for r in offer_set.ranking.records] == [0, 1]
+    assert [o["id"] for o in offer_set.query("stops")[0]] == ["nonstop-both", "stop-on-return"]
+    assert [o["id"] for o in offer_set.query("price", flight_filter(max_stops=0))[0]] == ["nonstop-both"]
+
+
+def test_rankings_live_and_die_with_their_cache_entry():
+    cache = SearchCache("rank-test", ttl=60, max_entries=1)
+    cached = cache.set("a", list(OFFERS))
+    assert flight_offer_set(cached).ranking is flight_offer_set(cached).ranking
+    assert flight_offer_set(OFFERS).ranking is not flight_offer_set(OFFERS).ranking  # uncached lists keep nothing
+
+    ranking = weakref.ref(flight_offer_set(cached).ranking)
+    cache.set("b", list(OFFERS))  # evicts "a"
+    del cached
+    assert ranking() is None
+
+
+def test_ranking_cached_offers_is_cheap():
+    many = [offer(i, 100 + (i * 37) % 900, ["AI"], f"PT{2 + i % 9}H", "2026-12-01T09:00:00") for i in range(500)]
+    offers = flight_offer_set(many)
+    predicate = flight_filter(max_stops=1, max_price=600)
+    offers.query("duration", predicate, limit=20)
+    per_call = min(timeit.repeat(lambda: offers.query("duration", predicate, limit=20), number=20, repeat=3)) / 20
+    assert per_call < 0.002
+
+
+def test_flights_route_pages_and_rejects_bad_cursor(monkeypatch):
+    async def fake_search(*args, **kwargs):
+        return OFFERS
+
+    amadeus_service.flight_search_cache.clear()
+    monkeypatch.setattr(amadeus_service, "_search_flights_uncached_async", fake_search)
+    params = {
+        "originLocationCode": "DEL", "destinationLocationCode": "LHR", "session_id": "s1",
+        "departureDate": (date.today() + timedelta(days=40)).isoformat(),
+    }
+    body = client.get("/booking/flights", params={**params, "sort": "price", "limit": 2, "max_stops": 0}).json()
+    assert [o["id"] for o in body["flights"]] == ["0", "4"]
+    assert body["total"] == 2 and body["next_cursor"] is None
+
+    assert client.get("/booking/flights", params={**params, "cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,63 @@
+import json
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import amadeus_service
+from app.utils import fast_json
+from app.utils.projection import parse_fields, project
+
+client = TestClient(app)
+
+OFFER = {
+    "id": "7",
+    "price": {"total": "199.00", "currency": "EUR", "fees": [{"amount": "0.00"}]},
+    "itineraries": [{"segments": [
+        {"carrierCode": "LH", "number": "761", "departure": {"at": "2026-11-01T09:00:00"}},
+        {"carrierCode": "LH", "number": "902", "arrival": {"at": "2026-11-01T15:30:00"}},
+    ]}],
+    "travelerPricings": [{"fareDetailsBySegment": [{"cabin": "ECONOMY"}]}],
+}
+
+
+def flight_params(**extra):
+    return {
+        "originLocationCode": "DEL", "destinationLocationCode": "FRA",
+        "departureDate": (date.today() + timedelta(days=30)).isoformat(), "session_id": "s1", **extra,
+    }
+
+
+def test_project_walks_lists_and_skips_missing_keys():
+    tree = parse_fields("id, price.total, itineraries.segments.carrierCode, nope.deeper")
+    assert project(OFFER, tree) == {
+        "id": "7",
+        "price": {"total": "199.00"},
+        "itineraries": [{"segments": [{"carrierCode": "LH"}, {"carrierCode": "LH"}]}],
+    }
+
+
+def test_flights_compact_view_and_field_selection(monkeypatch):
+    async def fake_search(*args, **kwargs):
+        return [OFFER]
+
+    amadeus_service.flight_search_cache.clear()
+    monkeypatch.setattr(amadeus_service, "_search_flights_uncached_async", fake_search)
+
+    compact = client.get("/booking/flights", params=flight_params(view="compact")).json()["flights"][0]
+    assert compact == {
+        "id": "7", "airline": "LH", "flight_number": "LH761", "departure_at": "2026-11-01T09:00:00",
+        "arrival_at": "2026-11-01T15:30:00", "stops": 1, "price": "199.00", "currency": "EUR",
+    }
+
+    selected = client.get("/booking/flights", params=flight_params(fields="id,price.total")).json()["flights"]
+    assert selected == [{"id": "7", "price": {"total": "199.00"}}]
+
+    full = client.get("/booking/flights", params=flight_params()).json()["flights"]
+    assert full == [OFFER]
+
+
+def test_fast_json_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(fast_json, "orjson", None)
+    body = fast_json.FastJSONResponse({"city": "Zürich", "n": 1}).body
+    assert json.loads(body) == {"city": "Zürich", "n": 1}
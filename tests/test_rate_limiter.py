@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services.amadeus_client import AsyncAmadeusClient
+from app.services.rate_limiter import (
+    BACKGROUND,
+    BATCH,
+    INTERACTIVE,
+    RateLimited,
+    RateLimiter,
+    api_family,
+    parse_rate_limits,
+    request_priority,
+)
+
+
+def test_api_family_and_limit_parsing():
+    assert api_family("/v2/shopping/flight-offers") == "shopping"
+    assert api_family("/v1/reference-data/locations/hotels/by-city") == "reference-data"
+    assert api_family("/v1/booking/flight-orders/abc") == "booking"
+    assert api_family("/v1/travel/predictions/trip-purpose") == "default"
+    assert parse_rate_limits("shopping=5:10, booking=2,bad=x") == {"shopping": (5.0, 10), "booking": (2.0, 2)}
+
+
+def test_bursts_queue_instead_of_failing():
+    limiter = RateLimiter(rate=100, burst=5)
+
+    async def scenario():
+        started = time.monotonic()
+        waits = await asyncio.gather(*[limiter.acquire("/v2/shopping/flight-offers") for _ in range(15)])
+        return waits, time.monotonic() - started
+
+    waits, elapsed = asyncio.run(scenario())
+    assert waits[:5] == [0.0] * 5
+    assert all(w > 0 for w in waits[5:])
+    assert elapsed >= 0.08  # ten calls over the burst at 100/s
+    stats = limiter.stats()["shopping"]
+    assert stats["acquired"] == 15 and stats["delayed"] == 10 and stats["rejected"] == 0
+    assert stats["queued"] == 0 and stats["max_wait_ms"] > 0
+
+
+def test_interactive_calls_overtake_queued_background_work():
+    limiter = RateLimiter(rate=50, burst=1)
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire("shopping", priority)
+        order.append(name)
+
+    async def scenario():
+        await limiter.acquire("shopping")
+        tasks = [asyncio.create_task(call(f"batch-{i}", BATCH)) for i in range(3)]
+        tasks.append(asyncio.create_task(call("warm", BACKGROUND)))
+        await asyncio.sleep(0)
+        queued = limiter.stats()["shopping"]["queued_by_priority"]
+        with request_priority(INTERACTIVE):
+            tasks.append(asyncio.create_task(call("voice", None)))
+        await asyncio.gather(*tasks)
+        return queued
+
+    queued = asyncio.run(scenario())
+    assert queued == {"background": 1, "batch": 3}
+    assert order == ["voice", "warm", "batch-0", "batch-1", "batch-2"]
+
+
+def test_wait_is_bounded_and_monthly_quota_keeps_a_capped_interactive_reserve():
+    limiter = RateLimiter(rate=1, burst=1, max_wait=0.05, monthly_quota=3, interactive_reserve=0.34)
+
+    async def scenario():
+        await limiter.acquire("booking")
+        with pytest.raises(RateLimited):
+            await limiter.acquire("booking")
+        limiter._family("booking").bucket.tokens = 1
+        with pytest.raises(RateLimited, match="reserved for interactive"):
+            await limiter.acquire("booking", BATCH)  # one call made; the other two are the reserve
+        for _ in range(2):
+            limiter._family("booking").bucket.tokens = 1
+            await limiter.acquire("booking", INTERACTIVE)
+        limiter._family("booking").bucket.tokens = 1
+        with pytest.raises(RateLimited, match="used up"):
+            await limiter.acquire("booking", INTERACTIVE)
+        assert not limiter.try_acquire("booking")
+
+    asyncio.run(scenario())
+    stats = limiter.stats()["booking"]
+    assert stats["rejected"] == 3 and stats["month_calls"] == 3
+
+
+def test_client_backs_off_on_429_and_retries():
+    state = {"calls": []}
+
+    async def token(request):
+        return web.json_response({"access_token": "t", "expires_in": 1799})
+
+    async def flight_offers(request):
+        state["calls"].append(time.monotonic())
+        if len(state["calls"]) == 1:
+            return web.json_response({"errors": [{"status": 429}]}, status=429, headers={"Retry-After": "0.1"})
+        return web.json_response({"data": [{"id": "1"}]})
+
+    async def runner():
+        app = web.Application()
+        app.router.add_post("/v1/security/oauth2/token", token)
+        app.router.add_get("/v2/shopping/flight-offers", flight_offers)
+        server = TestServer(app)
+        await server.start_server()
+        limiter = RateLimiter(rate=100, burst=10)
+        client = AsyncAmadeusClient("id", "secret", base_url=str(server.make_url("")), rate_limiter=limiter)
+        try:
+            response = await client.get("/v2/shopping/flight-offers", originLocationCode="DEL")
+        finally:
+            await client.close()
+            await server.close()
+        return response, limiter.stats()
+
+    response, stats = asyncio.run(runner())
+    assert response.data == [{"id": "1"}]
+    assert state["calls"][1] - state["calls"][0] >= 0.09
+    assert stats["shopping"]["throttled"] == 1
+
+
+def test_queued_calls_cannot_overrun_the_monthly_quota():
+    limiter = RateLimiter(rate=20, burst=1, max_wait=1.0, monthly_quota=2)
+
+    async def call():
+        try:
+            await limiter.acquire("shopping", INTERACTIVE)
+            return "ok"
+        except RateLimited:
+            return "rejected"
+
+    async def scenario():
+        return await asyncio.gather(*[call() for _ in range(6)])
+
+    assert sorted(asyncio.run(scenario())) == ["ok"] * 2 + ["rejected"] * 4
+    assert limiter.stats()["shopping"]["month_calls"] == 2
+
+
+def test_a_waiter_that_gives_up_returns_its_quota_slot():
+    limiter = RateLimiter(rate=1, burst=1, max_wait=0.05, monthly_quota=2)
+
+    async def scenario():
+        await limiter.acquire("booking")
+        with pytest.raises(RateLimited, match="no token"):
+            await limiter.acquire("booking")
+        assert limiter.stats()["booking"]["month_calls"] == 1
+        limiter._family("booking").bucket.tokens = 1
+        await limiter.acquire("booking")
+
+    asyncio.run(scenario())
+    assert limiter.stats()["booking"]["month_calls"] == 2
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+from amadeus.client.errors import ClientError, ServerError
+
+from app.services import amadeus_service
+from app.services.amadeus_client import AmadeusResponse
+from app.services.reference_data import ReferenceDataStore
+
+
+class FakeHotelListClient:
+    def __init__(self, with_hotels, failing=()):
+        self.with_hotels = set(with_hotels)
+        self.failing = set(failing)
+        self.calls = 0
+
+    async def get(self, path, **params):
+        self.calls += 1
+        code = params["cityCode"]
+        if code in self.failing:
+            raise ServerError(AmadeusResponse(500, ""))
+        if code == "XXX":
+            raise ClientError(AmadeusResponse(400, ""))
+        data = [{"hotelId": f"{code}001"}] if code in self.with_hotels else []
+        return AmadeusResponse(200, json.dumps({"data": data}))
+
+
+def test_first_boot_seeds_from_location_index(tmp_path):
+    store = ReferenceDataStore(str(tmp_path / "ref.json"), hotel_cities=["LON"])
+    assert store.is_valid_city("lon")
+    assert store.is_valid_city("TYO")
+    assert store.supports_hotels("LON")
+    assert not store.supports_hotels("TYO")
+    # Never checked (e.g. resolved upstream): let it through until a probe says otherwise
+    assert store.is_valid_city("ZZZ") and store.supports_hotels("ZZZ")
+
+
+def test_refresh_persists_and_keeps_previous_answer_on_transient_errors(tmp_path):
+    path = str(tmp_path / "ref.json")
+    store = ReferenceDataStore(path, hotel_cities=["LON", "PAR"])
+    client = FakeHotelListClient(with_hotels={"LON", "TYO"}, failing={"PAR"})
+    asyncio.run(store.refresh(client))
+
+    assert client.calls == len(store.valid_city_codes)
+    assert {"LON", "TYO", "PAR"} <= store.hotel_city_codes
+    assert "DXB" not in store.hotel_city_codes
+
+    reloaded = ReferenceDataStore(path, hotel_cities=[])
+    reloaded.load()
+    assert reloaded.hotel_city_codes == store.hotel_city_codes
+    assert reloaded.refreshed_at == store.refreshed_at
+
+
+def test_refresh_with_every_probe_failing_changes_nothing(tmp_path):
+    store = ReferenceDataStore(str(tmp_path / "ref.json"), hotel_cities=["LON"])
+    store.load()
+    everything = set(store.valid_city_codes)
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.refresh(FakeHotelListClient(with_hotels=(), failing=everything)))
+    assert store.hotel_city_codes == {"LON"}
+    assert store.refreshed_at is None
+
+
+def test_search_hotels_checks_membership_without_upstream_lookups(monkeypatch, tmp_path):
+    store = ReferenceDataStore(str(tmp_path / "ref.json"), hotel_cities=["LON"])
+    monkeypatch.setattr(amadeus_service, "reference_data", store)
+    monkeypatch.setattr(amadeus_service, "USE_MOCK_HOTEL_SEARCH", False)
+
+    def no_upstream(*args, **kwargs):
+        raise AssertionError("reference data must not be fetched on the request path")
+
+    monkeypatch.setattr(amadeus_service.amadeus.reference_data.locations, "get", no_upstream)
+    monkeypatch.setattr(amadeus_service.amadeus.shopping.hotel_offers_search, "get", no_upstream)
+    assert amadeus_service.search_hotels("TYO", "2030-01-01", "2030-01-02") == []
+
+
+def test_refresh_probes_only_new_or_stale_cities_and_rules_out_unknown_codes(tmp_path):
+    store = ReferenceDataStore(str(tmp_path / "ref.json"), hotel_cities=["LON"], recheck_after=3600)
+    asyncio.run(store.refresh(FakeHotelListClient(with_hotels={"LON"})))
+
+    unchanged = FakeHotelListClient(with_hotels={"LON"})
+    asyncio.run(store.refresh(unchanged))
+    assert unchanged.calls == 0
+
+    store.is_valid_city("QQQ")  # seen on the request path
+    store.supports_hotels("XXX")
+    store.checked_at["LON"] -= 7200  # stale
+    client = FakeHotelListClient(with_hotels={"QQQ"})
+    asyncio.run(store.refresh(client))
+    assert client.calls == 3
+    assert store.supports_hotels("QQQ") and store.is_valid_city("QQQ")
+    assert not store.is_valid_city("XXX") and not store.supports_hotels("XXX")
+    assert not store.supports_hotels("LON")
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.services import resilience
+from app.services.amadeus_client import AsyncAmadeusClient, CircuitOpenError, endpoint_key
+from app.services.resilience import CircuitBreaker, CircuitOpen, ResiliencePolicy
+from app.services.search_cache import SearchCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_endpoint_key_collapses_ids():
+    assert endpoint_key("get", "/v1/booking/flight-orders/eJzTd9f3NjIJdzUFAAtHAkk") == "GET /v1/booking/flight-orders/{id}"
+    assert endpoint_key("GET", "/v2/shopping/flight-offers") == "GET /v2/shopping/flight-offers"
+
+
+def test_breaker_opens_fails_fast_and_recovers_through_half_open(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    breaker = CircuitBreaker("t", failure_threshold=3, failure_rate=0.5, window=10, recovery_timeout=30)
+
+    breaker.record_success()
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+    assert breaker.rejected == 1
+
+    clock.now += 31
+    breaker.allow()  # the single half-open probe
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opened == 2
+
+    clock.now += 31
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+
+
+def test_timeout_adapts_to_observed_latency():
+    policy = ResiliencePolicy(default_timeout=15, min_timeout=0.5, timeout_multiplier=3, min_samples=5)
+    endpoint = policy.endpoint("GET /x")
+    assert policy.timeout_for(endpoint) == 15
+    for _ in range(10):
+        endpoint.latency.add(0.4)
+    assert policy.timeout_for(endpoint) == pytest.approx(1.2)
+    fast = policy.endpoint("GET /y")
+    for _ in range(10):
+        fast.latency.add(0.01)
+    assert policy.timeout_for(fast) == 0.5
+
+
+def test_slow_attempt_is_hedged_and_loser_cancelled():
+    policy = ResiliencePolicy(default_timeout=5, min_timeout=0.5, min_samples=5)
+    endpoint = policy.endpoint("GET /x")
+    for _ in range(10):
+        endpoint.latency.add(0.02)
+    calls, cancelled = [], []
+
+    async def attempt(timeout):
+        calls.append(timeout)
+        try:
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(len(calls))
+            raise
+        return len(calls)
+
+    result = asyncio.run(policy.call("GET /x", attempt, hedge=True))
+    assert result == 2
+    assert len(calls) == 2 and cancelled
+    assert endpoint.hedges == 1 and endpoint.hedge_wins == 1
+
+
+def test_open_circuit_serves_expired_cache_entry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    cache = SearchCache("t", ttl=60, stale_if_error=600)
+    cache.set("k", [{"id": "1"}])
+    clock.now += 120
+
+    def loader():
+        raise CircuitOpen("GET /x", 10)
+
+    assert cache.get("k") is None
+    assert cache.get_or_load("k", loader) == [{"id": "1"}]
+    assert cache.get_or_load("k", lambda: {"error": "upstream down"}) == [{"id": "1"}]
+    assert cache.stats()["error_fallbacks"] == 2
+    assert cache.get_or_load("k", lambda: [{"id": "2"}]) == [{"id": "2"}]
+
+    clock.now += 1000
+    with pytest.raises(CircuitOpen):
+        cache.get_or_load("k", loader)
+
+
+def test_client_circuit_opens_on_server_errors():
+    state = {"calls": 0}
+
+    async def token(request):
+        return web.json_response({"access_token": "t", "expires_in": 1799})
+
+    async def flight_offers(request):
+        state["calls"] += 1
+        return web.json_response({"errors": [{"status": 503}]}, status=503)
+
+    async def runner():
+        app = web.Application()
+        app.router.add_post("/v1/security/oauth2/token", token)
+        app.router.add_get("/v2/shopping/flight-offers", flight_offers)
+        server = TestServer(app)
+        await server.start_server()
+        policy = ResiliencePolicy(failure_threshold=3, window=5, recovery_timeout=60)
+        client = AsyncAmadeusClient("id", "secret", base_url=str(server.make_url("")), resilience=policy)
+        errors = []
+        try:
+            for _ in range(5):
+                try:
+                    await client.get("/v2/shopping/flight-offers", originLocationCode="DEL")
+                except Exception as e:
+                    errors.append(e)
+        finally:
+            await client.close()
+            await server.close()
+        return errors, policy.stats()
+
+    errors, stats = asyncio.run(runner())
+    assert state["calls"] == 3
+    assert all(isinstance(e, CircuitOpenError) for e in errors[3:])
+    assert stats["GET /v2/shopping/flight-offers"]["state"] == "open"
+
+
+def test_client_errors_are_neither_successes_nor_latency_samples():
+    policy = ResiliencePolicy(failure_threshold=1, window=5, recovery_timeout=60, min_samples=1)
+
+    class Reply:
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    async def reply(status):
+        return await policy.call("GET /x", lambda timeout: asyncio.sleep(0, Reply(status)),
+                                 is_failure=lambda r: r.status_code >= 500,
+                                 is_neutral=lambda r: 400 <= r.status_code < 500)
+
+    async def scenario():
+        for status in (401, 429, 404):
+            await reply(status)
+
+    asyncio.run(scenario())
+    endpoint = policy.endpoint("GET /x")
+    assert len(endpoint.latency) == 0
+    assert list(endpoint.breaker._outcomes) == []
+    assert policy.timeout_for(endpoint) == policy.default_timeout
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from app.services import search_cache
+from app.services.search_cache import SearchCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_hit_and_miss_counters():
+    cache = SearchCache("t", ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [{"id": "1"}]
+
+    assert cache.get_or_load("k", loader) == [{"id": "1"}]
+    assert cache.get_or_load("k", loader) == [{"id": "1"}]
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_ratio"] == 0.5
+
+
+def test_errors_and_empty_results_are_not_cached():
+    cache = SearchCache("t", ttl=60)
+    cache.set("err", {"error": "boom"})
+    cache.set("empty", [])
+    assert cache.get("err") is None
+    assert cache.get("empty") is None
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = SearchCache("t", ttl=60, max_entries=2)
+    cache.set("a", [1])
+    cache.set("b", [2])
+    cache.get("a")
+    cache.set("c", [3])
+    assert cache.get("b") is None
+    assert cache.get("a") == [1] and cache.get("c") == [3]
+
+    small = SearchCache("t", ttl=60, max_entries=100, max_bytes=40)
+    small.set("a", ["x" * 10])
+    small.set("b", ["y" * 10])
+    small.set("c", ["z" * 10])
+    assert small.get("a") is None
+    assert small.stats()["bytes"] <= 40
+    assert small.stats()["evictions"] >= 1
+
+
+def test_stale_entry_is_served_while_refreshing(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(search_cache.time, "monotonic", clock)
+    cache = SearchCache("t", ttl=10, stale_ttl=100)
+    cache.set("k", ["old"])
+    clock.now += 50
+
+    assert cache.get_or_load("k", lambda: ["new"]) == ["old"]
+    deadline = time.time() + 2
+    while cache.get("k") != ["new"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("k") == ["new"]
+    assert cache.stats()["stale_hits"] == 1
+
+    clock.now += 1000
+    assert cache.get("k") is None
+
+
+def test_async_stale_refresh_runs_once():
+    async def scenario():
+        cache = SearchCache("t", ttl=0, stale_ttl=100)
+        cache.set("k", ["old"])
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["new"]
+
+        results = await asyncio.gather(*[cache.get_or_load_async("k", loader) for _ in range(5)])
+        await asyncio.sleep(0.05)
+        return results, calls, cache
+
+    results, calls, cache = asyncio.run(scenario())
+    assert results == [["old"]] * 5
+    assert len(calls) == 1
+    assert cache.stats()["refreshes"] == 1
@@ -0,0 +1,125 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.services import amadeus_service
+from app.services.rate_limiter import BACKGROUND, INTERACTIVE, current_priority, request_priority
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_sync_callers_share_one_call():
+    group = SingleFlight()
+    calls = []
+    start = threading.Barrier(8)
+    results = []
+
+    def upstream():
+        calls.append(1)
+        time.sleep(0.05)
+        return ["offer"]
+
+    def worker():
+        start.wait()
+        results.append(group.do("DEL-DXB", upstream))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [["offer"]] * 8
+    assert group.stats() == {"calls": 1, "shared": 7, "in_flight": 0}
+
+
+def test_sync_errors_propagate_to_waiters_and_are_not_remembered():
+    group = SingleFlight()
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        group.do("k", failing)
+    assert group.do("k", lambda: "ok") == "ok"
+
+
+def test_concurrent_async_callers_share_one_call():
+    group = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "BOM"
+
+    async def scenario():
+        first = await asyncio.gather(*[group.do_async("mumbai", upstream) for _ in range(10)])
+        second = await group.do_async("mumbai", upstream)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == ["BOM"] * 10
+    assert second == "BOM"
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    group = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        impatient = asyncio.create_task(group.do_async("k", upstream))
+        patient = asyncio.create_task(group.do_async("k", upstream))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await patient
+
+    assert asyncio.run(scenario()) == "ok"
+
+
+def test_shared_async_call_does_not_run_in_the_first_callers_context():
+    group = SingleFlight()
+    request_id = contextvars.ContextVar("request_id", default=None)
+    seen = []
+
+    async def upstream():
+        seen.append(request_id.get())
+        await asyncio.sleep(0.02)
+        return "BOM"
+
+    async def caller(name):
+        request_id.set(name)
+        return await group.do_async("mumbai", upstream)
+
+    async def scenario():
+        return await asyncio.gather(caller("first"), caller("second"))
+
+    assert asyncio.run(scenario()) == ["BOM", "BOM"]
+    assert seen == [None]
+
+
+def test_async_amadeus_lookups_are_only_shared_at_the_same_priority(monkeypatch):
+    calls = []
+
+    async def lookup(city_name):
+        calls.append(current_priority())
+        await asyncio.sleep(0.02)
+        return "XYZ"
+
+    async def at(priority):
+        with request_priority(priority):
+            return await amadeus_service.city_to_iata_code_async("nowhere-ville")
+
+    async def scenario():
+        return await asyncio.gather(at(BACKGROUND), at(INTERACTIVE), at(INTERACTIVE))
+
+    monkeypatch.setattr(amadeus_service, "_city_to_iata_code_uncached_async", lookup)
+    assert asyncio.run(scenario()) == ["XYZ"] * 3
+    assert sorted(calls) == [INTERACTIVE, BACKGROUND]
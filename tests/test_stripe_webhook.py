@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.db.crud import create_bookings
+from app.db.session import create_async_db_engine, get_async_db, init_db
+from app.main import app
+from app.models.booking import Booking
+from app.models.stripe_event import StripeEvent
+from app.services.stripe_events import StripeEventProcessor, record_stripe_event
+
+
+def checkout_completed(event_id, booking_id):
+    return {"id": event_id, "type": "checkout.session.completed",
+            "data": {"object": {"metadata": {"booking_id": str(booking_id)}}}}
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "STRIPE_WEBHOOK_SECRET", None)
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'stripe.db'}")
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def seed():
+        await init_db(engine)
+        async with sessions() as db:
+            await create_bookings(db, [{"user_name": f"G{i}", "email": f"g{i}@example.com", "phone": "1",
+                                        "payment_status": "pending"} for i in range(40)])
+
+    async def override():
+        async with sessions() as db:
+            yield db
+
+    asyncio.run(seed())
+    app.dependency_overrides[get_async_db] = override
+    yield sessions
+    app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
+
+
+async def scalar(sessions, query):
+    async with sessions() as db:
+        return (await db.execute(query)).scalar()
+
+
+def test_webhook_acks_once_per_event_id(sessions):
+    client = TestClient(app)
+    event = checkout_completed("evt_1", 1)
+    first = client.post("/booking/stripe-webhook", content=json.dumps(event))
+    retry = client.post("/booking/stripe-webhook", content=json.dumps(event))
+
+    assert first.json() == {"status": "success", "duplicate": False}
+    assert retry.json() == {"status": "success", "duplicate": True}
+    assert asyncio.run(scalar(sessions, select(func.count()).select_from(StripeEvent))) == 1
+    # Nothing is applied inline; the booking waits for the workers
+    assert asyncio.run(scalar(sessions, select(Booking.payment_status).where(Booking.id == 1))) == "pending"
+    assert client.post("/booking/stripe-webhook", content=b"not json").status_code == 400
+
+
+def test_burst_is_applied_in_one_batch(sessions):
+    client = TestClient(app)
+    for booking_id in range(1, 31):
+        client.post("/booking/stripe-webhook", content=json.dumps(checkout_completed(f"evt_{booking_id}", booking_id)))
+    client.post("/booking/stripe-webhook", content=json.dumps({"id": "evt_other", "type": "charge.refunded"}))
+
+    processor = StripeEventProcessor(sessions, batch_size=100)
+    assert asyncio.run(processor.drain()) == 31
+    assert processor.batches == 1
+    paid = asyncio.run(scalar(sessions, select(func.count()).where(Booking.payment_status == "paid")))
+    assert paid == 30
+    assert asyncio.run(scalar(sessions, select(func.count()).where(StripeEvent.status != "processed"))) == 0
+
+
+def test_workers_pick_up_new_events(sessions):
+    async def run():
+        processor = StripeEventProcessor(sessions, batch_size=10, batch_window=0.01, poll_interval=5)
+        processor.start(workers=2)
+        async with sessions() as db:
+            for booking_id in range(1, 26):
+                await record_stripe_event(db, checkout_completed(f"evt_w{booking_id}", booking_id))
+        processor.notify()
+        for _ in range(200):
+            if processor.processed == 25:
+                break
+            await asyncio.sleep(0.01)
+        await processor.stop()
+        return processor.processed
+
+    assert asyncio.run(run()) == 25
+    assert asyncio.run(scalar(sessions, select(func.count()).where(Booking.payment_status == "paid"))) == 25
@@ -0,0 +1,87 @@
+import marshal
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.services import amadeus_service
+from app.utils.profiling import PROFILES, ProfilingMiddleware
+from app.utils.tracing import TRACES, parse_traceparent
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+def flight_params():
+    return {
+        "originLocationCode": "DEL",
+        "destinationLocationCode": "DXB",
+        "departureDate": (date.today() + timedelta(days=30)).isoformat(),
+        "session_id": "trace-test",
+    }
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-01") == (TRACE_ID, "00f067aa0ba902b7", True)
+    assert parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent(f"00-{'0' * 32}-00f067aa0ba902b7-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+
+def test_sampled_request_records_spans_through_the_search_path():
+    amadeus_service.flight_search_cache.clear()
+    client = TestClient(app)
+    response = client.get("/booking/flights", params=flight_params(),
+                          headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+    assert response.status_code == 200
+    trace_id, span_id, sampled = parse_traceparent(response.headers["traceparent"])
+    assert trace_id == TRACE_ID and sampled and span_id != "00f067aa0ba902b7"
+
+    spans = {span["name"]: span for span in TRACES.get(TRACE_ID)}
+    root = spans["GET /booking/flights"]
+    assert root["parent_id"] == "00f067aa0ba902b7" and root["span_id"] == span_id
+    assert root["attributes"]["http.status"] == 200
+    find = spans["travel_service.find_flights"]
+    cache = spans["search_cache.flights"]
+    upstream = spans["amadeus.search_flights_async"]
+    assert find["parent_id"] == root["span_id"]
+    assert cache["parent_id"] == find["span_id"]
+    assert upstream["parent_id"] == cache["span_id"]
+
+
+def test_unsampled_request_gets_ids_but_is_not_recorded():
+    client = TestClient(app)
+    response = client.get("/booking/cache-stats")
+    trace_id, _, sampled = parse_traceparent(response.headers["traceparent"])
+    assert not sampled
+    assert TRACES.get(trace_id) is None
+
+
+def test_admin_profile_capture_and_download(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    client = TestClient(ProfilingMiddleware(app, admin_token="s3cret"))
+    admin = {"X-Admin-Token": "s3cret"}
+
+    plain = client.get("/booking/flights", params=flight_params(), headers={"X-Profile": "1"})
+    assert "x-profile-id" not in plain.headers  # no admin token, no profile
+
+    profiled = client.get("/booking/flights", params=flight_params(), headers={"X-Profile": "1", **admin})
+    assert profiled.status_code == 200
+    profile_id = profiled.headers["x-profile-id"]
+    assert PROFILES.get(profile_id) is not None
+
+    assert client.get("/admin/profiles").status_code == 403
+    listed = client.get("/admin/profiles", headers=admin).json()["profiles"]
+    assert listed[0]["id"] == profile_id and listed[0]["path"] == "/booking/flights"
+
+    download = client.get(f"/admin/profiles/{profile_id}", headers=admin)
+    assert download.headers["content-type"] == "application/octet-stream"
+    assert isinstance(marshal.loads(download.content), dict)
+    text = client.get(f"/admin/profiles/{profile_id}", params={"format": "text"}, headers=admin).text
+    assert "function calls" in text
+
+
+def test_admin_routes_are_hidden_without_a_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert TestClient(app).get("/admin/traces", headers={"X-Admin-Token": ""}).status_code == 404
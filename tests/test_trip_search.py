@@ -0,0 +1,94 @@
+import asyncio
+import json
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import amadeus_service
+
+client = TestClient(app)
+
+
+def future(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+def install_fakes(monkeypatch, delay=0.2, arrival_offset=timedelta(hours=2)):
+    hotel_calls = []
+
+    async def fake_flights(origin, destination, departure_date, adults=1, children=0):
+        await asyncio.sleep(delay)
+        arrival = datetime.fromisoformat(departure_date) + timedelta(hours=20) + arrival_offset
+        return [
+            {"id": "2", "price": {"total": "420.00", "currency": "USD"},
+             "itineraries": [{"segments": [{"carrierCode": "AI", "number": "1", "arrival": {"at": arrival.isoformat()}}]}]},
+            {"id": "1", "price": {"total": "380.00", "currency": "USD"},
+             "itineraries": [{"segments": [{"carrierCode": "EK", "number": "2", "arrival": {"at": arrival.isoformat()}}]}]},
+        ]
+
+    async def fake_hotels(city_code, check_in_date, check_out_date, adults=1):
+        hotel_calls.append((city_code, check_in_date, check_out_date))
+        await asyncio.sleep(delay)
+        return [{"name": "Harbour Inn", "price": "210.50", "currency": "USD"},
+                {"name": "Budget Stay", "price": "N/A", "currency": "USD"}]
+
+    amadeus_service.flight_search_cache.clear()
+    amadeus_service.hotel_search_cache.clear()
+    monkeypatch.setattr(amadeus_service, "_search_flights_uncached_async", fake_flights)
+    monkeypatch.setattr(amadeus_service, "_search_hotels_uncached_async", fake_hotels)
+    return hotel_calls
+
+
+def test_trip_searches_flight_and_hotel_concurrently(monkeypatch):
+    hotel_calls = install_fakes(monkeypatch)
+    started = time.perf_counter()
+    response = client.get("/booking/trip", params={
+        "originLocationCode": "DEL", "destinationLocationCode": "LHR", "departureDate": future(20), "nights": 3,
+    })
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    trip = response.json()
+    assert elapsed < 0.35
+    assert hotel_calls == [("LON", future(20), future(23))]
+    assert trip["flight"]["id"] == "1"
+    assert trip["hotel"]["name"] == "Harbour Inn"
+    assert trip["total_price"] == 590.5
+    assert trip["currency"] == "USD"
+    assert trip["hotel_requeried"] is False
+
+
+def test_trip_requeries_hotels_when_flight_lands_next_day(monkeypatch):
+    hotel_calls = install_fakes(monkeypatch, delay=0.01, arrival_offset=timedelta(hours=6))
+    response = client.get("/booking/trip", params={
+        "originLocationCode": "DEL", "destinationLocationCode": "LON",
+        "departureDate": future(20), "checkOutDate": future(25),
+    })
+    trip = response.json()
+    assert trip["hotel_requeried"] is True
+    assert trip["check_in_date"] == future(21)
+    assert hotel_calls[-1] == ("LON", future(21), future(25))
+
+
+def test_trip_requires_length_of_stay():
+    response = client.get("/booking/trip", params={
+        "originLocationCode": "DEL", "destinationLocationCode": "LON", "departureDate": future(20),
+    })
+    assert response.status_code == 400
+
+
+def test_trip_streams_server_sent_events(monkeypatch):
+    install_fakes(monkeypatch, delay=0.01)
+    response = client.get("/booking/trip", params={
+        "originLocationCode": "DEL", "destinationLocationCode": "LHR", "departureDate": future(20), "nights": 2,
+        "stream": "sse",
+    })
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [frame for frame in response.text.split("\n\n") if frame]
+    names = [frame.split("\n")[0] for frame in frames]
+    assert sorted(names[:2]) == ["event: flight", "event: hotel"]
+    assert names[-1] == "event: summary"
+    summary = json.loads(frames[-1].split("data: ", 1)[1])
+    assert summary["total_price"] == 590.5
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+
+import requests
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import voice
+from app.services import amadeus_service
+from app.services.travel_service import summarize_flight_offer
+
+client = TestClient(app)
+VOICE_WEBHOOK = "/voice/voice/voice-webhook"
+
+
+def no_http(*args, **kwargs):
+    raise AssertionError("voice webhook must not loop back over HTTP")
+
+
+def test_flight_query_is_served_in_process(monkeypatch):
+    monkeypatch.setattr(amadeus_service, "USE_MOCK_FLIGHT_SEARCH", True)
+    monkeypatch.setattr(requests, "get", no_http)
+    response = client.post(VOICE_WEBHOOK, json={
+        "text": "",
+        "session_id": "s1",
+        "metadata": {"origin": "delhi", "destination": "dubai", "date": "2030-08-15"},
+    })
+    assert response.status_code == 200
+    best = summarize_flight_offer(amadeus_service._simulated_flight_offers("DEL", "DXB", "2030-08-15")[0])
+    assert response.json()["response_text"] == (
+        f"The best flight from Delhi to Dubai on 2030-08-15 is {best['airline']} flight {best['flight_number']} for ₹{best['price']}."
+    )
+
+
+def test_hotel_query_is_served_in_process(monkeypatch):
+    monkeypatch.setattr(amadeus_service, "USE_MOCK_HOTEL_SEARCH", True)
+    monkeypatch.setattr(requests, "get", no_http)
+    response = client.post(VOICE_WEBHOOK, json={
+        "text": "",
+        "session_id": "s1",
+        "metadata": {"city": "paris", "date": "2030-08-10"},
+    })
+    assert response.status_code == 200
+    hotel = amadeus_service.mock_hotel_search("PAR", "2030-08-10", "2030-08-10")[0]
+    assert response.json()["response_text"] == f"I found {hotel['name']} in Paris for ₹{hotel['price']} per night."
+
+
+def test_past_metadata_year_is_moved_to_the_current_year(monkeypatch):
+    monkeypatch.setattr(amadeus_service, "USE_MOCK_FLIGHT_SEARCH", True)
+    monkeypatch.setattr(requests, "get", no_http)
+    searched = []
+    service = voice.get_voice_travel_service()
+    original = service.find_flights
+
+    async def find_flights(origin, destination, date, **kwargs):
+        searched.append(date)
+        return await original(origin, destination, date, **kwargs)
+
+    monkeypatch.setattr(service, "find_flights", find_flights)
+    response = client.post(VOICE_WEBHOOK, json={
+        "text": "",
+        "session_id": "s1",
+        "metadata": {"origin": "delhi", "destination": "dubai", "date": "2024-11-01"},
+    })
+    assert response.status_code == 200
+    expected = f"{datetime.now().year}-11-01"
+    assert searched == [expected]
+    assert f"on {expected}" in response.json()["response_text"]
+
+
+def test_unknown_city_is_resolved_through_the_async_amadeus_client(monkeypatch):
+    monkeypatch.setattr(requests, "get", no_http)
+    lookups = []
+
+    async def lookup(city_name):
+        lookups.append(city_name)
+        return "ZZZ"
+
+    monkeypatch.setattr(amadeus_service, "_city_to_iata_code_uncached_async", lookup)
+    assert asyncio.run(voice.resolve_iata(" Nowhere Ville ")) == "ZZZ"
+    assert lookups == ["nowhere ville"]